@@ -0,0 +1,196 @@
+"""
+Listados y estadísticas para el panel de administración.
+
+GET /api/admin/reservations devuelve las reservas ya unidas con el nombre y
+email del usuario, la computadora y el laboratorio (las mismas uniones que la
+vista upcoming_reservations de init.sql), paginadas y filtrables. Sustituye a
+/reservations/all más una petición por reserva a /auth/users/<id>,
+/computers/<id> y /labs/<id>.
+
+Query params (todos opcionales):
+  - page (desde 1), per_page (por defecto 50, máximo 500)
+  - status: uno o varios separados por coma
+  - laboratory_id, computer_id, user_id
+  - from, to: rango de start_time (fecha o fecha y hora ISO; `to` excluido)
+  - upcoming=true: solo las que empiezan después de ahora
+  - q: texto a buscar en el nombre o email del usuario
+  - order: 'desc' (por defecto) o 'asc' por start_time
+
+GET /api/admin/stats devuelve los conteos del panel. Las reservas por estado
+salen de los resúmenes diarios (rollups.py) si ya existen; si no, de un
+GROUP BY sobre las reservas vivas y archivadas (archive.py).
+"""
+
+from datetime import date, datetime, timedelta
+
+from flask import Blueprint, jsonify, request
+from sqlalchemy import func, or_, select
+
+from archive import reservation_history
+from auth import token_required
+from computer import Computer
+from db import db
+from fast_json import json_response
+from laboratory import Laboratory
+from reservation import Reservation
+from user import User
+import rollups
+
+admin_bp = Blueprint('admin', __name__)
+
+RESERVATION_STATUSES = ['pending', 'confirmed', 'cancelled', 'completed']
+DEFAULT_PER_PAGE = 50
+MAX_PER_PAGE = 500
+
+_RESERVATION_COLUMNS = [
+    ('id', Reservation.id),
+    ('start_time', Reservation.start_time),
+    ('end_time', Reservation.end_time),
+    ('status', Reservation.status),
+    ('recurring', Reservation.recurring),
+    ('user_id', Reservation.user_id),
+    ('computer_id', Reservation.computer_id),
+    ('created_at', Reservation.created_at),
+    ('updated_at', Reservation.updated_at),
+    ('user_name', User.name),
+    ('user_email', User.email),
+    ('computer_name', Computer.name),
+    ('laboratory_id', Laboratory.id),
+    ('laboratory_name', Laboratory.name),
+]
+
+
+def _parse_datetime(value, name):
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f'{name} debe ser una fecha ISO (YYYY-MM-DD o YYYY-MM-DDTHH:MM)')
+
+
+def _reservation_filters(args):
+    """Condiciones WHERE a partir de los query params. Lanza ValueError si alguno es inválido"""
+    filters = []
+
+    statuses = [s.strip() for s in (args.get('status') or '').split(',') if s.strip()]
+    invalid = [s for s in statuses if s not in RESERVATION_STATUSES]
+    if invalid:
+        raise ValueError(f"Estado inválido: {', '.join(invalid)}")
+    if statuses:
+        filters.append(Reservation.status.in_(statuses))
+
+    for name, column in (('laboratory_id', Computer.laboratory_id),
+                         ('computer_id', Reservation.computer_id),
+                         ('user_id', Reservation.user_id)):
+        if args.get(name):
+            value = args.get(name, type=int)
+            if value is None:
+                raise ValueError(f'{name} debe ser un entero')
+            filters.append(column == value)
+
+    if args.get('from'):
+        filters.append(Reservation.start_time >= _parse_datetime(args['from'], 'from'))
+    if args.get('to'):
+        filters.append(Reservation.start_time < _parse_datetime(args['to'], 'to'))
+    if args.get('upcoming', '').lower() in ('1', 'true'):
+        # Como la vista upcoming_reservations; las horas se guardan en hora local
+        filters.append(Reservation.start_time > datetime.now())
+
+    if args.get('q'):
+        pattern = f"%{args['q'].strip()}%"
+        filters.append(or_(User.name.like(pattern), User.email.like(pattern)))
+
+    return filters
+
+
+# Reservas con usuario, computadora y laboratorio, paginadas (solo admin)
+@admin_bp.route('/reservations', methods=['GET'])
+@token_required
+def get_admin_reservations(current_user):
+    if current_user.role != 'admin':
+        return jsonify({'message': 'Acceso denegado: se requiere rol admin'}), 403
+
+    try:
+        filters = _reservation_filters(request.args)
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+
+    page = max(request.args.get('page', 1, type=int) or 1, 1)
+    per_page = min(max(request.args.get('per_page', DEFAULT_PER_PAGE, type=int) or DEFAULT_PER_PAGE, 1), MAX_PER_PAGE)
+    order = request.args.get('order', 'desc').lower()
+    if order not in ('asc', 'desc'):
+        return jsonify({'message': "order debe ser 'asc' o 'desc'"}), 400
+
+    joined = (
+        select(*[column for _, column in _RESERVATION_COLUMNS])
+        .select_from(Reservation)
+        .join(User, Reservation.user_id == User.id)
+        .outerjoin(Computer, Reservation.computer_id == Computer.id)
+        .outerjoin(Laboratory, Computer.laboratory_id == Laboratory.id)
+        .where(*filters)
+    )
+
+    total = db.session.execute(joined.with_only_columns(func.count(Reservation.id))).scalar()
+
+    if order == 'asc':
+        ordering = (Reservation.start_time.asc(), Reservation.id.asc())
+    else:
+        ordering = (Reservation.start_time.desc(), Reservation.id.desc())
+    rows = db.session.execute(
+        joined.order_by(*ordering).limit(per_page).offset((page - 1) * per_page)
+    ).all()
+
+    names = [name for name, _ in _RESERVATION_COLUMNS]
+    return json_response({
+        'reservations': [dict(zip(names, row)) for row in rows],
+        'page': page,
+        'per_page': per_page,
+        'total': total,
+        'pages': -(-total // per_page)
+    })
+
+
+# Conteos del panel de administración (solo admin)
+@admin_bp.route('/stats', methods=['GET'])
+@token_required
+def get_admin_stats(current_user):
+    if current_user.role != 'admin':
+        return jsonify({'message': 'Acceso denegado: se requiere rol admin'}), 403
+
+    try:
+        first_day = date.fromisoformat(request.args['from']) if request.args.get('from') else None
+        last_day = date.fromisoformat(request.args['to']) if request.args.get('to') else None
+    except ValueError:
+        return jsonify({'message': 'from y to deben tener formato YYYY-MM-DD'}), 400
+
+    rollups_until = rollups.processed_until()
+    if rollups_until is not None:
+        by_status = rollups.status_totals(first_day, last_day)
+        source = 'rollups'
+    else:
+        def day_filters(table):
+            filters = []
+            if first_day is not None:
+                filters.append(table.start_time >= datetime.combine(first_day, datetime.min.time()))
+            if last_day is not None:
+                filters.append(table.start_time < datetime.combine(last_day + timedelta(days=1), datetime.min.time()))
+            return filters
+
+        history = reservation_history(day_filters)
+        query = select(history.c.status, func.count(history.c.id)).group_by(history.c.status)
+        by_status = {status: 0 for status in rollups.STATUSES}
+        by_status.update({status: count for status, count in db.session.execute(query)})
+        source = 'reservations'
+
+    computers = dict(db.session.execute(
+        select(Computer.status, func.count(Computer.id)).group_by(Computer.status)
+    ).all())
+    users = dict(db.session.execute(select(User.role, func.count(User.id)).group_by(User.role)).all())
+
+    return jsonify({
+        'labs': db.session.execute(select(func.count(Laboratory.id))).scalar(),
+        'computers': {'total': sum(computers.values()), 'by_status': computers},
+        'users': {'total': sum(users.values()), 'by_role': users},
+        'reservations': {'total': sum(by_status.values()), 'by_status': by_status},
+        'source': source,
+        'rollups_until': rollups_until.isoformat() if rollups_until else None
+    })
@@ -0,0 +1,321 @@
+"""
+Analítica de uso de los laboratorios para planificar capacidad.
+
+GET /api/analytics/utilization?lab_id=&from=&to=&bucket=&detail= (solo admin)
+  - lab_id: opcional; sin él se analizan todos los laboratorios
+  - from, to: días YYYY-MM-DD, ambos incluidos (por defecto los últimos 30 días)
+  - bucket: 'hour', 'day' (por defecto) o 'week' para la serie temporal
+  - detail=true: calcular desde las reservas aunque existan resúmenes diarios
+
+Devuelve:
+  - heatmap: 7x24 (lunes=0) con el % de computadoras ocupadas en cada hora de la semana
+  - series: horas de uso y % de ocupación por bucket
+  - peak: máximo de computadoras usadas a la vez y cuándo empezó (barrido de eventos)
+  - computers / labs: horas de uso y % de utilización sobre el horario del laboratorio
+
+Las reservas que ocupan (mismos estados que bitmap_store) se leen por tandas
+como columnas y se convierten a arreglos de NumPy de segundos desde el inicio
+del rango; todo el cálculo es vectorizado (bincount, cumsum, lexsort), sin
+recorrer objetos del ORM. Las horas se guardan sin zona, así que no hay
+saltos de horario de verano que corregir. Se leen también las reservas
+archivadas (ver archive.py).
+
+Si ya existen los resúmenes diarios (rollups.py) y el bucket es 'day' o
+'week', la serie, los totales por computadora y laboratorio y
+reservations_count salen de ellos (reservations_count cuenta las que empiezan
+en el rango, y van hasta ROLLUP_LAG más el intervalo de la tarea por detrás).
+Los resúmenes no tienen la hora exacta, así que heatmap, peak y los picos por
+laboratorio siempre se calculan desde las reservas. Con bucket=hour o
+detail=true todo sale de las reservas. 'source' indica el origen de la serie
+y los totales.
+"""
+
+import os
+from datetime import date, datetime, time, timedelta
+
+import numpy as np
+from flask import Blueprint, jsonify, request
+from sqlalchemy import select
+
+from archive import reservation_history
+from auth import token_required
+from bitmap_store import OCCUPYING_STATUSES
+from computer import Computer
+from db import db
+from fast_json import json_response
+from laboratory import Laboratory
+import rollups
+
+analytics_bp = Blueprint('analytics', __name__)
+
+BUCKETS = {'hour': 1, 'day': 24, 'week': 168}
+DEFAULT_DAYS = 30
+MAX_DAYS = int(os.getenv('ANALYTICS_MAX_DAYS', 400))
+FETCH_BATCH = int(os.getenv('ANALYTICS_FETCH_BATCH', 20000))
+HOUR = 3600
+
+
+def _parse_params(args):
+    """(lab_id, primer día, último día, bucket). Lanza ValueError si algo es inválido"""
+    lab_id = None
+    if args.get('lab_id'):
+        lab_id = args.get('lab_id', type=int)
+        if lab_id is None:
+            raise ValueError('lab_id debe ser un entero')
+
+    try:
+        last_day = date.fromisoformat(args['to']) if args.get('to') else date.today()
+        first_day = (date.fromisoformat(args['from']) if args.get('from')
+                     else last_day - timedelta(days=DEFAULT_DAYS - 1))
+    except ValueError:
+        raise ValueError('from y to deben tener formato YYYY-MM-DD')
+    if first_day > last_day:
+        raise ValueError('from debe ser anterior o igual a to')
+    if (last_day - first_day).days + 1 > MAX_DAYS:
+        raise ValueError(f'El rango no puede superar {MAX_DAYS} días')
+
+    bucket = args.get('bucket', 'day')
+    if bucket not in BUCKETS:
+        raise ValueError(f"bucket debe ser uno de {', '.join(BUCKETS)}")
+    return lab_id, first_day, last_day, bucket
+
+
+def _seconds_since(values, origin):
+    # Más rápido que np.array(..., dtype='datetime64[s]') con objetos datetime
+    return np.fromiter(((value - origin).total_seconds() for value in values), dtype=np.float64,
+                       count=len(values)).astype(np.int64)
+
+
+def load_intervals(computer_ids, range_start, range_end):
+    """
+    Reservas que ocupan y se solapan con [range_start, range_end), como tres
+    arreglos: computer_id, inicio y fin en segundos desde range_start
+    (recortados al rango). Se leen con Core por tandas de FETCH_BATCH filas.
+    """
+    total = int((range_end - range_start).total_seconds())
+    computers, starts, ends = [], [], []
+
+    history = reservation_history(lambda table: [
+        table.computer_id.in_(computer_ids),
+        table.status.in_(OCCUPYING_STATUSES),
+        table.start_time < range_end,
+        table.end_time > range_start
+    ])
+    result = db.session.connection().execution_options(yield_per=FETCH_BATCH).execute(
+        select(history.c.computer_id, history.c.start_time, history.c.end_time)
+    )
+    for rows in result.partitions():
+        columns = list(zip(*rows))
+        computers.append(np.array(columns[0], dtype=np.int64))
+        starts.append(_seconds_since(columns[1], range_start))
+        ends.append(_seconds_since(columns[2], range_start))
+
+    if not computers:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, empty
+    computer_array = np.concatenate(computers)
+    start_array = np.clip(np.concatenate(starts), 0, total)
+    end_array = np.clip(np.concatenate(ends), 0, total)
+    valid = end_array > start_array
+    return computer_array[valid], start_array[valid], end_array[valid]
+
+
+def hourly_busy_seconds(starts, ends, hours):
+    """
+    Segundos-computadora ocupados en cada hora del rango. Cada intervalo aporta
+    la parte de su primera y última hora más 3600 por cada hora completa
+    intermedia (arreglo de diferencias + cumsum).
+    """
+    if starts.size == 0:
+        return np.zeros(hours)
+    first_hour = starts // HOUR
+    last_hour = ends // HOUR
+    same_hour = first_hour == last_hour
+
+    head = np.where(same_hour, ends - starts, (first_hour + 1) * HOUR - starts)
+    tail = np.where(same_hour, 0, ends - last_hour * HOUR)
+    size = hours + 2
+
+    busy = np.bincount(first_hour, weights=head, minlength=size)
+    busy += np.bincount(last_hour, weights=tail, minlength=size)
+    spans = ~same_hour
+    full = np.bincount(first_hour[spans] + 1, weights=np.full(spans.sum(), HOUR), minlength=size)
+    full -= np.bincount(last_hour[spans], weights=np.full(spans.sum(), HOUR), minlength=size)
+    busy += np.cumsum(full)
+    return busy[:hours]
+
+
+def peak_concurrency(starts, ends):
+    """
+    Máximo de intervalos simultáneos y el segundo en que se alcanzó. En un
+    mismo instante los fines se procesan antes que los inicios: reservas
+    consecutivas no cuentan como simultáneas.
+    """
+    if starts.size == 0:
+        return 0, None
+    times = np.concatenate([starts, ends])
+    deltas = np.concatenate([np.ones(starts.size, dtype=np.int64), -np.ones(ends.size, dtype=np.int64)])
+    order = np.lexsort((deltas, times))
+    running = np.cumsum(deltas[order])
+    index = int(np.argmax(running))
+    return int(running[index]), int(times[order][index])
+
+
+def _open_seconds_per_day(laboratory):
+    # Mismo criterio que availability.lab_template: cerrar a medianoche o antes de abrir = hasta el final del día
+    opening = laboratory.opening_time or time(0, 0)
+    closing = laboratory.closing_time or time(0, 0)
+    open_seconds = opening.hour * HOUR + opening.minute * 60
+    close_seconds = closing.hour * HOUR + closing.minute * 60
+    if close_seconds <= open_seconds:
+        close_seconds = 24 * HOUR
+    return close_seconds - open_seconds
+
+
+def _percent(part, whole):
+    return round(100.0 * part / whole, 2) if whole else 0.0
+
+
+@analytics_bp.route('/utilization', methods=['GET'])
+@token_required
+def get_utilization(current_user):
+    if current_user.role != 'admin':
+        return jsonify({'message': 'Acceso denegado: se requiere rol admin'}), 403
+
+    try:
+        lab_id, first_day, last_day, bucket = _parse_params(request.args)
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+
+    lab_query = select(Laboratory)
+    if lab_id is not None:
+        lab_query = lab_query.where(Laboratory.id == lab_id)
+    labs = db.session.execute(lab_query.order_by(Laboratory.id)).scalars().all()
+    if lab_id is not None and not labs:
+        return jsonify({'message': 'Laboratorio no encontrado'}), 404
+
+    computer_rows = db.session.execute(
+        select(Computer.id, Computer.name, Computer.laboratory_id)
+        .where(Computer.laboratory_id.in_([lab.id for lab in labs]))
+        .order_by(Computer.id)
+    ).all()
+    computer_ids = np.array([row[0] for row in computer_rows], dtype=np.int64)
+    computer_count = len(computer_rows)
+
+    range_start = datetime.combine(first_day, time(0, 0))
+    range_end = datetime.combine(last_day + timedelta(days=1), time(0, 0))
+    days = (last_day - first_day).days + 1
+    hours = days * 24
+
+    lab_ids = [lab.id for lab in labs]
+    computer_labs = np.array([row[2] for row in computer_rows], dtype=np.int64)
+    open_per_day = {lab.id: _open_seconds_per_day(lab) for lab in labs}
+
+    # El mapa de calor y los picos necesitan la hora exacta: siempre salen de
+    # las reservas. Con resúmenes diarios (bucket day/week, sin detail=true) la
+    # serie y los totales salen de ellos
+    detail = bucket == 'hour' or request.args.get('detail', '').lower() in ('1', 'true')
+    use_rollups = not detail and rollups.ready()
+
+    reservation_computers, starts, ends = load_intervals(computer_ids.tolist(), range_start, range_end)
+    position = np.searchsorted(computer_ids, reservation_computers)
+    reservation_labs = computer_labs[position] if position.size else position
+
+    # Uso por hora absoluta del rango -> mapa de calor por hora de la semana
+    busy = hourly_busy_seconds(starts, ends, hours)
+    hour_index = np.arange(hours)
+    week_slot = ((first_day.weekday() + hour_index // 24) % 7) * 24 + hour_index % 24
+    slot_busy = np.bincount(week_slot, weights=busy, minlength=168)
+    slot_capacity = np.bincount(week_slot, minlength=168) * HOUR * computer_count
+    with np.errstate(divide='ignore', invalid='ignore'):
+        heatmap = np.where(slot_capacity > 0, 100.0 * slot_busy / slot_capacity, 0.0)
+
+    lab_peaks = {}
+    for lab_id in lab_ids:
+        in_lab = reservation_labs == lab_id
+        lab_peaks[lab_id] = peak_concurrency(starts[in_lab], ends[in_lab])
+    peak, peak_at = peak_concurrency(starts, ends)
+
+    if use_rollups:
+        daily_busy = np.zeros(days)
+        per_lab = dict.fromkeys(lab_ids, 0.0)
+        reservations_count = 0
+        for row in rollups.lab_daily(first_day, last_day, lab_ids):
+            daily_busy[(row.day - first_day).days] += row.booked_minutes * 60
+            per_lab[row.laboratory_id] += row.booked_minutes * 60
+            reservations_count += row.pending_count + row.confirmed_count + row.completed_count
+        minutes = rollups.computer_totals(first_day, last_day, lab_ids)
+        per_computer = np.array([minutes.get(row[0], 0) * 60 for row in computer_rows], dtype=np.float64)
+    else:
+        reservations_count = int(starts.size)
+        daily_busy = busy.reshape(days, 24).sum(axis=1)
+        per_computer = np.bincount(position, weights=ends - starts, minlength=computer_count)
+        per_lab = {}
+        for lab_id in lab_ids:
+            in_lab = reservation_labs == lab_id
+            per_lab[lab_id] = float((ends[in_lab] - starts[in_lab]).sum())
+
+    # Serie temporal; las semanas empiezan en lunes
+    if bucket == 'hour':
+        units, unit_hours, width, shift = busy, 1, 1, 0
+    else:
+        units, unit_hours = daily_busy, 24
+        width = BUCKETS[bucket] // 24
+        shift = first_day.weekday() if bucket == 'week' else 0
+    bucket_index = (np.arange(units.size) + shift) // width
+    bucket_busy = np.bincount(bucket_index, weights=units)
+    bucket_units = np.bincount(bucket_index)
+    series = []
+    for index in range(bucket_busy.size):
+        offset = timedelta(hours=int((index * width - shift) * unit_hours))
+        bucket_start = max(range_start, range_start + offset)
+        series.append({
+            'start': bucket_start.isoformat(),
+            'busy_hours': round(float(bucket_busy[index]) / HOUR, 2),
+            'occupancy_pct': _percent(float(bucket_busy[index]),
+                                      float(bucket_units[index]) * unit_hours * HOUR * computer_count)
+        })
+
+    # Utilización por computadora sobre el horario de su laboratorio
+    computers = []
+    for index, (computer_id, name, laboratory_id) in enumerate(computer_rows):
+        busy_seconds = float(per_computer[index]) if computer_count else 0.0
+        computers.append({
+            'computer_id': computer_id,
+            'name': name,
+            'laboratory_id': laboratory_id,
+            'busy_hours': round(busy_seconds / HOUR, 2),
+            'utilization_pct': _percent(busy_seconds, open_per_day[laboratory_id] * days)
+        })
+
+    def at(seconds):
+        return (range_start + timedelta(seconds=seconds)).isoformat() if seconds is not None else None
+
+    lab_results = []
+    for lab in labs:
+        lab_computers = int(np.count_nonzero(computer_labs == lab.id))
+        lab_busy = per_lab[lab.id]
+        lab_peak, lab_peak_at = lab_peaks[lab.id]
+        lab_results.append({
+            'laboratory_id': lab.id,
+            'name': lab.name,
+            'computers': lab_computers,
+            'busy_hours': round(lab_busy / HOUR, 2),
+            'utilization_pct': _percent(lab_busy, open_per_day[lab.id] * days * lab_computers),
+            'peak_concurrent': lab_peak,
+            'peak_at': at(lab_peak_at)
+        })
+
+    return json_response({
+        'from': first_day.isoformat(),
+        'to': last_day.isoformat(),
+        'bucket': bucket,
+        'source': 'rollups' if use_rollups else 'reservations',
+        'computers_count': computer_count,
+        'reservations_count': reservations_count,
+        'heatmap': np.round(heatmap.reshape(7, 24), 2).tolist(),
+        'series': series,
+        'peak': {'concurrent': peak, 'at': at(peak_at)},
+        'labs': lab_results,
+        'computers': computers
+    })
@@ -0,0 +1,177 @@
+"""
+Archivo de reservas terminadas (separación caliente / frío).
+
+Las reservas 'completed' y 'cancelled' que terminaron hace más de
+ARCHIVE_AFTER_DAYS días pasan de reservations a reservations_archive. Así la
+tabla caliente y sus índices (solapamientos, disponibilidad, barrido del
+ciclo de vida) solo contienen el período vivo y caben en el buffer pool.
+
+La tarea 'reservation_archive' (réplica líder, ver background_jobs.py) mueve
+lotes de ARCHIVE_BATCH filas, cada uno en su transacción (INSERT ... SELECT y
+DELETE de los mismos ids, bloqueados con SKIP LOCKED), con un máximo de
+ARCHIVE_MAX_BATCHES lotes por pasada. Al terminar registra el tamaño de ambas
+tablas antes y después; archive_reservations.py hace lo mismo a mano.
+
+Las reservas a las que apunta una entrada de la lista de espera no se
+archivan: la clave foránea de waitlist_entries pondría reservation_id a NULL.
+
+Las lecturas de historial usan reservation_history(), la unión de las dos
+tablas (equivalente a la vista reservations_history de la migración 0013).
+"""
+
+import logging
+import os
+from datetime import datetime, timedelta
+
+from sqlalchemy import bindparam, delete, exists, func, insert, literal, select, text, union_all
+
+from background_jobs import register_job
+from db import db
+from reservation import Reservation
+from waitlist import WaitlistEntry
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_AFTER_DAYS = int(os.getenv('ARCHIVE_AFTER_DAYS', 90))
+ARCHIVE_BATCH = int(os.getenv('ARCHIVE_BATCH', 500))
+ARCHIVE_MAX_BATCHES = int(os.getenv('ARCHIVE_MAX_BATCHES', 20))
+ARCHIVE_INTERVAL = float(os.getenv('ARCHIVE_INTERVAL', 3600))
+
+TERMINAL_STATUSES = ['completed', 'cancelled']
+HISTORY_COLUMNS = ['id', 'start_time', 'end_time', 'status', 'recurring', 'recurrence_pattern',
+                   'user_id', 'computer_id', 'created_at', 'updated_at']
+
+
+class ReservationArchive(db.Model):
+    __tablename__ = 'reservations_archive'
+    # Mismos índices que migrations/0013_reservation_archive.py
+    __table_args__ = (
+        db.Index('idx_reservations_archive_user_created', 'user_id', 'created_at'),
+        db.Index('idx_reservations_archive_computer_start', 'computer_id', 'start_time'),
+    )
+
+    # Conserva el id original de reservations
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    start_time = db.Column(db.DateTime, nullable=False)
+    end_time = db.Column(db.DateTime, nullable=False)
+    status = db.Column(db.String(20), nullable=False)
+    recurring = db.Column(db.Boolean, default=False)
+    recurrence_pattern = db.Column(db.String(50))
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    computer_id = db.Column(db.Integer, db.ForeignKey('computers.id', ondelete='CASCADE'), nullable=False)
+    created_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime)
+    archived_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+
+def reservation_history(filters=None):
+    """
+    Subconsulta con las reservas vivas y las archivadas (columnas de
+    HISTORY_COLUMNS). `filters(tabla)` devuelve las condiciones a aplicar; se
+    evalúa con Reservation y con ReservationArchive para filtrar cada rama
+    por separado y que cada una use sus propios índices.
+    """
+    branches = []
+    for model in (Reservation, ReservationArchive):
+        branch = select(*[getattr(model, name) for name in HISTORY_COLUMNS])
+        if filters is not None:
+            branch = branch.where(*filters(model))
+        branches.append(branch)
+    return union_all(*branches).subquery('reservation_history')
+
+
+def history_dict(row):
+    """Fila de reservation_history() con el formato de Reservation.to_dict()"""
+    return {name: value.isoformat() if isinstance(value, datetime) else value
+            for name, value in zip(HISTORY_COLUMNS, row)}
+
+
+def table_sizes():
+    """
+    {tabla: {'rows', 'data_bytes', 'index_bytes', 'free_bytes'}} de las dos
+    tablas. En MySQL sale de information_schema (filas estimadas por InnoDB);
+    en otros motores solo se cuentan las filas.
+    """
+    models = (Reservation, ReservationArchive)
+    if db.engine.dialect.name != 'mysql':
+        return {model.__tablename__: {'rows': db.session.execute(select(func.count()).select_from(model)).scalar()}
+                for model in models}
+
+    # Sin esto MySQL 8 devuelve estadísticas cacheadas hasta 24 horas
+    db.session.execute(text("SET SESSION information_schema_stats_expiry = 0"))
+    rows = db.session.execute(text(
+        "SELECT table_name, table_rows, data_length, index_length, data_free "
+        "FROM information_schema.tables "
+        "WHERE table_schema = DATABASE() AND table_name IN :tables"
+    ).bindparams(bindparam('tables', expanding=True)), {'tables': [model.__tablename__ for model in models]}).all()
+    return {name: {'rows': table_rows, 'data_bytes': data, 'index_bytes': index, 'free_bytes': free}
+            for name, table_rows, data, index, free in rows}
+
+
+def _format_sizes(sizes):
+    parts = []
+    for table, size in sizes.items():
+        detail = f"{size['rows']} filas"
+        if 'data_bytes' in size:
+            detail += f", {(size['data_bytes'] + size['index_bytes']) / 1024 / 1024:.1f} MB"
+        parts.append(f"{table}: {detail}")
+    return '; '.join(parts)
+
+
+def _archive_batch(cutoff, batch_size):
+    """Mueve un lote de reservas terminadas al archivo. Devuelve cuántas movió"""
+    ids = db.session.execute(
+        select(Reservation.id)
+        .where(
+            Reservation.status.in_(TERMINAL_STATUSES),
+            Reservation.end_time < cutoff,
+            ~exists().where(WaitlistEntry.reservation_id == Reservation.id)
+        )
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    ).scalars().all()
+    if not ids:
+        return 0
+
+    db.session.execute(
+        insert(ReservationArchive).from_select(
+            HISTORY_COLUMNS + ['archived_at'],
+            select(*[getattr(Reservation, name) for name in HISTORY_COLUMNS], literal(datetime.utcnow()))
+            .where(Reservation.id.in_(ids))
+        )
+    )
+    db.session.execute(
+        delete(Reservation).where(Reservation.id.in_(ids)).execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    return len(ids)
+
+
+def archive_reservations(now=None, after_days=None, batch_size=None, max_batches=None):
+    """
+    Archiva las reservas terminadas que acabaron antes de now - after_days.
+    Devuelve (total archivado, tamaños antes, tamaños después).
+    """
+    # Las reservas se guardan en hora local sin zona (igual que en reservation.py)
+    now = now or datetime.now()
+    after_days = ARCHIVE_AFTER_DAYS if after_days is None else after_days
+    batch_size = batch_size or ARCHIVE_BATCH
+    max_batches = max_batches or ARCHIVE_MAX_BATCHES
+    cutoff = now - timedelta(days=after_days)
+
+    before = table_sizes()
+    total = 0
+    for _ in range(max_batches):
+        moved = _archive_batch(cutoff, batch_size)
+        total += moved
+        if moved < batch_size:
+            break
+    after = table_sizes() if total else before
+
+    if total:
+        logger.info(f"Archivo de reservas: {total} movidas (terminadas antes de {cutoff}). "
+                    f"Antes: {_format_sizes(before)}. Después: {_format_sizes(after)}")
+    return total, before, after
+
+
+register_job('reservation_archive', ARCHIVE_INTERVAL, archive_reservations)
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Mueve a reservations_archive las reservas terminadas antiguas y muestra el
+tamaño de ambas tablas antes y después (ver archive.py).
+
+Uso:
+    python archive_reservations.py                   # solo muestra los tamaños
+    python archive_reservations.py --run             # archiva con ARCHIVE_AFTER_DAYS
+    python archive_reservations.py --run --days 180 --batch 1000 --max-batches 100
+
+Tras archivar mucho, `OPTIMIZE TABLE reservations` devuelve al sistema el
+espacio libre (free_bytes).
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from main import app
+import archive
+
+
+def _print_sizes(title, sizes):
+    print(title)
+    for table, size in sizes.items():
+        line = f"   - {table}: {size['rows']} filas"
+        if 'data_bytes' in size:
+            line += (f", datos {size['data_bytes'] / 1024 / 1024:.1f} MB"
+                     f", índices {size['index_bytes'] / 1024 / 1024:.1f} MB"
+                     f", libre {size['free_bytes'] / 1024 / 1024:.1f} MB")
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--run', action='store_true', help='archivar (sin esto solo se muestran los tamaños)')
+    parser.add_argument('--days', type=int, default=archive.ARCHIVE_AFTER_DAYS,
+                        help='archivar las terminadas hace más de estos días')
+    parser.add_argument('--batch', type=int, default=archive.ARCHIVE_BATCH)
+    parser.add_argument('--max-batches', type=int, default=archive.ARCHIVE_MAX_BATCHES)
+    args = parser.parse_args()
+
+    with app.app_context():
+        if not args.run:
+            _print_sizes("📊 Tamaño actual", archive.table_sizes())
+            return
+        total, before, after = archive.archive_reservations(
+            after_days=args.days, batch_size=args.batch, max_batches=args.max_batches
+        )
+
+    _print_sizes("📊 Antes", before)
+    _print_sizes("📊 Después", after)
+    print(f"✅ {total} reservas archivadas (terminadas hace más de {args.days} días)")
+    if total == args.batch * args.max_batches:
+        print("ℹ️  Quedan más candidatas: vuelve a ejecutar o aumenta --max-batches")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,9 +1,10 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, g, request, jsonify
 import jwt
 import datetime
 from functools import wraps
 from db import db
-from user import User
+from user import User, USER_PROJECTION
+from fast_json import json_response, sparse_fields
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -12,6 +13,11 @@ SECRET_KEY = 'your_secret_key'  # En producción, usa variable de entorno
 def token_required(f):
     @wraps(f)
     def decorated(*args, **kwargs):
+        # Sub-petición de /api/batch: el token ya se validó al recibir el lote
+        batch_user = g.get('batch_user')
+        if batch_user is not None:
+            return f(batch_user, *args, **kwargs)
+
         token = None
 
         if 'Authorization' in request.headers:
@@ -160,9 +166,9 @@ def get_user_by_id(current_user, user_id):
 # Obtener todos los usuarios (solo admin y superuser)
 @auth_bp.route('/users', methods=['GET'])
 @token_required
-def get_all_users(current_user):
+@sparse_fields(USER_PROJECTION)
+def get_all_users(current_user, fields):
     if current_user.role not in ['admin', 'superuser']:
         return jsonify({'message': 'Acceso denegado: se requiere rol admin o superuser'}), 403
 
-    users = User.query.all()
-    return jsonify([user.to_dict() for user in users]), 200
+    return json_response(USER_PROJECTION.rows(db.session, fields)), 200
@@ -0,0 +1,141 @@
+"""
+Disponibilidad por franjas con bitsets enteros.
+
+Un día se divide en franjas de `granularity` minutos (15, 30 o 60) y la
+ocupación se representa como un entero donde el bit i indica la franja i
+contada desde la medianoche. Convertir un intervalo en máscara es aritmética
+entera (sin recorrer franjas), y combinar reservas, ventanas de mantenimiento
+y el horario del laboratorio son OR/AND de enteros.
+
+Las plantillas de franjas de cada laboratorio (máscara de su horario) se
+cachean en memoria y se invalidan desde update_lab/delete_lab.
+"""
+
+import os
+import threading
+from datetime import datetime, time, timedelta
+
+GRANULARITIES = (15, 30, 60)
+DEFAULT_GRANULARITY = int(os.getenv('AVAILABILITY_SLOT_MINUTES', 60))
+MINUTES_PER_DAY = 24 * 60
+
+
+def parse_granularity(value):
+    """Valida el parámetro `granularity` (minutos). Lanza ValueError si no es 15, 30 o 60"""
+    if value in (None, ''):
+        return DEFAULT_GRANULARITY
+    try:
+        granularity = int(value)
+    except (TypeError, ValueError):
+        granularity = None
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"granularity debe ser uno de {', '.join(map(str, GRANULARITIES))}")
+    return granularity
+
+
+def naive(value):
+    """Las horas se guardan sin zona; descarta tzinfo si el cliente envió una"""
+    return value.replace(tzinfo=None) if value is not None and value.tzinfo else value
+
+
+def day_start(target_date):
+    return datetime.combine(target_date, time(0, 0))
+
+
+def slots_per_day(granularity):
+    return MINUTES_PER_DAY // granularity
+
+
+def interval_mask(target_date, start, end, granularity):
+    """
+    Máscara de las franjas del día que se solapan con [start, end).
+    Un intervalo que toca parte de una franja la ocupa entera.
+    """
+    start, end = naive(start), naive(end)
+    origin = day_start(target_date)
+    total = slots_per_day(granularity)
+    step = granularity * 60
+
+    first_seconds = (start - origin).total_seconds()
+    last_seconds = (end - origin).total_seconds()
+    first = max(0, int(first_seconds // step))
+    last = min(total, -int(-last_seconds // step))  # techo
+    if last <= first:
+        return 0
+    return ((1 << (last - first)) - 1) << first
+
+
+def mask_from_intervals(target_date, intervals, granularity):
+    mask = 0
+    for start, end in intervals:
+        mask |= interval_mask(target_date, start, end, granularity)
+    return mask
+
+
+def rescale(mask, from_granularity, to_granularity):
+    """
+    Pasa una máscara a una granularidad mayor (múltiplo de la original): la
+    franja grande queda ocupada si lo está alguna de sus sub-franjas.
+    """
+    if from_granularity == to_granularity:
+        return mask
+    ratio = to_granularity // from_granularity
+    group = (1 << ratio) - 1
+    result = 0
+    for index in range(slots_per_day(to_granularity)):
+        if (mask >> (index * ratio)) & group:
+            result |= 1 << index
+    return result
+
+
+def slot_bits(mask):
+    """Índices de los bits encendidos, en orden"""
+    bits = []
+    while mask:
+        low = mask & -mask
+        bits.append(low.bit_length() - 1)
+        mask ^= low
+    return bits
+
+
+def slot_start(target_date, index, granularity):
+    return day_start(target_date) + timedelta(minutes=index * granularity)
+
+
+# --- Plantillas por laboratorio ---------------------------------------------------
+
+_templates = {}  # (laboratory_id, granularity, apertura, cierre) -> máscara del horario
+_templates_lock = threading.Lock()
+
+
+def lab_template(laboratory, granularity):
+    """Máscara de las franjas dentro del horario del laboratorio (cacheada)"""
+    # El horario forma parte de la clave: otra réplica que cambie el horario no deja la plantilla vieja
+    key = (laboratory.id, granularity, laboratory.opening_time, laboratory.closing_time)
+    with _templates_lock:
+        mask = _templates.get(key)
+    if mask is not None:
+        return mask
+
+    opening = laboratory.opening_time or time(0, 0)
+    closing = laboratory.closing_time or time(0, 0)
+    open_minutes = opening.hour * 60 + opening.minute
+    close_minutes = closing.hour * 60 + closing.minute
+    if close_minutes <= open_minutes:
+        # Cierra a medianoche (o el horario no es válido): hasta el final del día
+        close_minutes = MINUTES_PER_DAY
+    # Solo franjas completas dentro del horario
+    first = -(-open_minutes // granularity)
+    last = close_minutes // granularity
+    mask = ((1 << (last - first)) - 1) << first if last > first else 0
+
+    with _templates_lock:
+        _templates[key] = mask
+    return mask
+
+
+def invalidate_lab_templates(laboratory_id):
+    """Se llama al cambiar el horario de un laboratorio o eliminarlo"""
+    with _templates_lock:
+        for key in [key for key in _templates if key[0] == laboratory_id]:
+            del _templates[key]
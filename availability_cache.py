@@ -0,0 +1,136 @@
+"""
+Caché de /api/reservations/availability y /occupied-hours por (computadora, día).
+
+Cada par (computer_id, fecha) tiene una generación en el almacén compartido
+(cache_store.py); la clave de la respuesta la incluye, así que invalidar un
+par es una sola escritura y no hace falta conocer todas las variantes
+cacheadas (granularidad, endpoint). Cambiar el horario de un laboratorio
+renueva una generación global. Las generaciones son tokens aleatorios y no
+contadores: si una se pierde (LRU, TTL) se crea otra distinta y las
+respuestas guardadas con la anterior ya no se vuelven a leer.
+
+Sin almacén compartido (sin REDIS_URL) cada réplica tiene su propia caché y
+no ve las invalidaciones de las otras, así que el TTL por defecto baja de
+300 a 5 segundos: es lo que puede tardar otra réplica en reflejar un cambio.
+
+Tasa de aciertos en /metrics: availability_cache_requests_total por
+resultado (hit/miss) e invalidaciones en availability_cache_invalidations_total
+por motivo.
+
+Las invalidaciones se registran en la sesión y se aplican tras el commit,
+como la versión del catálogo (ver catalog_cache.py): un rollback no invalida
+nada y una lectura concurrente no puede volver a guardar datos viejos con la
+generación nueva.
+"""
+
+import os
+import secrets
+from datetime import date
+from functools import wraps
+
+from flask import g, make_response, request
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from cache_store import store
+from db import db
+from metrics import AVAILABILITY_CACHE_INVALIDATIONS, AVAILABILITY_CACHE_REQUESTS
+
+TTL = int(os.getenv('AVAILABILITY_CACHE_TTL', 300 if store.shared else 5))
+# Las generaciones duran más que las respuestas que dependen de ellas
+GENERATION_TTL = TTL * 4
+
+_GLOBAL_GENERATION = 'availability:gen:all'
+
+
+def _generation_key(computer_id, day):
+    return f'availability:gen:{computer_id}:{day.isoformat()}'
+
+
+def _new_generation():
+    return secrets.token_hex(8)
+
+
+def _generations(keys):
+    """Generación actual de cada clave; crea las que falten"""
+    values = store.get_many(keys)
+    for index, (key, value) in enumerate(zip(keys, values)):
+        if value is None:
+            token = _new_generation()
+            values[index] = token if store.add(key, token, ttl=GENERATION_TTL) else store.get(key) or token
+    return [value.decode() if isinstance(value, bytes) else value for value in values]
+
+
+def invalidate(pairs, reason):
+    """Marca para invalidar tras el commit los pares (computer_id, día)"""
+    if not pairs:
+        return
+    pending = db.session.info.setdefault('availability_invalidations', {})
+    pending.setdefault(reason, set()).update(pairs)
+
+
+def invalidate_all(reason):
+    """Invalida toda la caché de disponibilidad (p. ej. cambio de horario de un laboratorio)"""
+    store.set(_GLOBAL_GENERATION, _new_generation(), ttl=GENERATION_TTL)
+    AVAILABILITY_CACHE_INVALIDATIONS.labels(reason).inc()
+
+
+@event.listens_for(Session, 'after_commit')
+def _apply_invalidations(session):
+    pending = session.info.pop('availability_invalidations', None)
+    for reason, pairs in (pending or {}).items():
+        for computer_id, day in pairs:
+            store.set(_generation_key(computer_id, day), _new_generation(), ttl=GENERATION_TTL)
+        AVAILABILITY_CACHE_INVALIDATIONS.labels(reason).inc(len(pairs))
+
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_invalidations(session):
+    session.info.pop('availability_invalidations', None)
+
+
+def _request_pair():
+    computer_id = request.args.get('computer_id', type=int)
+    try:
+        day = date.fromisoformat((request.args.get('date') or '')[:10])
+    except ValueError:
+        return None
+    if not computer_id:
+        return None
+    return computer_id, day
+
+
+def availability_cached(name):
+    """
+    Decorador para los GET de disponibilidad de una computadora en un día.
+    Solo se cachean respuestas 200; los parámetros inválidos pasan directo a la vista.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            pair = _request_pair()
+            if pair is None:
+                return view(*args, **kwargs)
+
+            computer_id, day = pair
+            generation, global_generation = _generations([_generation_key(computer_id, day), _GLOBAL_GENERATION])
+            variant = request.args.get('granularity', '')
+            key = f'availability:{name}:{computer_id}:{day.isoformat()}:{variant}:{generation}:{global_generation}'
+
+            body = store.get(key)
+            if body is not None:
+                AVAILABILITY_CACHE_REQUESTS.labels(name, 'hit').inc()
+                response = make_response(body, 200)
+                response.mimetype = 'application/json'
+                return response
+
+            AVAILABILITY_CACHE_REQUESTS.labels(name, 'miss').inc()
+            # Rellenar desde el primario: una réplica atrasada dejaría datos viejos con la generación nueva
+            g.db_read_only = False
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200:
+                store.set(key, response.get_data(), ttl=TTL)
+            return response
+
+        return wrapper
+    return decorator
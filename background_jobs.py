@@ -0,0 +1,128 @@
+"""
+Tareas periódicas del backend con elección de líder.
+
+El Deployment corre varias réplicas y cada tarea debe ejecutarse en una sola.
+El líder es el proceso que tiene el lock con nombre de MySQL (GET_LOCK)
+BACKGROUND_JOBS_LOCK sobre una conexión propia que mantiene abierta: si el
+pod muere, MySQL cierra la conexión y libera el lock, y otra réplica lo toma
+en su siguiente intento. Con una base que no es MySQL (desarrollo con SQLite)
+el proceso se considera líder siempre.
+
+Las tareas se registran con `register_job(nombre, intervalo, función)` y
+corren dentro de un app context en un greenlet de Socket.IO. Se arrancan con
+`start_background_jobs(app)` desde main.py (no al importar, para que
+migrate.py y los scripts no lancen tareas).
+
+Variables de entorno:
+  - BACKGROUND_JOBS_ENABLED: 'false' para no arrancar ninguna tarea
+  - BACKGROUND_JOBS_TICK: cada cuántos segundos se revisan las tareas (default 5)
+"""
+
+import logging
+import os
+import time
+
+from sqlalchemy import text
+
+from db import db
+from socket_manager import socketio
+
+logger = logging.getLogger(__name__)
+
+LOCK_NAME = os.getenv('BACKGROUND_JOBS_LOCK', 'reservas_background_jobs')
+TICK_SECONDS = float(os.getenv('BACKGROUND_JOBS_TICK', 5))
+
+_jobs = []  # [{'name', 'interval', 'func', 'next_run'}]
+
+
+def register_job(name, interval, func):
+    """Registra una tarea periódica. `func()` se llama sin argumentos en un app context"""
+    _jobs.append({'name': name, 'interval': float(interval), 'func': func, 'next_run': 0.0})
+
+
+class LeaderLock:
+    """Lock con nombre de MySQL retenido en una conexión dedicada"""
+
+    def __init__(self, name):
+        self.name = name
+        self._connection = None
+
+    def _release_connection(self):
+        if self._connection is not None:
+            try:
+                self._connection.close()
+            except Exception:
+                pass
+            self._connection = None
+
+    def is_leader(self):
+        """Intenta obtener o confirmar el liderazgo. No bloquea"""
+        engine = db.engines[None]
+        if engine.dialect.name != 'mysql':
+            return True
+
+        try:
+            if self._connection is not None:
+                # Confirmar que la conexión que tiene el lock sigue viva
+                owner = self._connection.execute(
+                    text("SELECT IS_USED_LOCK(:name) = CONNECTION_ID()"), {'name': self.name}
+                ).scalar()
+                if owner:
+                    return True
+                logger.warning(f"Se perdió el lock {self.name}")
+                self._release_connection()
+
+            connection = engine.connect()
+            acquired = connection.execute(
+                text("SELECT GET_LOCK(:name, 0)"), {'name': self.name}
+            ).scalar()
+            if acquired:
+                self._connection = connection
+                logger.info(f"Este proceso es líder de las tareas en segundo plano ({self.name})")
+                return True
+            connection.close()
+            return False
+        except Exception as e:
+            logger.error(f"Error comprobando el lock {self.name}: {e}")
+            self._release_connection()
+            return False
+
+
+leader_lock = LeaderLock(LOCK_NAME)
+
+
+def run_due_jobs(now=None):
+    """Ejecuta las tareas vencidas si este proceso es el líder"""
+    now = time.monotonic() if now is None else now
+    due = [job for job in _jobs if job['next_run'] <= now]
+    if not due or not leader_lock.is_leader():
+        return
+
+    for job in due:
+        job['next_run'] = now + job['interval']
+        started = time.perf_counter()
+        try:
+            job['func']()
+        except Exception as e:
+            logger.exception(f"Error en la tarea {job['name']}: {e}")
+            db.session.rollback()
+        finally:
+            db.session.remove()
+        elapsed = time.perf_counter() - started
+        if elapsed > job['interval']:
+            logger.warning(f"La tarea {job['name']} tardó {elapsed:.1f}s, más que su intervalo")
+
+
+def start_background_jobs(app):
+    if os.getenv('BACKGROUND_JOBS_ENABLED', 'true').lower() == 'false':
+        logger.info("Tareas en segundo plano deshabilitadas")
+        return None
+
+    def loop():
+        while True:
+            with app.app_context():
+                run_due_jobs()
+            socketio.sleep(TICK_SECONDS)
+
+    logger.info(f"Tareas en segundo plano: {', '.join(job['name'] for job in _jobs) or 'ninguna'}")
+    return socketio.start_background_task(loop)
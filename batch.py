@@ -0,0 +1,151 @@
+"""
+POST /api/batch: varios GET en un solo viaje de ida y vuelta.
+
+Cuerpo:
+  {"requests": [{"id": "lab", "path": "/api/labs/3"},
+                {"id": "pcs", "path": "/api/computers/laboratory/3"},
+                {"id": "pc7", "path": "/api/reservations/occupied-hours?computer_id=7&date=2025-05-01"}]}
+
+Respuesta (mismo orden de ejecución, indexada por id del cliente):
+  {"responses": {"lab": {"status": 200, "body": {...}}, ...}}
+
+Cada sub-petición se despacha por la aplicación con sus hooks normales
+(réplicas de lectura, caché del catálogo, métricas) dentro del mismo contexto
+de aplicación, así que comparten la sesión de base de datos. El token se
+valida una sola vez: token_required usa el usuario del lote (g.batch_user) en
+lugar de volver a decodificar el JWT y buscar al usuario.
+
+Límites: BATCH_MAX_REQUESTS sub-peticiones y BATCH_MAX_COST de costo total,
+donde cada endpoint cuesta 1 salvo los de ENDPOINT_COSTS. Solo se aceptan
+GET de los blueprints de ALLOWED_BLUEPRINTS.
+"""
+
+import os
+from urllib.parse import urlsplit
+
+from flask import Blueprint, current_app, g, jsonify, request
+from werkzeug.exceptions import HTTPException
+from werkzeug.routing import RequestRedirect
+
+from auth import token_required
+from db import db
+from read_replica import CONSISTENCY_HEADER
+
+batch_bp = Blueprint('batch', __name__)
+
+MAX_REQUESTS = int(os.getenv('BATCH_MAX_REQUESTS', 50))
+MAX_COST = int(os.getenv('BATCH_MAX_COST', 100))
+
+ALLOWED_BLUEPRINTS = {'labs', 'computers', 'reservations', 'maintenance', 'waitlist', 'dashboard', 'admin'}
+
+# Endpoints que leen mucho más que una fila o un día
+ENDPOINT_COSTS = {
+    'reservations.get_all_reservations': 20,
+    'reservations.get_lab_week_availability': 5,
+    'admin.get_admin_reservations': 5,
+    'dashboard.get_student_dashboard': 4,
+    'computers.get_all_computers': 2,
+}
+
+# Estadísticas de consultas de query_stats.py: se reinician por sub-petición
+_QUERY_STATS_KEYS = ('db_query_count', 'db_query_time', 'db_statements')
+
+
+def _resolve(path):
+    """
+    (endpoint, path) si es un GET permitido; (None, (status, mensaje)) si no.
+    Sigue la redirección de la barra final (/api/computers -> /api/computers/).
+    """
+    adapter = current_app.url_map.bind('')
+    route, _, query = path.partition('?')
+    try:
+        try:
+            endpoint, _ = adapter.match(route, method='GET')
+        except RequestRedirect as e:
+            route = urlsplit(e.new_url).path
+            endpoint, _ = adapter.match(route, method='GET')
+    except HTTPException as e:
+        return None, (e.code, 'Ruta no encontrada' if e.code == 404 else e.description)
+    if endpoint.split('.', 1)[0] not in ALLOWED_BLUEPRINTS:
+        return None, (400, 'Ruta no permitida en un lote')
+    return endpoint, f'{route}?{query}' if query else route
+
+
+def _dispatch(path):
+    """Ejecuta un GET dentro del contexto de aplicación actual y devuelve (status, body)"""
+    # Sin Accept-Encoding (el cuerpo se incrusta en la respuesta del lote); las
+    # cookies y la cabecera de consistencia mantienen el read-your-writes
+    headers = {'Accept': 'application/json'}
+    for name in ('Cookie', CONSISTENCY_HEADER):
+        if name in request.headers:
+            headers[name] = request.headers[name]
+
+    saved = vars(g).copy()
+    for key in _QUERY_STATS_KEYS:
+        vars(g).pop(key, None)
+    try:
+        with current_app.test_request_context(path, method='GET', headers=headers):
+            try:
+                response = current_app.full_dispatch_request()
+            except Exception as e:
+                db.session.rollback()
+                current_app.logger.exception(f"Error en sub-petición de lote {path}: {e}")
+                return 500, {'message': 'Error interno en la sub-petición'}
+            body = response.get_json(silent=True) if response.is_json else None
+            if body is None and response.status_code != 304:
+                body = response.get_data(as_text=True)
+            return response.status_code, body
+    finally:
+        sub = vars(g).copy()
+        vars(g).clear()
+        vars(g).update(saved)
+        # El lote acumula las consultas de sus sub-peticiones
+        g.db_query_count = saved.get('db_query_count', 0) + sub.get('db_query_count', 0)
+        g.db_query_time = saved.get('db_query_time', 0.0) + sub.get('db_query_time', 0.0)
+
+
+@batch_bp.route('', methods=['POST'])
+@token_required
+def run_batch(current_user):
+    data = request.get_json(silent=True) or {}
+    items = data.get('requests')
+    if not isinstance(items, list) or not items:
+        return jsonify({'message': 'Se requiere una lista "requests" con al menos una sub-petición'}), 400
+    if len(items) > MAX_REQUESTS:
+        return jsonify({'message': f'Máximo {MAX_REQUESTS} sub-peticiones por lote'}), 400
+
+    planned = []
+    errors = {}
+    cost = 0
+    for index, item in enumerate(items):
+        if not isinstance(item, dict) or not isinstance(item.get('path'), str):
+            return jsonify({'message': f'La sub-petición {index} debe tener "path"'}), 400
+        client_id = str(item.get('id', index))
+        if client_id in errors or any(client_id == planned_id for planned_id, _ in planned):
+            return jsonify({'message': f'id repetido en el lote: {client_id}'}), 400
+        if (item.get('method') or 'GET').upper() != 'GET':
+            errors[client_id] = (405, 'Solo se permiten GET en un lote')
+            continue
+
+        endpoint, resolved = _resolve(item['path'])
+        if endpoint is None:
+            errors[client_id] = resolved
+            continue
+        cost += ENDPOINT_COSTS.get(endpoint, 1)
+        planned.append((client_id, resolved))
+
+    if cost > MAX_COST:
+        return jsonify({'message': f'El lote supera el costo máximo ({cost} > {MAX_COST})'}), 400
+
+    responses = {client_id: {'status': status, 'body': {'message': message}}
+                 for client_id, (status, message) in errors.items()}
+
+    g.batch_user = current_user
+    try:
+        for client_id, path in planned:
+            status, body = _dispatch(path)
+            responses[client_id] = {'status': status, 'body': body}
+    finally:
+        g.pop('batch_user', None)
+
+    return jsonify({'responses': responses})
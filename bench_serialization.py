@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark de serialización de reservas.
+
+Compara, para N reservas (10.000 por defecto), la ruta actual de to_dict() +
+jsonify contra la ruta rápida de fast_json (select de columnas + serializador
+generado + orjson). Usa una base SQLite en memoria para que la medición
+incluya la consulta y la hidratación, no solo el volcado a JSON.
+
+Uso:
+    python bench_serialization.py [--rows 10000] [--repeat 5]
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from flask import Flask, jsonify
+from sqlalchemy.pool import StaticPool
+
+from db import db
+from user import User
+from laboratory import Laboratory
+from computer import Computer
+from reservation import Reservation, RESERVATION_PROJECTION
+from fast_json import json_response
+
+
+def build_app():
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+        'poolclass': StaticPool,
+        'connect_args': {'check_same_thread': False},
+    }
+    db.init_app(app)
+    return app
+
+
+def seed(rows):
+    db.create_all()
+    user = User(email='bench@example.com', password='x', name='Bench', role='student')
+    lab = Laboratory(name='Lab', location='Bench', capacity=rows,
+                     opening_time=datetime(2000, 1, 1, 7).time(),
+                     closing_time=datetime(2000, 1, 1, 18).time())
+    db.session.add_all([user, lab])
+    db.session.flush()
+    computer = Computer(name='PC-1', hostname='pc-1.bench', laboratory_id=lab.id)
+    db.session.add(computer)
+    db.session.flush()
+
+    start = datetime(2030, 1, 1, 7)
+    now = datetime.utcnow()
+    db.session.execute(Reservation.__table__.insert(), [
+        {
+            'start_time': start + timedelta(hours=i),
+            'end_time': start + timedelta(hours=i + 1),
+            'status': 'confirmed',
+            'recurring': False,
+            'user_id': user.id,
+            'computer_id': computer.id,
+            'created_at': now,
+            'updated_at': now,
+        }
+        for i in range(rows)
+    ])
+    db.session.commit()
+
+
+def current_path():
+    reservations = Reservation.query.all()
+    return jsonify([r.to_dict() for r in reservations]).get_data()
+
+
+def fast_path():
+    return json_response(RESERVATION_PROJECTION.rows(db.session)).get_data()
+
+
+def measure(label, func, rows, repeat):
+    best = None
+    for _ in range(repeat):
+        # Vaciar el identity map para que cada vuelta vuelva a hidratar
+        db.session.expunge_all()
+        started = time.perf_counter()
+        body = func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"{label:<28} {best * 1000:9.1f} ms  {rows / best:12,.0f} filas/s  {len(body):>10,} bytes")
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    app = build_app()
+    with app.app_context(), app.test_request_context():
+        seed(args.rows)
+
+        print(f"📊 Serializando {args.rows:,} reservas (mejor de {args.repeat})")
+        print("=" * 72)
+        slow = measure('to_dict() + jsonify', current_path, args.rows, args.repeat)
+        fast = measure('select + orjson (fast_json)', fast_path, args.rows, args.repeat)
+        print("=" * 72)
+        print(f"⚡ Aceleración: {slow / fast:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
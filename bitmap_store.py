@@ -0,0 +1,238 @@
+"""
+Bitmaps persistidos de ocupación por computadora y día.
+
+Cada fila de computer_day_bitmaps guarda las 96 franjas de 15 minutos de un
+día como dos enteros de 48 bits (am_bits: franjas 0-47, pm_bits: 48-95), con
+un bit encendido por franja que toca alguna reserva no cancelada (pendiente,
+confirmada o completada). Las ventanas de mantenimiento no se guardan aquí.
+
+  - Al crear una reserva se hace OR de su máscara en la fila (UPDATE atómico).
+  - Al cancelar o cambiar el estado se recalculan solo los días afectados.
+  - Si falta la fila de un día, las lecturas la calculan desde reservations
+    en memoria sin guardarla (pueden ir a una réplica de solo lectura); la
+    crean las escrituras de ese día o rebuild_bitmaps.py --fill-missing.
+
+Los bitmaps son una caché para las lecturas de disponibilidad: crear una
+reserva siempre comprueba el solape exacto en reservations con la fila de la
+computadora bloqueada, así que un bitmap desfasado (p. ej. tras archivar) no
+permite reservas dobles. rebuild_bitmaps.py verifica o reconstruye la tabla.
+"""
+
+from datetime import timedelta
+
+from sqlalchemy import and_, bindparam, or_, select, update
+from sqlalchemy.exc import IntegrityError
+
+import availability
+from availability_cache import invalidate
+from db import db
+
+GRANULARITY = 15
+HALF_BITS = 48
+HALF_MASK = (1 << HALF_BITS) - 1
+OCCUPYING_STATUSES = ['pending', 'confirmed', 'completed']
+
+
+class ComputerDayBitmap(db.Model):
+    __tablename__ = 'computer_day_bitmaps'
+
+    computer_id = db.Column(db.Integer, db.ForeignKey('computers.id', ondelete='CASCADE'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    am_bits = db.Column(db.BigInteger, nullable=False, default=0)
+    pm_bits = db.Column(db.BigInteger, nullable=False, default=0)
+
+    @property
+    def mask(self):
+        return join_mask(self.am_bits, self.pm_bits)
+
+
+def split_mask(mask):
+    return mask & HALF_MASK, mask >> HALF_BITS
+
+
+def join_mask(am_bits, pm_bits):
+    return (am_bits or 0) | ((pm_bits or 0) << HALF_BITS)
+
+
+def day_masks(start, end):
+    """{día: máscara de 15 minutos} de un intervalo que puede cruzar la medianoche"""
+    start, end = availability.naive(start), availability.naive(end)
+    masks = {}
+    day = start.date()
+    while availability.day_start(day) < end:
+        mask = availability.interval_mask(day, start, end, GRANULARITY)
+        if mask:
+            masks[day] = mask
+        day += timedelta(days=1)
+    return masks
+
+
+def _reservation_model():
+    # Import diferido: reservation importa este módulo
+    from reservation import Reservation
+    return Reservation
+
+
+def compute_masks(pairs):
+    """Calcula desde reservations las máscaras de los pares (computer_id, día), con una consulta"""
+    Reservation = _reservation_model()
+    pairs = set(pairs)
+    if not pairs:
+        return {}
+
+    computer_ids = {computer_id for computer_id, _ in pairs}
+    first_day = min(day for _, day in pairs)
+    last_day = max(day for _, day in pairs)
+    rows = db.session.execute(
+        select(Reservation.computer_id, Reservation.start_time, Reservation.end_time).where(
+            Reservation.computer_id.in_(computer_ids),
+            Reservation.status.in_(OCCUPYING_STATUSES),
+            Reservation.start_time < availability.day_start(last_day + timedelta(days=1)),
+            Reservation.end_time > availability.day_start(first_day)
+        )
+    ).all()
+
+    masks = {pair: 0 for pair in pairs}
+    for computer_id, start, end in rows:
+        for day, mask in day_masks(start, end).items():
+            if (computer_id, day) in masks:
+                masks[(computer_id, day)] |= mask
+    return masks
+
+
+def _store(masks):
+    """Guarda las máscaras calculadas (actualiza las filas existentes e inserta las que faltan)"""
+    if not masks:
+        return
+    table = ComputerDayBitmap.__table__
+    existing = set(db.session.execute(
+        select(table.c.computer_id, table.c.day).where(
+            or_(*[and_(table.c.computer_id == computer_id, table.c.day == day) for computer_id, day in masks])
+        )
+    ).all())
+
+    updates = []
+    inserts = []
+    for (computer_id, day), mask in masks.items():
+        am_bits, pm_bits = split_mask(mask)
+        row = {'b_computer_id': computer_id, 'b_day': day, 'am_bits': am_bits, 'pm_bits': pm_bits}
+        (updates if (computer_id, day) in existing else inserts).append(row)
+
+    if inserts:
+        try:
+            with db.session.begin_nested():
+                db.session.execute(table.insert(), [
+                    {'computer_id': r['b_computer_id'], 'day': r['b_day'],
+                     'am_bits': r['am_bits'], 'pm_bits': r['pm_bits']}
+                    for r in inserts
+                ])
+        except IntegrityError:
+            # Otra petición creó la fila a la vez: el valor recalculado es el mismo
+            updates += inserts
+    if updates:
+        db.session.execute(
+            update(table)
+            .where(table.c.computer_id == bindparam('b_computer_id'), table.c.day == bindparam('b_day'))
+            .values(am_bits=bindparam('am_bits'), pm_bits=bindparam('pm_bits')),
+            updates
+        )
+
+
+def refresh(pairs, reason='reservation'):
+    """Recalcula y guarda los bitmaps de esos (computer_id, día). Dentro de la transacción del llamador"""
+    _store(compute_masks(pairs))
+    invalidate(pairs, reason)
+
+
+def pairs_for(computer_id, start, end):
+    return {(computer_id, day) for day in day_masks(start, end)}
+
+
+def mark_reserved(computer_id, start, end):
+    """
+    Enciende las franjas de una reserva nueva. La reserva ya debe estar en la
+    sesión (flush) para que los días sin fila se calculen incluyéndola.
+    """
+    table = ComputerDayBitmap.__table__
+    missing = set()
+    for day, mask in day_masks(start, end).items():
+        am_bits, pm_bits = split_mask(mask)
+        updated = db.session.execute(
+            update(table)
+            .where(table.c.computer_id == computer_id, table.c.day == day)
+            .values(am_bits=table.c.am_bits.op('|')(am_bits), pm_bits=table.c.pm_bits.op('|')(pm_bits))
+        ).rowcount
+        if not updated:
+            missing.add((computer_id, day))
+    _store(compute_masks(missing))
+    invalidate(pairs_for(computer_id, start, end), 'reservation')
+
+
+def occupied_masks(pairs):
+    """Máscaras de 15 minutos de esos (computer_id, día); las que falten se calculan sin guardarlas"""
+    pairs = set(pairs)
+    if not pairs:
+        return {}
+    table = ComputerDayBitmap.__table__
+    found = {}
+    computer_ids = {computer_id for computer_id, _ in pairs}
+    days = {day for _, day in pairs}
+    for computer_id, day, am_bits, pm_bits in db.session.execute(
+        select(table.c.computer_id, table.c.day, table.c.am_bits, table.c.pm_bits).where(
+            table.c.computer_id.in_(computer_ids), table.c.day.in_(days)
+        )
+    ):
+        if (computer_id, day) in pairs:
+            found[(computer_id, day)] = join_mask(am_bits, pm_bits)
+
+    # Sin escribir: la sesión puede estar en una réplica de solo lectura
+    found.update(compute_masks(pairs - set(found)))
+    return found
+
+
+def occupied_mask(computer_id, day):
+    return occupied_masks({(computer_id, day)})[(computer_id, day)]
+
+
+def verify(start_day, end_day, fix=False, computer_ids=None, include_missing=False):
+    """
+    Compara los bitmaps guardados con los recalculados desde reservations en
+    [start_day, end_day]. Devuelve la lista de (computer_id, día, guardado,
+    esperado) distintos; con fix=True los corrige. Las filas ausentes solo se
+    cuentan con include_missing=True (se calculan igual al pedirlas).
+    """
+    Reservation = _reservation_model()
+    table = ComputerDayBitmap.__table__
+
+    stored_query = select(table.c.computer_id, table.c.day, table.c.am_bits, table.c.pm_bits).where(
+        table.c.day >= start_day, table.c.day <= end_day
+    )
+    reservation_query = select(Reservation.computer_id, Reservation.start_time, Reservation.end_time).where(
+        Reservation.status.in_(OCCUPYING_STATUSES),
+        Reservation.start_time < availability.day_start(end_day + timedelta(days=1)),
+        Reservation.end_time > availability.day_start(start_day)
+    )
+    if computer_ids:
+        stored_query = stored_query.where(table.c.computer_id.in_(computer_ids))
+        reservation_query = reservation_query.where(Reservation.computer_id.in_(computer_ids))
+
+    stored = {(c, d): join_mask(am, pm) for c, d, am, pm in db.session.execute(stored_query)}
+    expected = {}
+    for computer_id, start, end in db.session.execute(reservation_query):
+        for day, mask in day_masks(start, end).items():
+            if start_day <= day <= end_day:
+                expected[(computer_id, day)] = expected.get((computer_id, day), 0) | mask
+
+    mismatches = []
+    for pair in set(stored) | set(expected):
+        if pair not in stored and (not include_missing or not expected.get(pair)):
+            continue
+        if stored.get(pair) != expected.get(pair, 0):
+            mismatches.append((pair[0], pair[1], stored.get(pair), expected.get(pair, 0)))
+
+    if fix and mismatches:
+        fixed = {(computer_id, day): value for computer_id, day, _, value in mismatches}
+        _store(fixed)
+        invalidate(set(fixed), 'rebuild')
+        db.session.commit()
+    return sorted(mismatches)
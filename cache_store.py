@@ -0,0 +1,135 @@
+"""
+Almacén clave-valor compartido para cachés de respuestas.
+
+Con REDIS_URL definido (y el paquete redis instalado) las entradas se guardan
+en Redis y las comparten todas las réplicas. Sin él se usa LocalStore, un
+sustituto en memoria del proceso con la misma interfaz (get/set con TTL,
+get_many, add, delete), suficiente para desarrollo y para una sola réplica:
+las invalidaciones de un pod no llegan a los demás (`store.shared` es False
+y availability_cache.py usa entonces un TTL corto).
+
+LocalStore es un LRU de como máximo CACHE_LOCAL_MAX_ENTRIES claves; además,
+cada CACHE_LOCAL_SWEEP_INTERVAL segundos una escritura barre las entradas
+vencidas, que de otro modo solo se borran al volver a leer esa clave exacta.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+try:
+    import redis  # opcional: sin él se usa el almacén local
+except ImportError:
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+LOCAL_MAX_ENTRIES = int(os.getenv('CACHE_LOCAL_MAX_ENTRIES', 10000))
+LOCAL_SWEEP_INTERVAL = float(os.getenv('CACHE_LOCAL_SWEEP_INTERVAL', 60))
+
+
+class LocalStore:
+    shared = False
+
+    def __init__(self, max_entries=LOCAL_MAX_ENTRIES, sweep_interval=LOCAL_SWEEP_INTERVAL):
+        self._lock = threading.Lock()
+        self._data = OrderedDict()  # clave -> (valor, vence_en o None), de menos a más reciente
+        self._max_entries = max_entries
+        self._sweep_interval = sweep_interval
+        self._next_sweep = time.monotonic() + sweep_interval
+
+    def _alive(self, key, now):
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= now:
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def _put(self, key, value, ttl, now):
+        self._data[key] = (value, now + ttl if ttl else None)
+        self._data.move_to_end(key)
+        if now >= self._next_sweep:
+            self._next_sweep = now + self._sweep_interval
+            for expired in [k for k, (_, expires_at) in self._data.items()
+                            if expires_at is not None and expires_at <= now]:
+                del self._data[expired]
+        while len(self._data) > self._max_entries:
+            self._data.popitem(last=False)
+
+    def get(self, key):
+        with self._lock:
+            return self._alive(key, time.monotonic())
+
+    def get_many(self, keys):
+        now = time.monotonic()
+        with self._lock:
+            return [self._alive(key, now) for key in keys]
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._put(key, value, ttl, time.monotonic())
+
+    def add(self, key, value, ttl=None):
+        """Guarda solo si la clave no existe. Devuelve True si la guardó"""
+        now = time.monotonic()
+        with self._lock:
+            if self._alive(key, now) is not None:
+                return False
+            self._put(key, value, ttl, now)
+            return True
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def size(self):
+        with self._lock:
+            return len(self._data)
+
+
+class RedisStore:
+    shared = True
+
+    def __init__(self, url):
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key):
+        return self._client.get(key)
+
+    def get_many(self, keys):
+        return self._client.mget(keys)
+
+    def set(self, key, value, ttl=None):
+        self._client.set(key, value, ex=int(ttl) if ttl else None)
+
+    def add(self, key, value, ttl=None):
+        return bool(self._client.set(key, value, ex=int(ttl) if ttl else None, nx=True))
+
+    def delete(self, *keys):
+        if keys:
+            self._client.delete(*keys)
+
+    def size(self):
+        return self._client.dbsize()
+
+
+def _create_store():
+    url = os.getenv('REDIS_URL')
+    if url and redis is not None:
+        logger.info("Caché compartida en Redis")
+        return RedisStore(url)
+    if url:
+        logger.warning("REDIS_URL definido pero el paquete redis no está instalado: se usa caché local")
+    else:
+        logger.info("Caché local del proceso: con varias réplicas define REDIS_URL")
+    return LocalStore()
+
+
+store = _create_store()
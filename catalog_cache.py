@@ -0,0 +1,199 @@
+"""
+Caché en memoria del catálogo (laboratorios y computadoras) con ETag.
+
+El catálogo solo cambia cuando un admin edita algo, así que las respuestas de
+los GET de labs/computers se guardan en memoria junto con la versión del
+catálogo vigente. La versión vive en la tabla catalog_version del primario y
+todas las escrituras que afectan al catálogo la incrementan en la misma
+transacción (bump_catalog_version), de modo que las otras réplicas del
+backend descartan su copia en cuanto leen la versión nueva.
+
+Cada réplica relee la versión como mucho cada CATALOG_VERSION_TTL segundos,
+así que un cambio hecho en otra réplica tarda ese tiempo en verse. Los cambios
+hechos en la misma réplica se ven de inmediato.
+
+Las respuestas llevan un ETag fuerte y se responde 304 a If-None-Match.
+
+La clave de caché solo usa los parámetros que la vista declara (por defecto
+`fields`, normalizado), así que parámetros desconocidos no crean entradas
+nuevas. Como mucho se guardan CATALOG_CACHE_MAX_ENTRIES respuestas; al pasar
+ese límite se descartan las menos usadas.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import g, make_response, request
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+from db import db
+from metrics import CATALOG_CACHE_REQUESTS
+from fast_json import etag_for, matching_etag
+
+VERSION_TTL = float(os.getenv('CATALOG_VERSION_TTL', 2))
+MAX_ENTRIES = int(os.getenv('CATALOG_CACHE_MAX_ENTRIES', 512))
+
+
+class CatalogVersion(db.Model):
+    __tablename__ = 'catalog_version'
+
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.BigInteger, nullable=False, default=0)
+
+
+class CatalogCache:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # clave -> (versión, etag, body, mimetype), en orden LRU
+        self._version = None
+        self._version_read_at = 0.0
+
+    def current_version(self):
+        now = time.monotonic()
+        with self._lock:
+            if self._version is not None and now - self._version_read_at < VERSION_TTL:
+                return self._version
+
+        # Siempre del primario: una réplica atrasada devolvería una versión vieja
+        with db.engines[None].connect() as connection:
+            version = connection.execute(
+                text("SELECT version FROM catalog_version WHERE id = 1")
+            ).scalar() or 0
+
+        with self._lock:
+            if version != self._version:
+                # Las entradas de versiones anteriores ya no sirven
+                self._entries = OrderedDict((k, v) for k, v in self._entries.items() if v[0] == version)
+            self._version = version
+            self._version_read_at = now
+        return version
+
+    def expire_version(self):
+        """Obliga a releer la versión en la próxima petición"""
+        with self._lock:
+            self._version_read_at = 0.0
+
+    def get(self, key, version):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry:
+                self._entries.move_to_end(key)
+        if entry and entry[0] == version:
+            return entry
+        return None
+
+    def put(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > MAX_ENTRIES:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._version = None
+
+
+catalog_cache = CatalogCache()
+
+
+def bump_catalog_version():
+    """
+    Incrementa la versión del catálogo dentro de la transacción actual.
+    Llamar antes del commit de cualquier escritura sobre labs/computers.
+    """
+    updated = db.session.execute(
+        text("UPDATE catalog_version SET version = version + 1 WHERE id = 1")
+    ).rowcount
+    if not updated:
+        db.session.execute(text("INSERT INTO catalog_version (id, version) VALUES (1, 1)"))
+    db.session.info['catalog_changed'] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _expire_after_commit(session):
+    if session.info.pop('catalog_changed', False):
+        catalog_cache.expire_version()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_rolled_back_bump(session):
+    session.info.pop('catalog_changed', None)
+
+
+def _normalize_fields(raw):
+    # fields=id,name y fields=name,id son la misma respuesta
+    return ','.join(sorted({name.strip() for name in raw.split(',') if name.strip()}))
+
+
+def _cache_key(name, params):
+    values = []
+    for param in params:
+        value = request.args.get(param)
+        if value is None:
+            continue
+        if param == 'fields':
+            value = _normalize_fields(value)
+        values.append(f'{param}={value}')
+    args = '&'.join(values)
+    view_args = ','.join(f'{k}={v}' for k, v in sorted((request.view_args or {}).items()))
+    return f'{name}|{view_args}|{args}'
+
+
+def request_catalog_version():
+    """Versión del catálogo con la que catalog_cached atiende la petición actual"""
+    return g.get('catalog_version')
+
+
+def catalog_cached(name, params=('fields',)):
+    """
+    Decorador para GET del catálogo: sirve la respuesta desde memoria mientras
+    la versión del catálogo no cambie y responde 304 si el cliente ya la tiene.
+    Solo se cachean respuestas 200. `params` son los query params que cambian
+    la respuesta; el resto se ignora al armar la clave.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            version = catalog_cache.current_version()
+            g.catalog_version = version
+            key = _cache_key(name, params)
+            entry = catalog_cache.get(key, version)
+
+            if entry is None:
+                # Rellenar desde el primario para no guardar datos de una réplica atrasada
+                g.db_read_only = False
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                body = response.get_data()
+                entry = (version, etag_for(body), body, response.mimetype)
+                catalog_cache.put(key, entry)
+                result = 'miss'
+            else:
+                result = 'hit'
+
+            _, etag, body, mimetype = entry
+            client_etag = matching_etag(etag)
+            if client_etag:
+                CATALOG_CACHE_REQUESTS.labels(name, 'not_modified').inc()
+                response = make_response('', 304)
+                response.set_etag(client_etag)
+            else:
+                CATALOG_CACHE_REQUESTS.labels(name, result).inc()
+                response = make_response(body, 200)
+                response.mimetype = mimetype
+                # init_compression le agrega el sufijo si comprime la respuesta
+                response.set_etag(etag)
+
+            # El navegador puede guardar la respuesta pero debe revalidarla siempre
+            response.headers['Cache-Control'] = 'no-cache'
+            return response
+
+        return wrapper
+    return decorator
@@ -1,22 +1,52 @@
+import csv
+import io
+import json
 from datetime import datetime
 from flask import Blueprint, jsonify, request
+import availability
 from auth import token_required
 from db import db
 from socket_manager import socketio
+from catalog_cache import catalog_cached, bump_catalog_version, request_catalog_version
+from single_flight import single_flight
+from fast_json import Projection, json_response, sparse_fields
+from specs import normalize_specs, specs_text
+from laboratory import Laboratory
+from sqlalchemy import and_, exists, insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
 
 computer_bp = Blueprint('computers', __name__)
 
+COMPUTER_STATUSES = ['available', 'maintenance', 'reserved']
+# Máximo de computadoras por petición de alta masiva
+BULK_MAX_COMPUTERS = 500
+
 class Computer(db.Model):
     __tablename__ = 'computers'
     
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(50), nullable=False)
     hostname = db.Column(db.String(100), unique=True, nullable=False)
-    specs = db.Column(db.Text)  # JSON con especificaciones técnicas
+    specs = db.Column(db.JSON)  # JSON con especificaciones técnicas (ver specs.py)
     status = db.Column(db.String(20), default='available')  # 'available', 'maintenance', 'reserved'
     laboratory_id = db.Column(db.Integer, db.ForeignKey('laboratories.id'), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Atributos comunes de specs como columnas generadas e indexadas
+    # (migrations/0005_computer_specs_json.py)
+    spec_cpu = db.Column(db.String(100), db.Computed("specs->>'$.cpu'", persisted=False))
+    spec_ram_gb = db.Column(db.Integer, db.Computed("CAST(specs->>'$.ram_gb' AS UNSIGNED)", persisted=False))
+    spec_storage_gb = db.Column(db.Integer, db.Computed("CAST(specs->>'$.storage_gb' AS UNSIGNED)", persisted=False))
+    spec_gpu = db.Column(db.String(100), db.Computed("specs->>'$.gpu'", persisted=False))
+
+    __table_args__ = (
+        db.Index('idx_computers_spec_ram', 'spec_ram_gb'),
+        db.Index('idx_computers_spec_storage', 'spec_storage_gb'),
+        db.Index('idx_computers_spec_cpu', 'spec_cpu'),
+        db.Index('idx_computers_spec_gpu', 'spec_gpu'),
+        db.Index('idx_computers_lab_ram', 'laboratory_id', 'spec_ram_gb'),
+    )
     
     # Relaciones
     reservations = db.relationship('Reservation', backref='computers', lazy=True)
@@ -29,32 +59,147 @@ class Computer(db.Model):
             'id': self.id,
             'name': self.name,
             'hostname': self.hostname,
-            'specs': self.specs,
+            'specs': specs_text(self.specs),
+            'cpu': self.spec_cpu,
+            'ram_gb': self.spec_ram_gb,
+            'storage_gb': self.spec_storage_gb,
+            'gpu': self.spec_gpu,
             'status': self.status,
             'laboratory_id': self.laboratory_id,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
 
+# Campos de to_dict() para la ruta rápida de listados (ver fast_json.py)
+COMPUTER_PROJECTION = Projection([
+    ('id', Computer.id),
+    ('name', Computer.name),
+    ('hostname', Computer.hostname),
+    ('specs', Computer.specs, specs_text),
+    ('cpu', Computer.spec_cpu),
+    ('ram_gb', Computer.spec_ram_gb),
+    ('storage_gb', Computer.spec_storage_gb),
+    ('gpu', Computer.spec_gpu),
+    ('status', Computer.status),
+    ('laboratory_id', Computer.laboratory_id),
+    ('created_at', Computer.created_at),
+    ('updated_at', Computer.updated_at),
+])
+
 # Obtener todas las computadoras
 @computer_bp.route('/', methods=['GET'])
-def get_all_computers():
-    computers = Computer.query.all()
-    return jsonify([computer.to_dict() for computer in computers])
+@catalog_cached('computers')
+@sparse_fields(COMPUTER_PROJECTION)
+def get_all_computers(fields):
+    return json_response(COMPUTER_PROJECTION.rows(db.session, fields))
 
 # Obtener computadoras disponibles
 @computer_bp.route('/available', methods=['GET'])
-def get_available_computers():
-    available_computers = Computer.query.filter_by(status='available').all()
-    return jsonify([computer.to_dict() for computer in available_computers])
+@catalog_cached('computers:available')
+@single_flight('computers:available', scope=request_catalog_version)
+@sparse_fields(COMPUTER_PROJECTION)
+def get_available_computers(fields):
+    return json_response(COMPUTER_PROJECTION.rows(db.session, fields, where=Computer.status == 'available'))
 
 # Obtener computadoras por laboratorio
 @computer_bp.route('/laboratory/<int:laboratory_id>', methods=['GET'])
-def get_computers_by_laboratory(laboratory_id):
-    computers = Computer.query.filter_by(laboratory_id=laboratory_id).all()
-    return jsonify([computer.to_dict() for computer in computers])
+@catalog_cached('computers:laboratory')
+@single_flight('computers:laboratory', scope=request_catalog_version)
+@sparse_fields(COMPUTER_PROJECTION)
+def get_computers_by_laboratory(laboratory_id, fields):
+    return json_response(COMPUTER_PROJECTION.rows(db.session, fields, where=Computer.laboratory_id == laboratory_id))
+
+def _prefix_pattern(value):
+    """
+    Patrón LIKE 'valor%' con los comodines del valor escapados. Sin comodín
+    inicial MySQL usa los índices de spec_cpu/spec_gpu (migración 0005), y la
+    colación *_ci ya ignora mayúsculas sin envolver la columna en LOWER().
+    """
+    escaped = value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f'{escaped}%'
+
+
+# Buscar computadoras por specs, laboratorio y disponibilidad en una franja
+@computer_bp.route('/search', methods=['GET'])
+@sparse_fields(COMPUTER_PROJECTION)
+def search_computers(fields):
+    """
+    Query params (todos opcionales):
+      - cpu, gpu: comienzo del CPU/GPU, sin distinguir mayúsculas (gpu=any
+        exige que tenga GPU)
+      - min_ram, min_storage: mínimo en GB
+      - laboratory_id
+      - start, end (ISO 8601): solo computadoras sin reservas pendientes o
+        confirmadas que se solapen con esa franja y que no estén en mantenimiento
+      - fields: campos a devolver (como en los demás listados)
+
+    Todo se resuelve en una sola consulta sobre las columnas generadas de specs.
+    Las ventanas de mantenimiento cuentan tanto si son de la computadora como
+    de su laboratorio.
+    """
+    # Import diferido: reservation y maintenance importan este módulo
+    from maintenance import MaintenanceWindow
+    from reservation import Reservation
+
+    conditions = []
+
+    min_ram = request.args.get('min_ram', type=int)
+    if min_ram is not None:
+        conditions.append(Computer.spec_ram_gb >= min_ram)
+
+    min_storage = request.args.get('min_storage', type=int)
+    if min_storage is not None:
+        conditions.append(Computer.spec_storage_gb >= min_storage)
+
+    cpu = request.args.get('cpu')
+    if cpu:
+        conditions.append(Computer.spec_cpu.like(_prefix_pattern(cpu), escape='\\'))
+
+    gpu = request.args.get('gpu')
+    if gpu == 'any':
+        conditions.append(Computer.spec_gpu.isnot(None))
+    elif gpu:
+        conditions.append(Computer.spec_gpu.like(_prefix_pattern(gpu), escape='\\'))
+
+    laboratory_id = request.args.get('laboratory_id', type=int)
+    if laboratory_id is not None:
+        conditions.append(Computer.laboratory_id == laboratory_id)
+
+    start_str = request.args.get('start')
+    end_str = request.args.get('end')
+    if start_str or end_str:
+        if not (start_str and end_str):
+            return jsonify({'message': 'Se requieren start y end juntos'}), 400
+        try:
+            start_time = availability.naive(datetime.fromisoformat(start_str))
+            end_time = availability.naive(datetime.fromisoformat(end_str))
+        except ValueError:
+            return jsonify({'message': 'Formato de fecha inválido. Use ISO 8601'}), 400
+        if start_time >= end_time:
+            return jsonify({'message': 'La hora de inicio debe ser antes de la hora de fin'}), 400
+
+        conditions.append(Computer.status != 'maintenance')
+        conditions.append(~exists().where(and_(
+            Reservation.computer_id == Computer.id,
+            Reservation.status.in_(['pending', 'confirmed']),  # type: ignore
+            Reservation.start_time < end_time,  # type: ignore
+            Reservation.end_time > start_time  # type: ignore
+        )))
+        conditions.append(~exists().where(and_(
+            or_(MaintenanceWindow.computer_id == Computer.id,
+                MaintenanceWindow.laboratory_id == Computer.laboratory_id),
+            MaintenanceWindow.start_time < end_time,
+            MaintenanceWindow.end_time > start_time
+        )))
+
+    statement = COMPUTER_PROJECTION.select(fields).where(*conditions).order_by(
+        Computer.laboratory_id, Computer.name
+    )
+    rows = db.session.execute(statement).all()
+    return json_response(COMPUTER_PROJECTION.serializer(fields)(rows))
 
 @computer_bp.route('/<int:computer_id>', methods=['GET'])
+@catalog_cached('computers:detail')
 def get_computer_by_id(computer_id):
     computer = Computer.query.get(computer_id)
     if not computer:
@@ -74,6 +219,265 @@ def test_emit():
     print("✅ TEST: Evento de prueba emitido")
     return jsonify({'message': 'Evento de prueba emitido'})
 
+def _parse_import_body():
+    """
+    Lee las computadoras a dar de alta desde el cuerpo de la petición:
+      - JSON: lista u objeto {"computers": [...]}
+      - CSV (text/csv) con cabecera name,hostname,laboratory_id[,specs][,status]
+      - NDJSON (application/x-ndjson): un objeto JSON por línea
+      - multipart con el archivo en el campo 'file' (.csv o .ndjson/.jsonl)
+    """
+    uploaded = request.files.get('file')
+    if uploaded:
+        content = uploaded.read().decode('utf-8-sig')
+        filename = (uploaded.filename or '').lower()
+        kind = 'csv' if filename.endswith('.csv') else 'ndjson'
+    elif request.mimetype == 'text/csv':
+        content, kind = request.get_data(as_text=True), 'csv'
+    elif request.mimetype in ('application/x-ndjson', 'application/jsonl'):
+        content, kind = request.get_data(as_text=True), 'ndjson'
+    else:
+        data = request.get_json(silent=True)
+        if isinstance(data, dict):
+            data = data.get('computers')
+        if not isinstance(data, list):
+            raise ValueError('Se esperaba una lista de computadoras')
+        return data
+
+    if kind == 'csv':
+        return [dict(row) for row in csv.DictReader(io.StringIO(content))]
+
+    items = []
+    for line_number, line in enumerate(content.splitlines(), start=1):
+        if line.strip():
+            try:
+                items.append(json.loads(line))
+            except ValueError:
+                raise ValueError(f'Línea {line_number}: JSON inválido')
+    return items
+
+
+# Largos de las columnas: se validan por fila para no fallar todo el lote con un error de la base
+NAME_MAX_LENGTH = Computer.__table__.c.name.type.length
+HOSTNAME_MAX_LENGTH = Computer.__table__.c.hostname.type.length
+
+
+def _validate_computers(items):
+    """Valida el lote completo con una consulta por tipo de dato. Devuelve (filas, errores)"""
+    errors = []
+    rows = []
+    seen_hostnames = {}
+
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            errors.append({'row': index, 'error': 'Formato inválido'})
+            continue
+
+        name = (item.get('name') or '').strip()
+        hostname = (item.get('hostname') or '').strip().lower()
+        status = (item.get('status') or 'available').strip()
+        try:
+            laboratory_id = int(item.get('laboratory_id'))
+        except (TypeError, ValueError):
+            laboratory_id = None
+
+        if not name or not hostname or laboratory_id is None:
+            errors.append({'row': index, 'error': 'Faltan name, hostname o laboratory_id'})
+            continue
+        if len(name) > NAME_MAX_LENGTH:
+            errors.append({'row': index, 'error': f'name supera {NAME_MAX_LENGTH} caracteres'})
+            continue
+        if len(hostname) > HOSTNAME_MAX_LENGTH:
+            errors.append({'row': index, 'error': f'hostname supera {HOSTNAME_MAX_LENGTH} caracteres'})
+            continue
+        if status not in COMPUTER_STATUSES:
+            errors.append({'row': index, 'error': f'Estado inválido: {status}'})
+            continue
+        if hostname in seen_hostnames:
+            errors.append({'row': index, 'error': f'Hostname repetido en el lote (fila {seen_hostnames[hostname]})'})
+            continue
+        seen_hostnames[hostname] = index
+
+        rows.append({
+            'name': name,
+            'hostname': hostname,
+            'laboratory_id': laboratory_id,
+            'status': status,
+            'specs': normalize_specs(item.get('specs')),
+        })
+
+    if rows:
+        hostnames = [row['hostname'] for row in rows]
+        taken = set(db.session.execute(
+            select(Computer.hostname).where(Computer.hostname.in_(hostnames))
+        ).scalars())
+        for hostname in sorted(taken):
+            errors.append({'row': seen_hostnames[hostname], 'error': f'El hostname {hostname} ya existe'})
+
+        lab_ids = {row['laboratory_id'] for row in rows}
+        existing_labs = set(db.session.execute(
+            select(Laboratory.id).where(Laboratory.id.in_(lab_ids))
+        ).scalars())
+        for row in rows:
+            if row['laboratory_id'] not in existing_labs:
+                errors.append({
+                    'row': seen_hostnames[row['hostname']],
+                    'error': f"Laboratorio {row['laboratory_id']} no encontrado"
+                })
+
+    return rows, sorted(errors, key=lambda e: e['row'])
+
+
+def _provision_computers():
+    try:
+        items = _parse_import_body()
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+
+    if not items:
+        return jsonify({'message': 'No hay computadoras para crear'}), 400
+    if len(items) > BULK_MAX_COMPUTERS:
+        return jsonify({'message': f'Máximo {BULK_MAX_COMPUTERS} computadoras por petición'}), 400
+
+    rows, errors = _validate_computers(items)
+    if errors:
+        # Todo o nada: si una fila falla no se crea ninguna
+        return jsonify({'message': 'Hay filas inválidas, no se creó ninguna computadora', 'errors': errors}), 400
+
+    try:
+        # executemany en una sola transacción
+        db.session.execute(insert(Computer), rows)
+        bump_catalog_version()
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({'message': 'Algún hostname fue registrado por otra petición, reintenta'}), 409
+
+    created = db.session.execute(
+        select(Computer.id, Computer.name, Computer.hostname, Computer.laboratory_id)
+        .where(Computer.hostname.in_([row['hostname'] for row in rows]))
+        .order_by(Computer.id)
+    ).all()
+
+    # Un único evento por laboratorio en vez de uno por computadora
+    by_laboratory = {}
+    for computer_id, name, hostname, laboratory_id in created:
+        by_laboratory.setdefault(laboratory_id, []).append(
+            {'id': computer_id, 'name': name, 'hostname': hostname}
+        )
+    for laboratory_id, computers in by_laboratory.items():
+        socketio.emit('computers_created', {
+            'laboratory_id': laboratory_id,
+            'count': len(computers),
+            'computers': computers
+        })
+
+    return jsonify({
+        'message': f'{len(created)} computadoras creadas',
+        'created': len(created),
+        'computers': [
+            {'id': c.id, 'name': c.name, 'hostname': c.hostname, 'laboratory_id': c.laboratory_id}
+            for c in created
+        ]
+    }), 201
+
+# Alta masiva de computadoras (solo admin)
+@computer_bp.route('/bulk', methods=['POST'])
+@token_required
+def create_computers_bulk(current_user):
+    if current_user.role != 'admin':
+        return jsonify({'message': 'Acceso denegado: se requiere rol admin'}), 403
+    return _provision_computers()
+
+# Importación desde CSV/NDJSON (solo admin)
+@computer_bp.route('/import', methods=['POST'])
+@token_required
+def import_computers(current_user):
+    if current_user.role != 'admin':
+        return jsonify({'message': 'Acceso denegado: se requiere rol admin'}), 403
+    return _provision_computers()
+
+# Actualizar el estado de varias computadoras a la vez (solo admin)
+@computer_bp.route('/status', methods=['PUT'])
+@token_required
+def update_computers_status(current_user):
+    """
+    Body:
+      - status (requerido)
+      - computer_ids (lista) o laboratory_id: computadoras a actualizar
+      - cancel_reservations (opcional): cancela en la misma transacción las
+        reservas pendientes/confirmadas que aún no terminaron
+    """
+    if current_user.role != 'admin':
+        return jsonify({'message': 'Acceso denegado: se requiere rol admin'}), 403
+
+    data = request.get_json() or {}
+    new_status = data.get('status')
+    computer_ids = data.get('computer_ids')
+    laboratory_id = data.get('laboratory_id')
+
+    if new_status not in COMPUTER_STATUSES:
+        return jsonify({'message': 'Estado inválido'}), 400
+
+    if computer_ids:
+        if not isinstance(computer_ids, list) or not all(isinstance(i, int) for i in computer_ids):
+            return jsonify({'message': 'computer_ids debe ser una lista de enteros'}), 400
+        condition = Computer.id.in_(computer_ids)
+    elif laboratory_id is not None:
+        # bool es subclase de int: true/false del JSON no son ids
+        if not isinstance(laboratory_id, int) or isinstance(laboratory_id, bool):
+            return jsonify({'message': 'laboratory_id debe ser un entero'}), 400
+        condition = Computer.laboratory_id == laboratory_id
+    else:
+        return jsonify({'message': 'Falta computer_ids o laboratory_id'}), 400
+
+    current = db.session.execute(
+        select(Computer.id, Computer.status, Computer.laboratory_id).where(condition)
+    ).all()
+    if not current:
+        return jsonify({'message': 'No se encontraron computadoras'}), 404
+
+    ids = [row.id for row in current]
+    cancelled = []
+    if data.get('cancel_reservations'):
+        # Import diferido: reservation importa este módulo
+        from reservation import cancel_overlapping_reservations
+        # Las horas de las reservas son locales sin zona (igual que lifecycle.py)
+        # Los huecos solo pasan a la lista de espera si la computadora sigue usable
+        cancelled = cancel_overlapping_reservations(ids, datetime.now(), promote=new_status != 'maintenance')
+
+    db.session.execute(
+        update(Computer)
+        .where(Computer.id.in_(ids))
+        .values(status=new_status, updated_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    bump_catalog_version()
+    db.session.commit()
+
+    changed = [
+        {'computer_id': row.id, 'old_status': row.status, 'laboratory_id': row.laboratory_id}
+        for row in current if row.status != new_status
+    ]
+    # Un único evento para todo el lote en vez de uno por computadora
+    socketio.emit('computers_status_updated', {
+        'new_status': new_status,
+        'count': len(changed),
+        'laboratory_ids': sorted({row.laboratory_id for row in current}),
+        'computers': changed
+    })
+
+    if cancelled:
+        from reservation import announce_cancelled_reservations
+        announce_cancelled_reservations(cancelled, f'Computadora en estado {new_status}')
+
+    return jsonify({
+        'message': f'{len(ids)} computadoras actualizadas a {new_status}',
+        'updated': len(ids),
+        'changed': len(changed),
+        'cancelled_reservations': [r['reservation_id'] for r in cancelled]
+    })
+
 # Actualizar estado de computadora (solo admin)
 @computer_bp.route('/<int:computer_id>/status', methods=['PUT'])
 @token_required
@@ -84,7 +488,7 @@ def update_computer_status(current_user, computer_id):
     data = request.get_json()
     new_status = data.get('status')
 
-    if new_status not in ['available', 'maintenance', 'reserved']:
+    if new_status not in COMPUTER_STATUSES:
         return jsonify({'message': 'Estado inválido'}), 400
 
     computer = Computer.query.get(computer_id)
@@ -93,6 +497,7 @@ def update_computer_status(current_user, computer_id):
 
     old_status = computer.status
     computer.status = new_status
+    bump_catalog_version()
     db.session.commit()
 
     # Emitir evento de actualización en tiempo real
@@ -127,6 +532,7 @@ def delete_computer(current_user, computer_id):
     
     try:
         db.session.delete(computer)
+        bump_catalog_version()
         db.session.commit()
         
         # Emitir evento de eliminación en tiempo real
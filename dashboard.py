@@ -0,0 +1,142 @@
+"""
+Vista combinada del panel del estudiante.
+
+StudentDashboard pedía /labs, /computers/available, /reservations y
+/reservations/user/<id> en cada carga y tras cada evento de Socket.IO (cuatro
+validaciones de token y cuatro lecturas completas). GET /api/dashboard/student
+devuelve lo mismo en una respuesta armada con tres consultas agregadas:
+
+  - laboratorios con el total de computadoras y las disponibles (GROUP BY)
+  - conteo de reservas del usuario por estado y cuántas están por venir
+  - últimas reservas creadas, con nombre de computadora y laboratorio
+
+Los conteos y las listas incluyen las reservas archivadas (ver archive.py).
+
+La respuesta lleva un ETag del contenido y se responde 304 a If-None-Match,
+así que los refrescos que no cambiaron nada no transfieren el cuerpo. El
+panel solo la vuelve a pedir por eventos de reservas del propio usuario (y
+agrupa los que llegan seguidos); los cambios de estado de computadoras los
+aplica con el contenido del evento.
+"""
+
+from datetime import datetime
+
+import orjson
+from flask import Blueprint, make_response
+from sqlalchemy import case, func, select
+
+from archive import reservation_history
+from auth import token_required
+from computer import Computer
+from db import db
+from fast_json import etag_for, hhmm, matching_etag
+from laboratory import Laboratory
+from reservation import ACTIVE_STATUSES
+
+dashboard_bp = Blueprint('dashboard', __name__)
+
+RECENT_LIMIT = 5
+
+
+def _labs_with_counts():
+    rows = db.session.execute(
+        select(
+            Laboratory.id, Laboratory.name, Laboratory.location,
+            Laboratory.opening_time, Laboratory.closing_time,
+            func.count(Computer.id),
+            func.count(case((Computer.status == 'available', Computer.id)))
+        )
+        .outerjoin(Computer, Computer.laboratory_id == Laboratory.id)
+        .group_by(Laboratory.id, Laboratory.name, Laboratory.location,
+                  Laboratory.opening_time, Laboratory.closing_time)
+        .order_by(Laboratory.name)
+    ).all()
+    return [{
+        'id': lab_id,
+        'name': name,
+        'location': location,
+        'opening_time': hhmm(opening_time),
+        'closing_time': hhmm(closing_time),
+        'total_computers': total,
+        'available_computers': available
+    } for lab_id, name, location, opening_time, closing_time, total, available in rows]
+
+
+def _reservation_stats(user_id, now):
+    history = reservation_history(lambda table: [table.user_id == user_id])
+    rows = db.session.execute(
+        select(
+            history.c.status,
+            func.count(history.c.id),
+            func.sum(case((history.c.start_time > now, 1), else_=0))
+        )
+        .group_by(history.c.status)
+    ).all()
+    by_status = {status: count for status, count, _ in rows}
+    return {
+        'total_reservations': sum(by_status.values()),
+        'upcoming_reservations': sum(int(upcoming or 0) for status, _, upcoming in rows if status in ACTIVE_STATUSES),
+        'by_status': by_status
+    }
+
+
+def _reservations_with_names(filters, order_by, limit):
+    # order_by recibe las columnas de la unión de reservas vivas y archivadas
+    history = reservation_history(filters)
+    rows = db.session.execute(
+        select(
+            history.c.id, history.c.start_time, history.c.end_time, history.c.status,
+            Computer.id, Computer.name, Laboratory.id, Laboratory.name
+        )
+        .outerjoin(Computer, history.c.computer_id == Computer.id)
+        .outerjoin(Laboratory, Computer.laboratory_id == Laboratory.id)
+        .order_by(*order_by(history.c))
+        .limit(limit)
+    ).all()
+    return [{
+        'id': reservation_id,
+        'start_time': start_time,
+        'end_time': end_time,
+        'status': status,
+        'computer_id': computer_id,
+        'computer_name': computer_name,
+        'laboratory_id': laboratory_id,
+        'laboratory_name': laboratory_name
+    } for (reservation_id, start_time, end_time, status,
+           computer_id, computer_name, laboratory_id, laboratory_name) in rows]
+
+
+@dashboard_bp.route('/student', methods=['GET'])
+@token_required
+def get_student_dashboard(current_user):
+    # Las reservas se guardan en hora local sin zona (igual que en reservation.py)
+    now = datetime.now()
+    labs = _labs_with_counts()
+    stats = _reservation_stats(current_user.id, now)
+    stats['total_labs'] = len(labs)
+    stats['available_computers'] = sum(lab['available_computers'] for lab in labs)
+
+    body = orjson.dumps({
+        'labs': labs,
+        'stats': stats,
+        'recent_reservations': _reservations_with_names(
+            lambda table: [table.user_id == current_user.id],
+            lambda columns: [columns.created_at.desc(), columns.id.desc()],
+            RECENT_LIMIT
+        )
+    })
+
+    etag = etag_for(body)
+    client_etag = matching_etag(etag)
+    if client_etag:
+        response = make_response('', 304)
+        response.set_etag(client_etag)
+    else:
+        response = make_response(body, 200)
+        response.mimetype = 'application/json'
+        # init_compression le agrega el sufijo si comprime la respuesta
+        response.set_etag(etag)
+
+    # Es por usuario: el navegador puede guardarla pero no un proxy compartido
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
@@ -1,3 +1,5 @@
 from flask_sqlalchemy import SQLAlchemy
+from read_replica import RoutingSession
 
-db = SQLAlchemy()
+# La sesión decide por petición si la consulta va al primario o a una réplica
+db = SQLAlchemy(session_options={'class_': RoutingSession})
@@ -0,0 +1,104 @@
+"""
+Configuración del pool de conexiones de SQLAlchemy y métricas del pool.
+
+Lo usan tanto el backend principal (Flask) como el microservicio de
+notificaciones (FastAPI), por eso no depende de Flask.
+
+Variables de entorno (todas opcionales):
+  - DB_POOL_SIZE: conexiones persistentes por proceso
+  - DB_POOL_MAX_OVERFLOW: conexiones extra permitidas en picos
+  - DB_POOL_TIMEOUT: segundos máximos esperando una conexión libre
+  - DB_POOL_RECYCLE: segundos antes de reciclar una conexión (debe ser
+    menor que el wait_timeout de mysql.cnf)
+  - DB_POOL_PRE_PING: 'true'/'false', valida la conexión antes de usarla
+"""
+
+import os
+import threading
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.pool import QueuePool
+
+
+def _env_bool(name, default):
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool que además mide cuánto se espera para obtener una conexión"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.wait_count = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.timeouts = 0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            with self._stats_lock:
+                self.timeouts += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._stats_lock:
+                self.wait_count += 1
+                self.wait_seconds_total += elapsed
+                if elapsed > self.wait_seconds_max:
+                    self.wait_seconds_max = elapsed
+
+
+def pool_options(default_size=10, default_max_overflow=10):
+    """
+    Opciones de create_engine para el pool, leídas del entorno.
+
+    Args:
+        default_size (int): tamaño del pool si no se define DB_POOL_SIZE
+        default_max_overflow (int): overflow si no se define DB_POOL_MAX_OVERFLOW
+    """
+    return {
+        'poolclass': InstrumentedQueuePool,
+        'pool_size': int(os.getenv('DB_POOL_SIZE', default_size)),
+        'max_overflow': int(os.getenv('DB_POOL_MAX_OVERFLOW', default_max_overflow)),
+        'pool_timeout': int(os.getenv('DB_POOL_TIMEOUT', 30)),
+        'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', 1800)),
+        'pool_pre_ping': _env_bool('DB_POOL_PRE_PING', True),
+    }
+
+
+def pool_stats(engine):
+    """Devuelve los gauges actuales del pool de un engine"""
+    pool = engine.pool
+    if not isinstance(pool, QueuePool):
+        # Pools sin cola (p. ej. NullPool/StaticPool) no tienen estos contadores
+        return {'pool_class': type(pool).__name__}
+
+    stats = {
+        'size': pool.size(),
+        'checked_out': pool.checkedout(),
+        'idle': pool.checkedin(),
+        # overflow() es negativo mientras no se superó pool_size
+        'overflow': max(pool.overflow(), 0),
+    }
+
+    if isinstance(pool, InstrumentedQueuePool):
+        with pool._stats_lock:
+            wait_count = pool.wait_count
+            wait_total = pool.wait_seconds_total
+            stats.update({
+                'wait_count': wait_count,
+                'wait_seconds_total': round(wait_total, 6),
+                'wait_seconds_avg': round(wait_total / wait_count, 6) if wait_count else 0.0,
+                'wait_seconds_max': round(pool.wait_seconds_max, 6),
+                'timeouts': pool.timeouts,
+            })
+
+    return stats
@@ -0,0 +1,221 @@
+"""
+Ruta rápida de serialización para los listados y compresión de respuestas.
+
+En lugar de hidratar objetos del ORM y llamar a `to_dict()` fila por fila,
+los listados hacen un `select` de Core con solo las columnas necesarias y
+convierten las tuplas con un serializador armado una vez por selección de campos.
+orjson se encarga de fechas y del volcado a bytes.
+
+La salida es la misma que la de `to_dict()`: orjson escribe los datetime en
+ISO 8601 igual que `isoformat()`, y las horas de los laboratorios se
+formatean como '%H:%M'.
+
+Compresión (init_compression): las respuestas JSON de más de
+COMPRESSION_MIN_SIZE bytes se comprimen con brotli (si el paquete está
+instalado) o gzip, según el Accept-Encoding del cliente.
+"""
+
+import gzip
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+from functools import wraps
+
+import orjson
+from flask import Response, jsonify, request
+from sqlalchemy import select
+
+try:
+    import brotli  # opcional: si no está instalado se usa solo gzip
+except ImportError:
+    brotli = None
+
+
+def hhmm(value):
+    return value.strftime('%H:%M') if value is not None else None
+
+
+class Projection:
+    """
+    Lista ordenada de campos públicos de un modelo: nombre -> (columna, transformación).
+    Genera el `select` de Core y un serializador de tuplas a dicts.
+    """
+
+    def __init__(self, fields):
+        # fields: [(nombre, columna)] o [(nombre, columna, transformación)]
+        self.fields = OrderedDict()
+        for field in fields:
+            name, column = field[0], field[1]
+            transform = field[2] if len(field) > 2 else None
+            self.fields[name] = (column, transform)
+        self._serializers = {}
+
+    def names(self):
+        return list(self.fields)
+
+    def parse_fields(self, raw):
+        """
+        Convierte el parámetro `fields=a,b,c` en la lista de campos a devolver,
+        en el orden de la proyección (así la misma selección genera siempre la
+        misma consulta y la misma clave de caché). Lanza ValueError si hay
+        campos desconocidos.
+        """
+        if not raw:
+            return None
+        requested = {name.strip() for name in raw.split(',') if name.strip()}
+        unknown = requested - set(self.fields)
+        if unknown:
+            raise ValueError(
+                f"Campos inválidos: {', '.join(sorted(unknown))}. "
+                f"Disponibles: {', '.join(self.fields)}"
+            )
+        return [name for name in self.fields if name in requested] or None
+
+    def select(self, names=None):
+        names = names or self.names()
+        return select(*[self.fields[name][0] for name in names])
+
+    def serializer(self, names=None):
+        """Devuelve una función rows -> [dict] para esos campos (se arma una vez y se reutiliza)"""
+        names = tuple(names or self.names())
+        serializer = self._serializers.get(names)
+        if serializer is None:
+            serializer = self._build(names)
+            self._serializers[names] = serializer
+        return serializer
+
+    def _build(self, names):
+        # Las transformaciones se resuelven una vez por selección de campos; el
+        # bucle caliente solo arma los dicts con zip()
+        transforms = [(index, self.fields[name][1]) for index, name in enumerate(names)
+                      if self.fields[name][1] is not None]
+        if not transforms:
+            return lambda rows: [dict(zip(names, row)) for row in rows]
+
+        def serialize(rows):
+            result = []
+            for row in rows:
+                values = list(row)
+                for index, transform in transforms:
+                    values[index] = transform(values[index])
+                result.append(dict(zip(names, values)))
+            return result
+        return serialize
+
+    def rows(self, session, names=None, where=None, order_by=None):
+        """Ejecuta la proyección y devuelve la lista de dicts"""
+        statement = self.select(names)
+        if where is not None:
+            statement = statement.where(*where) if isinstance(where, (list, tuple)) else statement.where(where)
+        if order_by is not None:
+            statement = statement.order_by(order_by)
+        return self.serializer(names)(session.execute(statement).all())
+
+
+def sparse_fields(projection):
+    """
+    Decorador para listados: lee `?fields=` y se lo pasa a la vista como
+    argumento `fields` (None = todos los campos). Responde 400 si se piden
+    campos que la proyección no tiene.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            try:
+                kwargs['fields'] = projection.parse_fields(request.args.get('fields'))
+            except ValueError as e:
+                return jsonify({'message': str(e)}), 400
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def json_response(data, status=200):
+    """Equivalente a jsonify() pero serializando con orjson"""
+    return Response(orjson.dumps(data), status=status, mimetype='application/json')
+
+
+# --- Compresión ---------------------------------------------------------------
+
+MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', 1024))
+GZIP_LEVEL = int(os.getenv('COMPRESSION_GZIP_LEVEL', 5))
+BROTLI_QUALITY = int(os.getenv('COMPRESSION_BROTLI_QUALITY', 4))
+
+# Las respuestas con ETag (catálogo) se repiten mucho: se guarda su versión comprimida
+_compressed_cache = OrderedDict()
+_compressed_cache_lock = threading.Lock()
+_COMPRESSED_CACHE_SIZE = 256
+
+
+def _choose_encoding():
+    accepted = request.accept_encodings
+    if brotli is not None and accepted['br']:
+        return 'br'
+    if accepted['gzip']:
+        return 'gzip'
+    return None
+
+
+def _compress(body, encoding):
+    if encoding == 'br':
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+
+def compressed_etag(etag, encoding):
+    """ETag de la representación comprimida (debe diferir de la original)"""
+    return f'{etag}-{encoding}'
+
+
+def etag_for(body):
+    return hashlib.sha1(body).hexdigest()
+
+
+def matching_etag(etag):
+    """ETag que el cliente ya tiene (original o de la versión comprimida), si alguno"""
+    for candidate in (etag, compressed_etag(etag, 'gzip'), compressed_etag(etag, 'br')):
+        if request.if_none_match.contains(candidate):
+            return candidate
+    return None
+
+
+def init_compression(app):
+    @app.after_request
+    def compress_response(response):
+        if (response.status_code != 200
+                or response.direct_passthrough
+                or response.mimetype != 'application/json'
+                or 'Content-Encoding' in response.headers):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        body = response.get_data()
+        if len(body) < MIN_SIZE:
+            return response
+
+        encoding = _choose_encoding()
+        if encoding is None:
+            return response
+
+        etag, _ = response.get_etag()
+        if etag:
+            key = (etag, encoding)
+            with _compressed_cache_lock:
+                compressed = _compressed_cache.get(key)
+                if compressed is not None:
+                    _compressed_cache.move_to_end(key)
+            if compressed is None:
+                compressed = _compress(body, encoding)
+                with _compressed_cache_lock:
+                    _compressed_cache[key] = compressed
+                    if len(_compressed_cache) > _COMPRESSED_CACHE_SIZE:
+                        _compressed_cache.popitem(last=False)
+            response.set_etag(compressed_etag(etag, encoding))
+        else:
+            compressed = _compress(body, encoding)
+
+        response.set_data(compressed)
+        response.headers['Content-Encoding'] = encoding
+        return response
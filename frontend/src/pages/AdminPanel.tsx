@@ -49,9 +49,11 @@ interface Reservation {
   status: string;
   user_id: number;
   computer_id: number;
-  user?: User;
-  computer?: Computer;
-  laboratory?: Lab;
+  user_name?: string;
+  user_email?: string;
+  computer_name?: string | null;
+  laboratory_id?: number | null;
+  laboratory_name?: string | null;
   created_at: string;
   updated_at: string;
 }
@@ -88,6 +90,8 @@ const AdminPanel: React.FC = () => {
   const [computers, setComputers] = useState<Computer[]>([]);
   const [reservations, setReservations] = useState<Reservation[]>([]);
   const [users, setUsers] = useState<User[]>([]);
+  const [reservationPage, setReservationPage] = useState<number>(1);
+  const [reservationPages, setReservationPages] = useState<number>(1);
   const [loading, setLoading] = useState<boolean>(true);
   const [error, setError] = useState<string>('');
   const [message, setMessage] = useState<string>('');
@@ -97,6 +101,7 @@ const AdminPanel: React.FC = () => {
     totalLabs: 0,
     totalComputers: 0,
     availableComputers: 0,
+    maintenanceComputers: 0,
     totalReservations: 0,
     pendingReservations: 0,
     confirmedReservations: 0,
@@ -136,43 +141,23 @@ const AdminPanel: React.FC = () => {
         if (activeTab === 'dashboard') {
           console.log('📊 Cargando dashboard y estadísticas...');
           
-          // Cargar todos los datos para el dashboard
-          const [labsResponse, computersResponse, reservationsResponse, usersResponse] = await Promise.all([
-            axios.get(`${API_BASE_URL}/labs`),
-            axios.get(`${API_BASE_URL}/computers`),
-            axios.get(`${API_BASE_URL}/reservations/all`),
-            axios.get(`${API_BASE_URL}/auth/users`)
-          ]);
-          
-          const labs = labsResponse.data;
-          const computers = computersResponse.data;
-          const reservations = reservationsResponse.data;
-          const users = usersResponse.data;
-          
-          // Calcular estadísticas
-          const availableComputers = computers.filter((comp: Computer) => comp.status === 'available').length;
-          const pendingReservations = reservations.filter((res: Reservation) => res.status === 'pending').length;
-          const confirmedReservations = reservations.filter((res: Reservation) => res.status === 'confirmed').length;
-          const totalStudents = users.filter((u: User) => u.role === 'student').length;
-          const totalAdmins = users.filter((u: User) => u.role === 'admin').length;
+          // Conteos agregados en el servidor (ver admin.py y rollups.py)
+          const response = await axios.get(`${API_BASE_URL}/admin/stats`);
+          const data = response.data;
           
           setStats({
-            totalLabs: labs.length,
-            totalComputers: computers.length,
-            availableComputers,
-            totalReservations: reservations.length,
-            pendingReservations,
-            confirmedReservations,
-            totalUsers: users.length,
-            totalStudents,
-            totalAdmins
+            totalLabs: data.labs,
+            totalComputers: data.computers.total,
+            availableComputers: data.computers.by_status.available || 0,
+            maintenanceComputers: data.computers.by_status.maintenance || 0,
+            totalReservations: data.reservations.total,
+            pendingReservations: data.reservations.by_status.pending || 0,
+            confirmedReservations: data.reservations.by_status.confirmed || 0,
+            totalUsers: data.users.total,
+            totalStudents: data.users.by_role.student || 0,
+            totalAdmins: data.users.by_role.admin || 0
           });
           
-          setLabs(labs);
-          setComputers(computers);
-          setReservations(reservations);
-          setUsers(users);
-          
           console.log('✅ Dashboard cargado con estadísticas');
           
         } else if (activeTab === 'labs') {
@@ -182,42 +167,24 @@ const AdminPanel: React.FC = () => {
           setLabs(response.data);
         } else if (activeTab === 'computers') {
           console.log('💻 Cargando computadoras...');
-          const response = await axios.get(`${API_BASE_URL}/computers`);
+          // Los nombres de laboratorio de las tarjetas y del formulario salen de labs,
+          // que puede no haberse cargado (el panel abre en la pestaña dashboard)
+          const [response, labsResponse] = await Promise.all([
+            axios.get(`${API_BASE_URL}/computers`),
+            axios.get(`${API_BASE_URL}/labs`)
+          ]);
           console.log('✅ Computadoras cargadas:', response.data.length);
           setComputers(response.data);
+          setLabs(labsResponse.data);
         } else if (activeTab === 'reservations') {
           console.log('📅 Cargando reservas...');
-          const response = await axios.get(`${API_BASE_URL}/reservations/all`);
-          console.log('✅ Reservas cargadas:', response.data.length);
-          
-          // Obtener detalles completos para cada reserva
-          const reservationsWithDetails = await Promise.all(
-            response.data.map(async (reservation: Reservation) => {
-              try {
-                // Obtener detalles del usuario
-                const userResponse = await axios.get(`${API_BASE_URL}/auth/users/${reservation.user_id}`);
-                
-                // Obtener detalles de la computadora
-                const computerResponse = await axios.get(`${API_BASE_URL}/computers/${reservation.computer_id}`);
-                const computer = computerResponse.data;
-                
-                // Obtener detalles del laboratorio
-                const labResponse = await axios.get(`${API_BASE_URL}/labs/${computer.laboratory_id}`);
-
-                return {
-                  ...reservation,
-                  user: userResponse.data,
-                  computer: computer,
-                  laboratory: labResponse.data
-                };
-              } catch (err) {
-                console.error(`Error al obtener detalles para la reserva ${reservation.id}:`, err);
-                return reservation;
-              }
-            })
-          );
-          
-          setReservations(reservationsWithDetails);
+          // Una página ya unida con usuario, computadora y laboratorio (ver admin.py)
+          const response = await axios.get(`${API_BASE_URL}/admin/reservations`, {
+            params: { page: reservationPage, per_page: 100 }
+          });
+          console.log('✅ Reservas cargadas:', response.data.reservations.length, 'de', response.data.total);
+          setReservations(response.data.reservations);
+          setReservationPages(Math.max(response.data.pages, 1));
         } else if (activeTab === 'users') {
           console.log('👥 Cargando usuarios...');
           const response = await axios.get(`${API_BASE_URL}/auth/users`);
@@ -278,6 +245,34 @@ const AdminPanel: React.FC = () => {
         }
       });
       
+      // Escuchar cambios de estado de computadoras en lote
+      socket.on('computers_status_updated', (data) => {
+        if (activeTab === 'computers') {
+          const changed = new Set(data.computers.map((c: any) => c.computer_id));
+          setComputers(prevComputers =>
+            prevComputers.map(computer =>
+              changed.has(computer.id)
+                ? { ...computer, status: data.new_status }
+                : computer
+            )
+          );
+        }
+      });
+      
+      // Escuchar cancelaciones de reservas en lote
+      socket.on('reservations_cancelled', (data) => {
+        if (activeTab === 'reservations') {
+          const cancelled = new Set(data.reservations.map((r: any) => r.reservation_id));
+          setReservations(prevReservations =>
+            prevReservations.map(reservation =>
+              cancelled.has(reservation.id)
+                ? { ...reservation, status: 'cancelled' }
+                : reservation
+            )
+          );
+        }
+      });
+      
       // Escuchar actualizaciones de estado de reservas
       socket.on('reservation_status_updated', (data) => {
         console.log('Estado de reserva actualizado en tiempo real:', data);
@@ -302,9 +297,11 @@ const AdminPanel: React.FC = () => {
         socket.off('computer_deleted');
         socket.off('computer_status_updated');
         socket.off('reservation_status_updated');
+        socket.off('computers_status_updated');
+        socket.off('reservations_cancelled');
       }
     };
-  }, [activeTab, socket]);
+  }, [activeTab, socket, reservationPage]);
 
   const handleLabFormChange = (e: React.ChangeEvent<HTMLInputElement | HTMLTextAreaElement>) => {
     const { name, value } = e.target;
@@ -339,11 +336,12 @@ const AdminPanel: React.FC = () => {
   const handleComputerSubmit = async (e: React.FormEvent) => {
     e.preventDefault();
     try {
-      await axios.post(`${API_BASE_URL}/computers`, {
+      // El alta usa el endpoint masivo con un solo elemento
+      await axios.post(`${API_BASE_URL}/computers/bulk`, [{
         ...computerFormData,
-        specs: JSON.stringify({ description: computerFormData.specs }),
+        specs: { description: computerFormData.specs },
         status: 'available'
-      });
+      }]);
       setShowComputerForm(false);
       // Recargar computadoras
       const response = await axios.get(`${API_BASE_URL}/computers`);
@@ -583,7 +581,7 @@ const AdminPanel: React.FC = () => {
                   <div className="summary-item">
                     <span className="summary-label">Computadoras en Mantenimiento:</span>
                     <span className="summary-value maintenance">
-                      {computers.filter(comp => comp.status === 'maintenance').length}
+                      {stats.maintenanceComputers}
                     </span>
                   </div>
                   <div className="summary-item">
@@ -708,8 +706,9 @@ const AdminPanel: React.FC = () => {
                     </div>
                     
                     <div className="reservation-details">
-                      <p><strong>Estudiante ID:</strong> {reservation.user_id}</p>
-                      <p><strong>Computadora ID:</strong> {reservation.computer_id}</p>
+                      <p><strong>Estudiante:</strong> {reservation.user_name ? `${decodeUnicode(reservation.user_name)} (${reservation.user_email})` : reservation.user_id}</p>
+                      <p><strong>Computadora:</strong> {reservation.computer_name ? decodeUnicode(reservation.computer_name) : reservation.computer_id}</p>
+                      <p><strong>Laboratorio:</strong> {reservation.laboratory_name ? decodeUnicode(reservation.laboratory_name) : 'N/A'}</p>
                       <p><strong>Fecha de inicio:</strong> {formatDateTime(reservation.start_time)}</p>
                       <p><strong>Fecha de fin:</strong> {formatDateTime(reservation.end_time)}</p>
                       <p><strong>Creada:</strong> {formatDateTime(reservation.created_at)}</p>
@@ -734,6 +733,25 @@ const AdminPanel: React.FC = () => {
                   </div>
                 ))}
               </div>
+              {reservationPages > 1 && (
+                <div className="reservation-actions">
+                  <button
+                    className="btn"
+                    disabled={reservationPage <= 1}
+                    onClick={() => setReservationPage(page => page - 1)}
+                  >
+                    Anterior
+                  </button>
+                  <span>Página {reservationPage} de {reservationPages}</span>
+                  <button
+                    className="btn"
+                    disabled={reservationPage >= reservationPages}
+                    onClick={() => setReservationPage(page => page + 1)}
+                  >
+                    Siguiente
+                  </button>
+                </div>
+              )}
             </div>
           )}
 
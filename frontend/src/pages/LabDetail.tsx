@@ -40,6 +40,7 @@ const LabDetail: React.FC = () => {
   const [selectedDate, setSelectedDate] = useState<string>('');
   const [selectedHour, setSelectedHour] = useState<number | null>(null);
   const [reservedHours, setReservedHours] = useState<number[]>([]);
+  const [openHours, setOpenHours] = useState<number[]>([]);
   const [reservationError, setReservationError] = useState<string>('');
   const [reservationSuccess, setReservationSuccess] = useState<string>('');
 
@@ -50,11 +51,19 @@ const LabDetail: React.FC = () => {
   useEffect(() => {
     const fetchLabDetails = async () => {
       try {
-        const labResponse = await axios.get(`${API_BASE_URL}/labs/${labId}`);
-        setLab(labResponse.data);
-
-        const computersResponse = await axios.get(`${API_BASE_URL}/computers/laboratory/${labId}`);
-        setComputers(computersResponse.data);
+        // Laboratorio y computadoras en un solo viaje (POST /api/batch)
+        const batchResponse = await axios.post(`${API_BASE_URL}/batch`, {
+          requests: [
+            { id: 'lab', path: `/api/labs/${labId}` },
+            { id: 'computers', path: `/api/computers/laboratory/${labId}` }
+          ]
+        });
+        const { lab: labResult, computers: computersResult } = batchResponse.data.responses;
+        if (labResult.status !== 200 || computersResult.status !== 200) {
+          throw new Error(labResult.body?.message || computersResult.body?.message || 'Error en el lote');
+        }
+        setLab(labResult.body);
+        setComputers(computersResult.body);
 
         setLoading(false);
       } catch (err) {
@@ -97,6 +106,31 @@ const LabDetail: React.FC = () => {
         }
       });
       
+      // Escuchar cambios de estado en lote
+      socket.on('computers_status_updated', (data) => {
+        const changed = new Set(
+          data.computers
+            .filter((c: any) => c.laboratory_id === parseInt(labId || '0'))
+            .map((c: any) => c.computer_id)
+        );
+        if (changed.size > 0) {
+          setComputers(prevComputers =>
+            prevComputers.map(computer =>
+              changed.has(computer.id)
+                ? { ...computer, status: data.new_status }
+                : computer
+            )
+          );
+        }
+      });
+      
+      // Escuchar altas masivas de computadoras
+      socket.on('computers_created', (data) => {
+        if (data.laboratory_id === parseInt(labId || '0')) {
+          fetchLabDetails();
+        }
+      });
+      
       // Escuchar eliminación de laboratorios
       socket.on('lab_deleted', (data) => {
         console.log('Laboratorio eliminado en tiempo real:', data);
@@ -113,6 +147,8 @@ const LabDetail: React.FC = () => {
         socket.off('computer_status_update');
         socket.off('computer_status_updated');
         socket.off('computer_deleted');
+        socket.off('computers_status_updated');
+        socket.off('computers_created');
         socket.off('lab_deleted');
       }
     };
@@ -148,6 +184,8 @@ const LabDetail: React.FC = () => {
       });
 
       setReservedHours(response.data.occupied_hours || []);
+      // Horario real del laboratorio (si el backend lo informa)
+      setOpenHours(response.data.open_hours || []);
     } catch (error) {
       console.error('Error al obtener horas reservadas:', error);
       setReservationError('No se pudieron cargar las horas disponibles.');
@@ -371,7 +409,7 @@ const LabDetail: React.FC = () => {
               Selecciona una hora
             </label>
             <div className="grid grid-cols-4 gap-2">
-              {HOURS.map((hour) => {
+              {(openHours.length > 0 ? openHours : HOURS).map((hour) => {
                 const isOccupied = reservedHours.includes(hour);
                 const isSelected = selectedHour === hour;
                 return (
@@ -69,12 +69,39 @@ const ReservationList: React.FC = () => {
           );
         }
       });
+      
+      // Un lugar de la lista de espera se convirtió en reserva
+      socket.on('waitlist_promoted', (data) => {
+        if (data.user_id === user.id) {
+          fetchReservations();
+        }
+      });
+      
+      // Escuchar cancelaciones en lote (p. ej. computadoras a mantenimiento)
+      socket.on('reservations_cancelled', (data) => {
+        const cancelled = new Set(
+          data.reservations
+            .filter((r: any) => r.user_id === user.id)
+            .map((r: any) => r.reservation_id)
+        );
+        if (cancelled.size > 0) {
+          setReservations(prevReservations =>
+            prevReservations.map(reservation =>
+              cancelled.has(reservation.id)
+                ? { ...reservation, status: 'cancelled' }
+                : reservation
+            )
+          );
+        }
+      });
     }
 
     return () => {
       if (socket) {
         socket.off('reservation_update');
         socket.off('reservation_status_updated');
+        socket.off('reservations_cancelled');
+        socket.off('waitlist_promoted');
       }
     };
   }, [user, socket]);
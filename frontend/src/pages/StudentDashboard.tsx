@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { useSocket } from '../SocketContext';
 import { useAuth } from '../AuthContext';
 import axios from 'axios';
@@ -9,12 +9,18 @@ interface Reservation {
   start_time: string;
   end_time: string;
   status: string;
-  computer?: {
-    name: string;
-    laboratory?: {
-      name: string;
-    };
-  };
+  computer_name?: string | null;
+  laboratory_name?: string | null;
+}
+
+// Varios eventos seguidos (p. ej. un cambio masivo) generan un solo refresco
+const REFRESH_DELAY_MS = 1000;
+
+interface DashboardStats {
+  total_labs: number;
+  available_computers: number;
+  total_reservations: number;
+  upcoming_reservations: number;
 }
 
 const StudentDashboard: React.FC = () => {
@@ -31,38 +37,31 @@ const StudentDashboard: React.FC = () => {
   const [myReservations, setMyReservations] = useState<Reservation[]>([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState('');
+  const refreshTimer = useRef<ReturnType<typeof setTimeout> | null>(null);
 
   const API_BASE_URL = (import.meta.env.VITE_API_URL || 'http://localhost:5000/api').replace(/\/+$/, '');
 
   useEffect(() => {
+    // Una sola petición con todo el panel; el navegador la revalida con ETag (304 si no cambió)
+    const loadDashboard = async () => {
+      const response = await axios.get(`${API_BASE_URL}/dashboard/student`);
+      const data: DashboardStats = response.data.stats;
+      setStats({
+        totalLabs: data.total_labs,
+        availableComputers: data.available_computers,
+        totalReservations: data.total_reservations,
+        upcomingReservations: data.upcoming_reservations
+      });
+      setMyReservations(response.data.recent_reservations);
+    };
+
     const fetchDashboardData = async () => {
       try {
         setLoading(true);
         setError('');
 
         console.log('📊 Cargando datos del dashboard del estudiante...');
-
-        // Obtener estadísticas generales
-        const [labsResponse, computersResponse, reservationsResponse, myReservationsResponse] = await Promise.all([
-          axios.get(`${API_BASE_URL}/labs`),
-          axios.get(`${API_BASE_URL}/computers/available`),
-          axios.get(`${API_BASE_URL}/reservations`),
-          axios.get(`${API_BASE_URL}/reservations/user/${user.id}`)
-        ]);
-
-        const now = new Date();
-        const upcomingReservations = reservationsResponse.data.filter(
-          (reservation: any) => new Date(reservation.start_time) > now
-        );
-
-        setStats({
-          totalLabs: labsResponse.data.length,
-          availableComputers: computersResponse.data.length,
-          totalReservations: reservationsResponse.data.length,
-          upcomingReservations: upcomingReservations.length
-        });
-
-        setMyReservations(myReservationsResponse.data);
+        await loadDashboard();
         setLoading(false);
 
         console.log('✅ Datos del dashboard cargados exitosamente');
@@ -74,100 +73,65 @@ const StudentDashboard: React.FC = () => {
       }
     };
 
+    const refreshDashboard = () => {
+      if (refreshTimer.current) clearTimeout(refreshTimer.current);
+      refreshTimer.current = setTimeout(() => {
+        refreshTimer.current = null;
+        loadDashboard().catch(err => console.error('❌ Error al actualizar el dashboard:', err));
+      }, REFRESH_DELAY_MS);
+    };
+
     fetchDashboardData();
 
     // Configurar listeners de Socket.IO para actualizaciones en tiempo real
     if (socket && user) {
       console.log('🎯 STUDENT DASHBOARD: Configurando listeners de Socket.IO');
       
-      // Escuchar actualizaciones de estado de computadoras
+      // Escuchar actualizaciones de estado de computadoras: el contador de
+      // disponibles se corrige con el propio evento, sin pedir nada al servidor
       socket.on('computer_status_updated', (data) => {
         console.log('🎯 STUDENT DASHBOARD: Evento computer_status_updated recibido');
-        
-        // Actualizar el contador de computadoras disponibles
-        axios.get(`${API_BASE_URL}/computers/available`)
-          .then(response => {
-            setStats(prev => ({
-              ...prev,
-              availableComputers: response.data.length
-            }));
-          })
-          .catch(err => console.error('❌ Error al actualizar computadoras disponibles:', err));
+        if (!data?.old_status || !data?.new_status) {
+          refreshDashboard();
+          return;
+        }
+        const delta = (data.new_status === 'available' ? 1 : 0) - (data.old_status === 'available' ? 1 : 0);
+        if (delta !== 0) {
+          setStats(prev => ({
+            ...prev,
+            availableComputers: Math.max(0, prev.availableComputers + delta)
+          }));
+        }
       });
 
       // Escuchar actualizaciones de estado de reservas (cuando admin aprueba/cancela)
       socket.on('reservation_status_updated', (data) => {
         console.log('🎯 STUDENT DASHBOARD: Evento reservation_status_updated recibido');
-        
-        // Solo actualizar si la reserva pertenece al usuario actual
-        if (data.user_id === user.id) {
-          console.log('   - Reserva pertenece al usuario actual, actualizando...');
-          
-          // Actualizar mis reservas
-          axios.get(`${API_BASE_URL}/reservations/user/${user.id}`)
-            .then(response => {
-              setMyReservations(response.data);
-            })
-            .catch(err => console.error('Error al actualizar mis reservas:', err));
-          
-          // Actualizar contadores de reservas
-          axios.get(`${API_BASE_URL}/reservations`)
-            .then(response => {
-              const now = new Date();
-              const upcomingReservations = response.data.filter(
-                (reservation: any) => new Date(reservation.start_time) > now
-              );
-
-              setStats(prev => ({
-                ...prev,
-                totalReservations: response.data.length,
-                upcomingReservations: upcomingReservations.length
-              }));
-            })
-            .catch(err => console.error('Error al actualizar reservas:', err));
-        }
-        
-        // También actualizar computadoras disponibles
-        axios.get(`${API_BASE_URL}/computers/available`)
-          .then(response => {
-            setStats(prev => ({
-              ...prev,
-              availableComputers: response.data.length
-            }));
-          })
-          .catch(err => console.error('Error al actualizar computadoras disponibles:', err));
+
+        // Solo interesan las reservas del usuario actual
+        if (data?.user_id !== user.id) return;
+
+        console.log('   - Reserva pertenece al usuario actual, actualizando...');
+        setMyReservations(prev => prev.map(reservation =>
+          reservation.id === data.reservation_id ? { ...reservation, status: data.new_status } : reservation
+        ));
+        // Los contadores por estado dependen de las fechas: se recalculan en el servidor
+        refreshDashboard();
       });
 
       // Escuchar nuevas reservas
-      socket.on('reservation_update', () => {
+      socket.on('reservation_update', (data) => {
         console.log('🎯 STUDENT DASHBOARD: Evento reservation_update recibido');
-        
-        // Actualizar mis reservas
-        axios.get(`${API_BASE_URL}/reservations/user/${user.id}`)
-          .then(response => {
-            setMyReservations(response.data);
-          })
-          .catch(err => console.error('Error al actualizar mis reservas:', err));
-        
-        // Actualizar contadores
-        axios.get(`${API_BASE_URL}/reservations`)
-          .then(response => {
-            const now = new Date();
-            const upcomingReservations = response.data.filter(
-              (reservation: any) => new Date(reservation.start_time) > now
-            );
-
-            setStats(prev => ({
-              ...prev,
-              totalReservations: response.data.length,
-              upcomingReservations: upcomingReservations.length
-            }));
-          })
-          .catch(err => console.error('Error al actualizar reservas:', err));
+        if (data?.user_id && data.user_id !== user.id) return;
+        refreshDashboard();
       });
     }
 
     return () => {
+      if (refreshTimer.current) {
+        clearTimeout(refreshTimer.current);
+        refreshTimer.current = null;
+      }
       if (socket) {
         console.log('StudentDashboard: Limpiando listeners de Socket.IO');
         socket.off('computer_status_updated');
@@ -270,7 +234,7 @@ const StudentDashboard: React.FC = () => {
             </div>
             <div className="ml-4">
               <p className="text-sm font-medium text-gray-600">Mis Reservas</p>
-              <p className="text-2xl font-semibold text-gray-900">{myReservations.length}</p>
+              <p className="text-2xl font-semibold text-gray-900">{stats.totalReservations}</p>
             </div>
           </div>
         </div>
@@ -286,7 +250,7 @@ const StudentDashboard: React.FC = () => {
             <div className="ml-4">
               <p className="text-sm font-medium text-gray-600">Próximas</p>
               <p className="text-2xl font-semibold text-gray-900">
-                {myReservations.filter(r => new Date(r.start_time) > new Date()).length}
+                {stats.upcomingReservations}
               </p>
             </div>
           </div>
@@ -369,10 +333,10 @@ const StudentDashboard: React.FC = () => {
                 {myReservations.slice(0, 5).map((reservation) => (
                   <tr key={reservation.id} className="hover:bg-gray-50">
                     <td className="px-6 py-4 whitespace-nowrap text-sm font-medium text-gray-900">
-                      {reservation.computer?.name || 'N/A'}
+                      {reservation.computer_name || 'N/A'}
                     </td>
                     <td className="px-6 py-4 whitespace-nowrap text-sm text-gray-500">
-                      {reservation.computer?.laboratory?.name || 'N/A'}
+                      {reservation.laboratory_name || 'N/A'}
                     </td>
                     <td className="px-6 py-4 whitespace-nowrap text-sm text-gray-500">
                       {formatDateTime(reservation.start_time)}
@@ -389,10 +353,10 @@ const StudentDashboard: React.FC = () => {
           </div>
         )}
         
-        {myReservations.length > 5 && (
+        {stats.totalReservations > myReservations.length && (
           <div className="mt-4 text-center">
             <Link to="/my-reservations" className="text-blue-600 hover:text-blue-800 font-medium">
-              Ver todas mis reservas ({myReservations.length})
+              Ver todas mis reservas ({stats.totalReservations})
             </Link>
           </div>
         )}
@@ -1,17 +1,23 @@
 from flask import Blueprint, request, jsonify
 from db import db
-from laboratory import Laboratory
+from laboratory import Laboratory, LABORATORY_PROJECTION
 from auth import token_required
 from socket_manager import socketio
+from catalog_cache import catalog_cached, bump_catalog_version
+from fast_json import json_response, sparse_fields
+from availability import invalidate_lab_templates
+from availability_cache import invalidate_all as invalidate_availability_cache
 
 lab_bp = Blueprint('labs', __name__)  # NO url_prefix aquí
 
 @lab_bp.route('', methods=['GET'])
-def get_all_labs():
-    labs = Laboratory.query.all()
-    return jsonify([lab.to_dict() for lab in labs]), 200
+@catalog_cached('labs')
+@sparse_fields(LABORATORY_PROJECTION)
+def get_all_labs(fields):
+    return json_response(LABORATORY_PROJECTION.rows(db.session, fields)), 200
 
 @lab_bp.route('/<int:lab_id>', methods=['GET'])
+@catalog_cached('labs:detail')
 def get_lab(lab_id):
     lab = Laboratory.query.get_or_404(lab_id)
     return jsonify(lab.to_dict()), 200
@@ -37,6 +43,7 @@ def create_lab(current_user):
     )
 
     db.session.add(new_lab)
+    bump_catalog_version()
     db.session.commit()
 
     return jsonify({'message': 'Laboratorio creado exitosamente', 'laboratory': new_lab.to_dict()}), 201
@@ -68,7 +75,10 @@ def update_lab(current_user, lab_id):
     if data.get('description'):
         lab.description = data['description']
 
+    bump_catalog_version()
     db.session.commit()
+    invalidate_lab_templates(lab_id)
+    invalidate_availability_cache('lab_hours')
 
     return jsonify({'message': 'Laboratorio actualizado exitosamente', 'laboratory': lab.to_dict()}), 200
 
@@ -84,7 +94,10 @@ def delete_lab(current_user, lab_id):
 
     try:
         db.session.delete(lab)
+        bump_catalog_version()
         db.session.commit()
+        invalidate_lab_templates(lab_id)
+        invalidate_availability_cache('lab_hours')
         
         # Emitir evento de eliminación en tiempo real
         socketio.emit('lab_deleted', {
@@ -1,5 +1,6 @@
 from datetime import datetime
 from db import db
+from fast_json import Projection, hhmm
 
 class Laboratory(db.Model):
     __tablename__ = 'laboratories'
@@ -32,3 +33,16 @@ class Laboratory(db.Model):
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
+
+# Campos de to_dict() para la ruta rápida de listados (ver fast_json.py)
+LABORATORY_PROJECTION = Projection([
+    ('id', Laboratory.id),
+    ('name', Laboratory.name),
+    ('location', Laboratory.location),
+    ('capacity', Laboratory.capacity),
+    ('opening_time', Laboratory.opening_time, hhmm),
+    ('closing_time', Laboratory.closing_time, hhmm),
+    ('description', Laboratory.description),
+    ('created_at', Laboratory.created_at),
+    ('updated_at', Laboratory.updated_at),
+])
@@ -0,0 +1,193 @@
+"""
+Barrido del ciclo de vida de las reservas.
+
+Cada LIFECYCLE_SWEEP_INTERVAL segundos (solo en la réplica líder, ver
+background_jobs.py) las reservas confirmadas que ya terminaron pasan a
+'completed' en lotes de LIFECYCLE_SWEEP_BATCH, y se recalcula con SQL por
+conjuntos el estado de sus computadoras: quedan 'reserved' si aún tienen otra
+reserva confirmada sin terminar y 'available' si no. Las computadoras en
+mantenimiento no se tocan.
+
+Las reservas que siguen 'pending' cuando su horario ya terminó nunca se
+confirmaron: pasan a 'cancelled' en lotes del mismo tamaño y se recalculan
+los bitmaps de sus días (ver bitmap_store.py) para que dejen de ocupar el
+horario. Las entradas de la lista de espera cuyo horario ya empezó pasan a
+'expired'.
+
+Por cada lote se emite un único evento reservations_completed (o
+reservations_cancelled con reason 'expired') y un computers_status_updated
+por estado nuevo.
+"""
+
+import logging
+import os
+from datetime import datetime
+
+from sqlalchemy import and_, case, exists, select, update
+
+import bitmap_store
+from background_jobs import register_job
+from catalog_cache import bump_catalog_version
+from computer import Computer
+from db import db
+from reservation import Reservation
+from socket_manager import socketio
+from waitlist import expire_waiting
+
+logger = logging.getLogger(__name__)
+
+SWEEP_INTERVAL = float(os.getenv('LIFECYCLE_SWEEP_INTERVAL', 60))
+SWEEP_BATCH = int(os.getenv('LIFECYCLE_SWEEP_BATCH', 500))
+# Tope de lotes por pasada para no acaparar la conexión tras una caída larga
+SWEEP_MAX_BATCHES = int(os.getenv('LIFECYCLE_SWEEP_MAX_BATCHES', 20))
+
+
+def _sweep_batch(now, batch_size):
+    """Completa un lote de reservas terminadas. Devuelve cuántas procesó"""
+    finished = db.session.execute(
+        select(Reservation.id, Reservation.user_id, Reservation.computer_id)
+        .where(Reservation.status == 'confirmed', Reservation.end_time <= now)
+        .order_by(Reservation.end_time)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    ).all()
+    if not finished:
+        return 0
+
+    computer_ids = sorted({row.computer_id for row in finished})
+    before = dict(db.session.execute(
+        select(Computer.id, Computer.status).where(Computer.id.in_(computer_ids))
+    ).all())
+
+    db.session.execute(
+        update(Reservation)
+        .where(Reservation.id.in_([row.id for row in finished]))
+        # updated_at va en UTC como en el resto de escrituras (rollups.py lo compara con su marca)
+        .values(status='completed', updated_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+
+    # El trigger after_reservation_confirm deja en 'available' la computadora de
+    # cada reserva completada, incluso si estaba en mantenimiento: esas vuelven
+    # a 'maintenance' según la foto previa y el resto queda 'reserved' si tiene
+    # otra confirmada
+    in_maintenance = [computer_id for computer_id, status in before.items() if status == 'maintenance']
+    if in_maintenance:
+        db.session.execute(
+            update(Computer)
+            .where(Computer.id.in_(in_maintenance))
+            .values(status='maintenance')
+            .execution_options(synchronize_session=False)
+        )
+    still_reserved = exists().where(
+        Reservation.computer_id == Computer.id,
+        Reservation.status == 'confirmed',
+        Reservation.end_time > now
+    )
+    db.session.execute(
+        update(Computer)
+        .where(Computer.id.in_([cid for cid in computer_ids if cid not in in_maintenance]),
+               Computer.status.in_(['reserved', 'available']))
+        .values(status=case((still_reserved, 'reserved'), else_='available'))
+        .execution_options(synchronize_session=False)
+    )
+
+    after = db.session.execute(
+        select(Computer.id, Computer.status, Computer.laboratory_id).where(Computer.id.in_(computer_ids))
+    ).all()
+    changed = [row for row in after if before.get(row.id) != row.status]
+    if changed:
+        bump_catalog_version()
+    db.session.commit()
+
+    socketio.emit('reservations_completed', {
+        'count': len(finished),
+        'reservations': [
+            {'reservation_id': row.id, 'user_id': row.user_id, 'computer_id': row.computer_id}
+            for row in finished
+        ]
+    })
+
+    by_status = {}
+    for row in changed:
+        by_status.setdefault(row.status, []).append(row)
+    for new_status, rows in by_status.items():
+        socketio.emit('computers_status_updated', {
+            'new_status': new_status,
+            'count': len(rows),
+            'laboratory_ids': sorted({row.laboratory_id for row in rows}),
+            'computers': [
+                {'computer_id': row.id, 'old_status': before.get(row.id), 'laboratory_id': row.laboratory_id}
+                for row in rows
+            ]
+        })
+
+    return len(finished)
+
+
+def _expire_batch(now, batch_size):
+    """Cancela un lote de reservas pendientes ya terminadas. Devuelve cuántas procesó"""
+    expired = db.session.execute(
+        select(Reservation.id, Reservation.user_id, Reservation.computer_id,
+               Reservation.start_time, Reservation.end_time)
+        .where(Reservation.status == 'pending', Reservation.end_time <= now)
+        .order_by(Reservation.end_time)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    ).all()
+    if not expired:
+        return 0
+
+    # Las pendientes no cambian el estado de la computadora (el trigger solo
+    # actúa sobre las confirmadas), así que no hace falta tocar el catálogo
+    db.session.execute(
+        update(Reservation)
+        .where(Reservation.id.in_([row.id for row in expired]))
+        .values(status='cancelled', updated_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    pairs = set()
+    for row in expired:
+        pairs |= bitmap_store.pairs_for(row.computer_id, row.start_time, row.end_time)
+    bitmap_store.refresh(pairs, 'expired')
+    db.session.commit()
+
+    socketio.emit('reservations_cancelled', {
+        'reason': 'expired',
+        'count': len(expired),
+        'reservations': [
+            {'reservation_id': row.id, 'user_id': row.user_id, 'computer_id': row.computer_id}
+            for row in expired
+        ]
+    })
+    return len(expired)
+
+
+def _run_batches(sweep, now, batch_size, max_batches):
+    total = 0
+    for _ in range(max_batches):
+        processed = sweep(now, batch_size)
+        total += processed
+        if processed < batch_size:
+            break
+    return total
+
+
+def sweep_reservations(now=None, batch_size=SWEEP_BATCH, max_batches=SWEEP_MAX_BATCHES):
+    """
+    Completa las reservas confirmadas ya terminadas y cancela las pendientes
+    que terminaron sin confirmarse. Devuelve el total procesado.
+    """
+    now = now or datetime.now()
+    completed = _run_batches(_sweep_batch, now, batch_size, max_batches)
+    expired = _run_batches(_expire_batch, now, batch_size, max_batches)
+    # Entradas de la lista de espera cuyo horario ya empezó: nunca se van a promover
+    stale_entries = expire_waiting(now)
+    db.session.commit()
+    if completed or expired or stale_entries:
+        logger.info(f"Barrido de reservas: {completed} completadas, {expired} pendientes vencidas canceladas, "
+                    f"{stale_entries} entradas de lista de espera vencidas")
+    return completed + expired
+
+
+register_job('reservation_lifecycle', SWEEP_INTERVAL, sweep_reservations)
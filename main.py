@@ -9,7 +9,24 @@ from socket_manager import socketio
 from lab import lab_bp
 from computer import computer_bp
 from reservation import reservation_bp
+from maintenance import maintenance_bp
+from waitlist import waitlist_bp
+from dashboard import dashboard_bp
+from admin import admin_bp
+from batch import batch_bp
+from analytics import analytics_bp
 from user import User
+from db_pool import pool_options, pool_stats
+from read_replica import init_read_replicas, replica_binds, router as replica_router
+from query_stats import init_query_stats
+from metrics import init_metrics, SOCKETIO_CONNECTED
+from fast_json import init_compression
+from background_jobs import start_background_jobs
+import lifecycle  # registra el barrido de reservas terminadas
+import reminders  # registra el envío de recordatorios
+import rollups  # registra los resúmenes diarios de uso
+import archive  # registra el archivado de reservas terminadas
+from sqlalchemy import text
 import time
 
 app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
@@ -28,11 +45,32 @@ app.config['SQLALCHEMY_DATABASE_URI'] = (
     f"{os.getenv('DB_PASSWORD', 'password')}@{os.getenv('DB_HOST', 'localhost')}:" 
     f"{os.getenv('DB_PORT', '3306')}/{os.getenv('DB_NAME', 'reservas_db')}"
 )
+# Réplicas de solo lectura (DB_REPLICA_HOSTS), mismas credenciales que el primario
+app.config['SQLALCHEMY_BINDS'] = replica_binds(
+    os.getenv('DB_USERNAME', 'root'),
+    os.getenv('DB_PASSWORD', 'password'),
+    os.getenv('DB_NAME', 'reservas_db'),
+    os.getenv('DB_PORT', '3306')
+)
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+# Pool de conexiones configurable por entorno (ver db_pool.py)
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = pool_options()
 
 # Inicializar la base de datos con la app
 db.init_app(app)
 
+# Enviar las lecturas de los blueprints a réplicas cuando estén sanas
+init_read_replicas(app, db)
+
+# Conteo de consultas por petición y detector de N+1
+init_query_stats(app)
+
+# Métricas Prometheus en /metrics
+init_metrics(app, db)
+
+# Compresión gzip/brotli de respuestas JSON grandes
+init_compression(app)
+
 # Inicializar JWT
 jwt = JWTManager(app)  # <-- AÑADIDO
 
@@ -44,6 +82,12 @@ app.register_blueprint(auth_bp, url_prefix='/api/auth')
 app.register_blueprint(lab_bp, url_prefix='/api/labs')
 app.register_blueprint(computer_bp, url_prefix='/api/computers')
 app.register_blueprint(reservation_bp, url_prefix='/api/reservations')
+app.register_blueprint(maintenance_bp, url_prefix='/api/maintenance')
+app.register_blueprint(waitlist_bp, url_prefix='/api/waitlist')
+app.register_blueprint(dashboard_bp, url_prefix='/api/dashboard')
+app.register_blueprint(admin_bp, url_prefix='/api/admin')
+app.register_blueprint(batch_bp, url_prefix='/api/batch')
+app.register_blueprint(analytics_bp, url_prefix='/api/analytics')
 
 @app.route('/api/superuser/admins', methods=['GET'])
 @token_required
@@ -84,14 +128,16 @@ def crear_admin(current_user):
 @app.route('/api/health', methods=['GET'])
 def health_check():
     try:
-        # Verificar conexión a la base de datos
-        with app.app_context():
-            db.engine.connect()
+        # Verificar conexión a la base de datos (la conexión vuelve al pool al salir)
+        with db.engine.connect() as connection:
+            connection.execute(text('SELECT 1'))
         
         return jsonify({
             "status": "ok", 
             "message": "Sistema de reservas funcionando correctamente",
             "database": "connected",
+            "pool": pool_stats(db.engine),
+            "replicas": replica_router.status(),
             "timestamp": datetime.datetime.utcnow().isoformat()
         })
     except Exception as e:
@@ -102,6 +148,11 @@ def health_check():
             "timestamp": datetime.datetime.utcnow().isoformat()
         }), 500
 
+# Gauges del pool de conexiones
+@app.route('/api/health/pool', methods=['GET'])
+def pool_health():
+    return jsonify(pool_stats(db.engine))
+
 # Fallback a SPA index.html
 @app.route('/', defaults={'path': ''})
 @app.route('/<path:path>')
@@ -118,10 +169,12 @@ def serve(path):
 # Eventos SocketIO
 @socketio.on('connect')
 def handle_connect():
+    SOCKETIO_CONNECTED.inc()
     print('Cliente conectado')
 
 @socketio.on('disconnect')
 def handle_disconnect():
+    SOCKETIO_CONNECTED.dec()
     print('Cliente desconectado')
 
 if __name__ == '__main__':
@@ -132,8 +185,8 @@ if __name__ == '__main__':
     while retry_count < max_retries:
         try:
             with app.app_context():
-                db.engine.connect()
-                print("Base de datos conectada exitosamente")
+                with db.engine.connect():
+                    print("Base de datos conectada exitosamente")
                 break
         except Exception as e:
             retry_count += 1
@@ -144,6 +197,13 @@ if __name__ == '__main__':
         print("Error: No se pudo conectar a la base de datos después de varios intentos")
         exit(1)
     
-    with app.app_context():
-        db.create_all()
+    # En producción el esquema lo gestiona migrate.py (se ejecuta desde start.sh);
+    # create_all solo se usa para levantar rápido un entorno de desarrollo
+    if os.getenv('FLASK_ENV') != 'production':
+        with app.app_context():
+            # Solo en el primario: las réplicas reciben el esquema por replicación
+            db.create_all(bind_key=None)
+
+    # Tareas periódicas (solo se ejecutan en la réplica líder)
+    start_background_jobs(app)
     socketio.run(app, host='0.0.0.0', port=5000)
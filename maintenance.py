@@ -0,0 +1,193 @@
+"""
+Ventanas de mantenimiento de laboratorios o computadoras.
+
+Al crear una ventana se cancelan en bloque las reservas pendientes o
+confirmadas que se solapan con ella (una consulta y un UPDATE, ver
+reservation.cancel_overlapping_reservations) y se envía una sola
+notificación por usuario afectado. Los endpoints de disponibilidad tratan
+las ventanas como horas ocupadas.
+"""
+
+from datetime import datetime
+
+from flask import Blueprint, jsonify, request
+from sqlalchemy import or_, select
+
+import availability
+import availability_cache
+import bitmap_store
+from auth import token_required
+from computer import Computer
+from db import db
+from reservation import announce_cancelled_reservations, cancel_overlapping_reservations
+from socket_manager import socketio
+
+maintenance_bp = Blueprint('maintenance', __name__)
+
+
+class MaintenanceWindow(db.Model):
+    __tablename__ = 'maintenance_windows'
+    # Mismos índices que migrations/0007_maintenance_windows.py
+    __table_args__ = (
+        db.Index('idx_maintenance_computer_time', 'computer_id', 'start_time', 'end_time'),
+        db.Index('idx_maintenance_laboratory_time', 'laboratory_id', 'start_time', 'end_time'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    laboratory_id = db.Column(db.Integer, db.ForeignKey('laboratories.id', ondelete='CASCADE'))
+    computer_id = db.Column(db.Integer, db.ForeignKey('computers.id', ondelete='CASCADE'))
+    start_time = db.Column(db.DateTime, nullable=False)
+    end_time = db.Column(db.DateTime, nullable=False)
+    reason = db.Column(db.String(255))
+    created_by = db.Column(db.Integer, db.ForeignKey('users.id'))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<MaintenanceWindow {self.id}>'
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'laboratory_id': self.laboratory_id,
+            'computer_id': self.computer_id,
+            'start_time': self.start_time.isoformat() if self.start_time else None,
+            'end_time': self.end_time.isoformat() if self.end_time else None,
+            'reason': self.reason,
+            'created_by': self.created_by,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+
+
+def maintenance_intervals(computer_id, range_start, range_end):
+    """
+    Intervalos (inicio, fin) de las ventanas que afectan a la computadora
+    (propias o de su laboratorio) y se solapan con [range_start, range_end)
+    """
+    laboratory_id = select(Computer.laboratory_id).where(Computer.id == computer_id).scalar_subquery()
+    rows = db.session.execute(
+        select(MaintenanceWindow.start_time, MaintenanceWindow.end_time)
+        .where(
+            or_(MaintenanceWindow.computer_id == computer_id,
+                MaintenanceWindow.laboratory_id == laboratory_id),
+            MaintenanceWindow.start_time < range_end,
+            MaintenanceWindow.end_time > range_start
+        )
+        .order_by(MaintenanceWindow.start_time)
+    ).all()
+    return [(start, end) for start, end in rows]
+
+
+def _invalidate_availability(computer_ids, start_time, end_time):
+    availability_cache.invalidate({
+        pair for computer_id in computer_ids for pair in bitmap_store.pairs_for(computer_id, start_time, end_time)
+    }, 'maintenance')
+
+
+# Listar ventanas de mantenimiento (por defecto las que no terminaron)
+@maintenance_bp.route('', methods=['GET'])
+@token_required
+def get_maintenance_windows(current_user):
+    query = MaintenanceWindow.query
+    laboratory_id = request.args.get('laboratory_id', type=int)
+    computer_id = request.args.get('computer_id', type=int)
+
+    if laboratory_id:
+        query = query.filter(MaintenanceWindow.laboratory_id == laboratory_id)
+    if computer_id:
+        query = query.filter(MaintenanceWindow.computer_id == computer_id)
+    if request.args.get('all') != 'true':
+        # Las ventanas se guardan en hora local sin zona, igual que las reservas
+        query = query.filter(MaintenanceWindow.end_time > datetime.now())
+
+    windows = query.order_by(MaintenanceWindow.start_time).all()
+    return jsonify([w.to_dict() for w in windows])
+
+
+# Crear ventana de mantenimiento (solo admin)
+@maintenance_bp.route('', methods=['POST'])
+@token_required
+def create_maintenance_window(current_user):
+    if current_user.role != 'admin':
+        return jsonify({'message': 'Acceso denegado: se requiere rol admin'}), 403
+
+    data = request.get_json() or {}
+    laboratory_id = data.get('laboratory_id')
+    computer_id = data.get('computer_id')
+
+    if bool(laboratory_id) == bool(computer_id):
+        return jsonify({'message': 'Indica laboratory_id o computer_id (solo uno)'}), 400
+
+    for name, value in (('laboratory_id', laboratory_id), ('computer_id', computer_id)):
+        # bool es subclase de int: true/false del JSON no son ids
+        if value is not None and (not isinstance(value, int) or isinstance(value, bool)):
+            return jsonify({'message': f'{name} debe ser un entero'}), 400
+
+    try:
+        # Como en los endpoints de disponibilidad: se guarda en hora local sin zona
+        start_time = availability.naive(datetime.fromisoformat(data.get('start_time')))
+        end_time = availability.naive(datetime.fromisoformat(data.get('end_time')))
+    except (TypeError, ValueError):
+        return jsonify({'message': 'Faltan start_time o end_time, o tienen formato inválido'}), 400
+
+    if start_time >= end_time:
+        return jsonify({'message': 'La hora de inicio debe ser antes de la hora de fin'}), 400
+
+    if computer_id:
+        computer_ids = db.session.execute(
+            select(Computer.id).where(Computer.id == computer_id)
+        ).scalars().all()
+        if not computer_ids:
+            return jsonify({'message': 'Computadora no encontrada'}), 404
+    else:
+        from laboratory import Laboratory
+        if not db.session.get(Laboratory, laboratory_id):
+            return jsonify({'message': 'Laboratorio no encontrado'}), 404
+        computer_ids = db.session.execute(
+            select(Computer.id).where(Computer.laboratory_id == laboratory_id)
+        ).scalars().all()
+
+    reason = data.get('reason') or 'Mantenimiento programado'
+    window = MaintenanceWindow(
+        laboratory_id=laboratory_id or None,
+        computer_id=computer_id or None,
+        start_time=start_time,
+        end_time=end_time,
+        reason=reason[:255],
+        created_by=current_user.id
+    )
+    db.session.add(window)
+    cancelled = cancel_overlapping_reservations(computer_ids, start_time, end_time)
+    _invalidate_availability(computer_ids, start_time, end_time)
+    db.session.commit()
+
+    socketio.emit('maintenance_window_created', window.to_dict())
+    announce_cancelled_reservations(cancelled, reason)
+
+    return jsonify({
+        'message': 'Ventana de mantenimiento creada',
+        'maintenance_window': window.to_dict(),
+        'cancelled_reservations': [r['reservation_id'] for r in cancelled]
+    }), 201
+
+
+# Eliminar ventana de mantenimiento (solo admin); las reservas canceladas no se restauran
+@maintenance_bp.route('/<int:window_id>', methods=['DELETE'])
+@token_required
+def delete_maintenance_window(current_user, window_id):
+    if current_user.role != 'admin':
+        return jsonify({'message': 'Acceso denegado: se requiere rol admin'}), 403
+
+    window = db.session.get(MaintenanceWindow, window_id)
+    if not window:
+        return jsonify({'message': 'Ventana de mantenimiento no encontrada'}), 404
+
+    data = window.to_dict()
+    computer_ids = [window.computer_id] if window.computer_id else db.session.execute(
+        select(Computer.id).where(Computer.laboratory_id == window.laboratory_id)
+    ).scalars().all()
+    _invalidate_availability(computer_ids, window.start_time, window.end_time)
+    db.session.delete(window)
+    db.session.commit()
+
+    socketio.emit('maintenance_window_deleted', data)
+    return jsonify({'message': f'Ventana de mantenimiento {window_id} eliminada'})
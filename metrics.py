@@ -0,0 +1,167 @@
+"""
+Métricas en formato Prometheus para el backend.
+
+Expone /metrics con:
+  - peticiones, latencia y errores por blueprint/ruta
+  - gauges del pool de conexiones (ver db_pool.py)
+  - clientes Socket.IO conectados y eventos emitidos
+  - resultado de los envíos al microservicio de notificaciones
+
+Si el backend corre con varios procesos (gunicorn, etc.) hay que definir
+PROMETHEUS_MULTIPROC_DIR con un directorio vacío por pod: cada proceso
+escribe ahí sus valores y /metrics los agrega. Cada réplica del Deployment
+se scrapea por separado y Prometheus suma por etiqueta de pod.
+"""
+
+import os
+import time
+
+from flask import Response, g, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client.core import GaugeMetricFamily
+
+# Buckets pensados para una API interna: la mayoría de respuestas < 250ms
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+HTTP_REQUESTS = Counter(
+    'http_requests_total',
+    'Peticiones HTTP atendidas',
+    ['blueprint', 'route', 'method', 'status']
+)
+HTTP_LATENCY = Histogram(
+    'http_request_duration_seconds',
+    'Latencia de las peticiones HTTP',
+    ['blueprint', 'route', 'method'],
+    buckets=LATENCY_BUCKETS
+)
+HTTP_ERRORS = Counter(
+    'http_request_errors_total',
+    'Peticiones HTTP que terminaron con error 5xx',
+    ['blueprint', 'route', 'method']
+)
+
+SOCKETIO_CONNECTED = Gauge(
+    'socketio_connected_clients',
+    'Clientes Socket.IO conectados',
+    multiprocess_mode='livesum'
+)
+SOCKETIO_EMITS = Counter(
+    'socketio_emits_total',
+    'Eventos Socket.IO emitidos',
+    ['event']
+)
+
+CATALOG_CACHE_REQUESTS = Counter(
+    'catalog_cache_requests_total',
+    'Peticiones al catálogo cacheado por resultado (hit, miss, not_modified)',
+    ['cache', 'result']
+)
+
+AVAILABILITY_CACHE_REQUESTS = Counter(
+    'availability_cache_requests_total',
+    'Peticiones de disponibilidad por resultado de la caché (hit, miss)',
+    ['endpoint', 'result']
+)
+AVAILABILITY_CACHE_INVALIDATIONS = Counter(
+    'availability_cache_invalidations_total',
+    'Pares (computadora, día) invalidados en la caché de disponibilidad',
+    ['reason']
+)
+
+SINGLE_FLIGHT_REQUESTS = Counter(
+    'single_flight_requests_total',
+    'GET coalescidos: leader ejecuta la vista, follower reutiliza su respuesta',
+    ['endpoint', 'role']
+)
+
+NOTIFICATION_SENDS = Counter(
+    'notification_sends_total',
+    'Envíos al microservicio de notificaciones',
+    ['type', 'outcome']
+)
+
+
+class PoolCollector:
+    """Publica los gauges del pool en cada scrape (valores del proceso que responde)"""
+
+    def __init__(self, db, app):
+        self.db = db
+        self.app = app
+
+    def collect(self):
+        # Import diferido: db_pool no depende de Flask ni de este módulo
+        from db_pool import pool_stats
+
+        families = {
+            'size': GaugeMetricFamily('db_pool_size', 'Tamaño configurado del pool', labels=['bind']),
+            'checked_out': GaugeMetricFamily('db_pool_checked_out', 'Conexiones en uso', labels=['bind']),
+            'idle': GaugeMetricFamily('db_pool_idle', 'Conexiones libres en el pool', labels=['bind']),
+            'overflow': GaugeMetricFamily('db_pool_overflow', 'Conexiones por encima de pool_size', labels=['bind']),
+            'wait_seconds_total': GaugeMetricFamily(
+                'db_pool_wait_seconds_total', 'Tiempo acumulado esperando conexión', labels=['bind']
+            ),
+            'wait_seconds_max': GaugeMetricFamily(
+                'db_pool_wait_seconds_max', 'Mayor espera por una conexión', labels=['bind']
+            ),
+            'timeouts': GaugeMetricFamily('db_pool_timeouts', 'Esperas que agotaron pool_timeout', labels=['bind']),
+        }
+
+        with self.app.app_context():
+            engines = dict(self.db.engines)
+
+        for bind_key, engine in engines.items():
+            stats = pool_stats(engine)
+            label = bind_key or 'primary'
+            for key, family in families.items():
+                if key in stats:
+                    family.add_metric([label], stats[key])
+
+        yield from families.values()
+
+
+def _route_labels():
+    blueprint = request.blueprint or 'app'
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    return blueprint, route, request.method
+
+
+def init_metrics(app, db):
+    """Registra los hooks de medición y la ruta /metrics"""
+    multiproc_dir = os.getenv('PROMETHEUS_MULTIPROC_DIR')
+    if multiproc_dir:
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    registry.register(PoolCollector(db, app))
+
+    @app.before_request
+    def start_request_timer():
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def record_request_metrics(response):
+        started = g.get('request_started')
+        if started is None or request.path == '/metrics':
+            return response
+
+        blueprint, route, method = _route_labels()
+        HTTP_LATENCY.labels(blueprint, route, method).observe(time.perf_counter() - started)
+        HTTP_REQUESTS.labels(blueprint, route, method, str(response.status_code)).inc()
+        if response.status_code >= 500:
+            HTTP_ERRORS.labels(blueprint, route, method).inc()
+        return response
+
+    @app.route('/metrics', methods=['GET'])
+    def metrics():
+        return Response(generate_latest(registry), mimetype=CONTENT_TYPE_LATEST)
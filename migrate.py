@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Aplica las migraciones pendientes de migrations/ sobre la base de datos.
+
+Se ejecuta en cada despliegue desde start.sh, antes de arrancar la aplicación.
+Con varias réplicas arrancando a la vez, solo una aplica las migraciones
+gracias a un lock con nombre de MySQL (GET_LOCK); las demás esperan y luego
+no encuentran nada pendiente.
+
+Uso:
+    python migrate.py            # aplica las pendientes
+    python migrate.py --status   # lista aplicadas y pendientes
+    python migrate.py --down     # revierte la última aplicada (si define downgrade)
+"""
+import importlib.util
+import logging
+import os
+import re
+import sys
+
+from sqlalchemy import create_engine, text
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations')
+MIGRATION_FILE_RE = re.compile(r'^(\d{4})_(\w+)\.py$')
+LOCK_NAME = 'reservas_schema_migrations'
+LOCK_TIMEOUT = int(os.getenv('DB_MIGRATION_LOCK_TIMEOUT', 120))
+
+
+def database_url():
+    return (
+        f"mysql+pymysql://{os.getenv('DB_USERNAME', 'root')}:"
+        f"{os.getenv('DB_PASSWORD', 'password')}@{os.getenv('DB_HOST', 'localhost')}:"
+        f"{os.getenv('DB_PORT', '3306')}/{os.getenv('DB_NAME', 'reservas_db')}"
+    )
+
+
+def discover_migrations():
+    """Devuelve [(versión, nombre, ruta)] ordenado por versión"""
+    migrations = []
+    for filename in sorted(os.listdir(MIGRATIONS_DIR)):
+        match = MIGRATION_FILE_RE.match(filename)
+        if match:
+            migrations.append((match.group(1), match.group(2), os.path.join(MIGRATIONS_DIR, filename)))
+    return migrations
+
+
+def load_migration(version, name, path):
+    spec = importlib.util.spec_from_file_location(f'migrations.m{version}_{name}', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def ensure_migrations_table(conn):
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version VARCHAR(20) PRIMARY KEY,
+            name VARCHAR(255) NOT NULL,
+            applied_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    """))
+
+
+def applied_versions(conn):
+    return {row[0] for row in conn.execute(text("SELECT version FROM schema_migrations"))}
+
+
+def run_migrations(engine):
+    """Aplica las migraciones pendientes. Devuelve la lista de versiones aplicadas"""
+    applied_now = []
+    with engine.connect() as conn:
+        if not conn.execute(text("SELECT GET_LOCK(:name, :timeout)"),
+                            {'name': LOCK_NAME, 'timeout': LOCK_TIMEOUT}).scalar():
+            raise RuntimeError('No se pudo obtener el lock de migraciones')
+        try:
+            ensure_migrations_table(conn)
+            conn.commit()
+            done = applied_versions(conn)
+
+            for version, name, path in discover_migrations():
+                if version in done:
+                    continue
+                logger.info(f"Aplicando migración {version}_{name}...")
+                module = load_migration(version, name, path)
+                module.upgrade(conn)
+                conn.execute(text("INSERT INTO schema_migrations (version, name) VALUES (:version, :name)"),
+                             {'version': version, 'name': name})
+                conn.commit()
+                applied_now.append(version)
+        finally:
+            conn.execute(text("SELECT RELEASE_LOCK(:name)"), {'name': LOCK_NAME})
+            conn.commit()
+
+    return applied_now
+
+
+def revert_last(engine):
+    """
+    Revierte la última migración aplicada con su `downgrade(conn)`. Devuelve
+    la versión revertida o None si no hay ninguna aplicada.
+    """
+    with engine.connect() as conn:
+        if not conn.execute(text("SELECT GET_LOCK(:name, :timeout)"),
+                            {'name': LOCK_NAME, 'timeout': LOCK_TIMEOUT}).scalar():
+            raise RuntimeError('No se pudo obtener el lock de migraciones')
+        try:
+            ensure_migrations_table(conn)
+            conn.commit()
+            done = applied_versions(conn)
+            applied = [m for m in discover_migrations() if m[0] in done]
+            if not applied:
+                return None
+
+            version, name, path = applied[-1]
+            module = load_migration(version, name, path)
+            if not hasattr(module, 'downgrade'):
+                raise RuntimeError(f'La migración {version}_{name} no se puede revertir (no define downgrade)')
+            logger.info(f"Revirtiendo migración {version}_{name}...")
+            module.downgrade(conn)
+            conn.execute(text("DELETE FROM schema_migrations WHERE version = :version"), {'version': version})
+            conn.commit()
+            return version
+        finally:
+            conn.execute(text("SELECT RELEASE_LOCK(:name)"), {'name': LOCK_NAME})
+            conn.commit()
+
+
+def print_status(engine):
+    with engine.connect() as conn:
+        ensure_migrations_table(conn)
+        conn.commit()
+        done = applied_versions(conn)
+    for version, name, _ in discover_migrations():
+        mark = 'aplicada ' if version in done else 'pendiente'
+        print(f"[{mark}] {version}_{name}")
+
+
+if __name__ == '__main__':
+    # La carpeta del proyecto debe estar en el path para `from migrations import ...`
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    engine = create_engine(database_url())
+
+    if '--status' in sys.argv:
+        print_status(engine)
+        sys.exit(0)
+
+    if '--down' in sys.argv:
+        try:
+            reverted = revert_last(engine)
+        except Exception as e:
+            logger.error(f"Error revirtiendo la migración: {e}")
+            sys.exit(1)
+        logger.info(f"Migración revertida: {reverted}" if reverted else "No hay migraciones aplicadas")
+        sys.exit(0)
+
+    try:
+        applied = run_migrations(engine)
+    except Exception as e:
+        logger.error(f"Error aplicando migraciones: {e}")
+        sys.exit(1)
+
+    if applied:
+        logger.info(f"Migraciones aplicadas: {', '.join(applied)}")
+    else:
+        logger.info("El esquema ya está al día")
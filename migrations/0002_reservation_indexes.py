@@ -0,0 +1,42 @@
+"""Índices compuestos para solapamiento/disponibilidad y listados por usuario"""
+
+from migrations import create_index, drop_index
+
+# Índices de init.sql que quedan cubiertos o sobran: nombre -> columnas
+OLD_INDEXES = {
+    'idx_reservations_computer_id': ['computer_id'],
+    'idx_reservations_user_id': ['user_id'],
+    'idx_reservations_status': ['status'],
+    'idx_reservations_start_time': ['start_time'],
+}
+
+
+def upgrade(conn):
+    # Cubre create_reservation, get_availability y get_occupied_hours:
+    # igualdad en computer_id, IN en status y rango en start_time/end_time
+    create_index(
+        conn, 'reservations', 'idx_reservations_computer_status_time',
+        ['computer_id', 'status', 'start_time', 'end_time']
+    )
+    # get_user_reservations / get_user_reservations_by_id (ORDER BY created_at)
+    create_index(
+        conn, 'reservations', 'idx_reservations_user_created',
+        ['user_id', 'created_at']
+    )
+
+    # Los índices de init.sql sobre computer_id y user_id quedan cubiertos por
+    # el prefijo de los compuestos (y siguen sirviendo a las claves foráneas).
+    # Los de status y start_time sueltos sobran: las consultas calientes filtran
+    # también por computer_id y usan el compuesto, y status solo tiene cuatro
+    # valores (las migraciones siguientes agregan los compuestos que necesitan)
+    for name in OLD_INDEXES:
+        drop_index(conn, 'reservations', name)
+
+
+def downgrade(conn):
+    # Primero los índices sueltos: las claves foráneas necesitan uno sobre
+    # computer_id y user_id antes de quitar los compuestos
+    for name, columns in OLD_INDEXES.items():
+        create_index(conn, 'reservations', name, columns)
+    drop_index(conn, 'reservations', 'idx_reservations_computer_status_time')
+    drop_index(conn, 'reservations', 'idx_reservations_user_created')
@@ -0,0 +1,14 @@
+"""Índices de notificaciones: no leídas por usuario y bandeja ordenada por fecha"""
+
+from migrations import create_index
+
+
+def upgrade(conn):
+    create_index(
+        conn, 'notifications', 'idx_notifications_user_status_created',
+        ['user_id', 'status', 'created_at']
+    )
+    create_index(
+        conn, 'notifications', 'idx_notifications_user_created',
+        ['user_id', 'created_at']
+    )
@@ -0,0 +1,13 @@
+"""Contador de versión del catálogo compartido entre réplicas (ver catalog_cache.py)"""
+
+from sqlalchemy import text
+
+
+def upgrade(conn):
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS catalog_version (
+            id INT PRIMARY KEY,
+            version BIGINT NOT NULL DEFAULT 0
+        )
+    """))
+    conn.execute(text("INSERT IGNORE INTO catalog_version (id, version) VALUES (1, 0)"))
@@ -0,0 +1,44 @@
+"""Specs de computadoras como JSON con columnas generadas e indexadas (CPU, RAM, disco, GPU)"""
+
+import json
+
+from sqlalchemy import text
+
+from migrations import column_exists, create_index
+from specs import normalize_specs
+
+# columna -> definición (VIRTUAL: no ocupa espacio en la fila, solo en el índice)
+GENERATED_COLUMNS = [
+    ('spec_cpu', "VARCHAR(100) GENERATED ALWAYS AS (specs->>'$.cpu') VIRTUAL"),
+    ('spec_ram_gb', "INT UNSIGNED GENERATED ALWAYS AS (CAST(specs->>'$.ram_gb' AS UNSIGNED)) VIRTUAL"),
+    ('spec_storage_gb', "INT UNSIGNED GENERATED ALWAYS AS (CAST(specs->>'$.storage_gb' AS UNSIGNED)) VIRTUAL"),
+    ('spec_gpu', "VARCHAR(100) GENERATED ALWAYS AS (specs->>'$.gpu') VIRTUAL"),
+]
+
+
+def upgrade(conn):
+    # 1. Reescribir el texto libre actual como JSON estructurado (las filas de
+    #    init.sql solo tienen {"description": "..."})
+    rows = conn.execute(text("SELECT id, specs FROM computers")).all()
+    updates = []
+    for computer_id, raw_specs in rows:
+        specs = normalize_specs(raw_specs)
+        updates.append({'id': computer_id, 'specs': json.dumps(specs, ensure_ascii=False) if specs else None})
+    if updates:
+        conn.execute(text("UPDATE computers SET specs = :specs WHERE id = :id"), updates)
+        conn.commit()
+
+    # 2. Columna nativa JSON (todas las filas ya son JSON válido o NULL)
+    conn.execute(text("ALTER TABLE computers MODIFY specs JSON NULL"))
+
+    # 3. Atributos comunes como columnas generadas con índice
+    for column, definition in GENERATED_COLUMNS:
+        if not column_exists(conn, 'computers', column):
+            conn.execute(text(f"ALTER TABLE computers ADD COLUMN {column} {definition}"))
+
+    create_index(conn, 'computers', 'idx_computers_spec_ram', ['spec_ram_gb'])
+    create_index(conn, 'computers', 'idx_computers_spec_storage', ['spec_storage_gb'])
+    create_index(conn, 'computers', 'idx_computers_spec_cpu', ['spec_cpu'])
+    create_index(conn, 'computers', 'idx_computers_spec_gpu', ['spec_gpu'])
+    # Búsquedas dentro de un laboratorio filtradas por RAM
+    create_index(conn, 'computers', 'idx_computers_lab_ram', ['laboratory_id', 'spec_ram_gb'])
@@ -0,0 +1,18 @@
+"""Hostname único en computers (el modelo lo declara pero init.sql no lo creó)"""
+
+from sqlalchemy import text
+
+from migrations import create_index
+
+
+def upgrade(conn):
+    duplicates = conn.execute(text(
+        "SELECT hostname FROM computers GROUP BY hostname HAVING COUNT(*) > 1"
+    )).scalars().all()
+    if duplicates:
+        # No se puede crear el índice único sin decidir qué fila conservar: se
+        # falla sin registrar la migración para que se aplique tras corregirlos
+        raise RuntimeError(
+            f"Hostnames duplicados en computers, corrígelos y vuelve a migrar: {', '.join(duplicates)}"
+        )
+    create_index(conn, 'computers', 'uq_computers_hostname', ['hostname'], unique=True)
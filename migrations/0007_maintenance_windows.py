@@ -0,0 +1,23 @@
+"""Ventanas de mantenimiento por laboratorio o computadora (ver maintenance.py)"""
+
+from sqlalchemy import text
+
+
+def upgrade(conn):
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS maintenance_windows (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            laboratory_id INT NULL,
+            computer_id INT NULL,
+            start_time DATETIME NOT NULL,
+            end_time DATETIME NOT NULL,
+            reason VARCHAR(255),
+            created_by INT NULL,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (laboratory_id) REFERENCES laboratories(id) ON DELETE CASCADE,
+            FOREIGN KEY (computer_id) REFERENCES computers(id) ON DELETE CASCADE,
+            FOREIGN KEY (created_by) REFERENCES users(id) ON DELETE SET NULL,
+            INDEX idx_maintenance_computer_time (computer_id, start_time, end_time),
+            INDEX idx_maintenance_laboratory_time (laboratory_id, start_time, end_time)
+        )
+    """))
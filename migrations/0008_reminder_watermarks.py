@@ -0,0 +1,16 @@
+"""Marca de agua de los recordatorios e índice para cargarlos por rango (ver reminders.py)"""
+
+from sqlalchemy import text
+
+from migrations import create_index
+
+
+def upgrade(conn):
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS reminder_watermarks (
+            offset_minutes INT PRIMARY KEY,
+            sent_until DATETIME NOT NULL
+        )
+    """))
+    # Confirmadas por rango de inicio: carga de la ventana de recordatorios
+    create_index(conn, 'reservations', 'idx_reservations_status_start', ['status', 'start_time'])
@@ -0,0 +1,26 @@
+"""Lista de espera por computadora o laboratorio (ver waitlist.py)"""
+
+from sqlalchemy import text
+
+
+def upgrade(conn):
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS waitlist_entries (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            user_id INT NOT NULL,
+            computer_id INT NULL,
+            laboratory_id INT NULL,
+            start_time DATETIME NOT NULL,
+            end_time DATETIME NOT NULL,
+            status VARCHAR(20) DEFAULT 'waiting',
+            reservation_id INT NULL,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+            FOREIGN KEY (computer_id) REFERENCES computers(id) ON DELETE CASCADE,
+            FOREIGN KEY (laboratory_id) REFERENCES laboratories(id) ON DELETE CASCADE,
+            FOREIGN KEY (reservation_id) REFERENCES reservations(id) ON DELETE SET NULL,
+            INDEX idx_waitlist_computer_status_time (computer_id, status, start_time),
+            INDEX idx_waitlist_laboratory_status_time (laboratory_id, status, start_time),
+            INDEX idx_waitlist_user_status (user_id, status)
+        )
+    """))
@@ -0,0 +1,17 @@
+"""Bitmaps de ocupación por computadora y día en franjas de 15 minutos (ver bitmap_store.py)"""
+
+from sqlalchemy import text
+
+
+def upgrade(conn):
+    # Las filas se crean a demanda; rebuild_bitmaps.py permite precalcularlas
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS computer_day_bitmaps (
+            computer_id INT NOT NULL,
+            day DATE NOT NULL,
+            am_bits BIGINT NOT NULL DEFAULT 0,
+            pm_bits BIGINT NOT NULL DEFAULT 0,
+            PRIMARY KEY (computer_id, day),
+            FOREIGN KEY (computer_id) REFERENCES computers(id) ON DELETE CASCADE
+        )
+    """))
@@ -0,0 +1,16 @@
+"""Índice por fecha de inicio para el listado paginado de admin (ver admin.py)"""
+
+from migrations import create_index, drop_index
+
+
+def upgrade(conn):
+    # GET /api/admin/reservations sin filtros: ORDER BY start_time DESC LIMIT
+    create_index(conn, 'reservations', 'idx_reservations_start', ['start_time'])
+    # El de init.sql sobre la misma columna queda duplicado (0002 ya lo quita
+    # en bases nuevas; aquí se cubre a las que aplicaron 0002 antes)
+    drop_index(conn, 'reservations', 'idx_reservations_start_time')
+
+
+def downgrade(conn):
+    create_index(conn, 'reservations', 'idx_reservations_start_time', ['start_time'])
+    drop_index(conn, 'reservations', 'idx_reservations_start')
@@ -0,0 +1,46 @@
+"""Resúmenes diarios de uso y su marca de agua (ver rollups.py)"""
+
+from sqlalchemy import text
+
+from migrations import create_index
+
+_METRICS = """
+            booked_minutes INT NOT NULL DEFAULT 0,
+            pending_count INT NOT NULL DEFAULT 0,
+            confirmed_count INT NOT NULL DEFAULT 0,
+            cancelled_count INT NOT NULL DEFAULT 0,
+            completed_count INT NOT NULL DEFAULT 0,
+            unique_users INT NOT NULL DEFAULT 0,
+            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+"""
+
+
+def upgrade(conn):
+    conn.execute(text(f"""
+        CREATE TABLE IF NOT EXISTS computer_daily_rollups (
+            computer_id INT NOT NULL,
+            day DATE NOT NULL,
+            laboratory_id INT NOT NULL,
+            {_METRICS}
+            PRIMARY KEY (computer_id, day),
+            FOREIGN KEY (computer_id) REFERENCES computers(id) ON DELETE CASCADE,
+            INDEX idx_computer_rollups_lab_day (laboratory_id, day)
+        )
+    """))
+    conn.execute(text(f"""
+        CREATE TABLE IF NOT EXISTS lab_daily_rollups (
+            laboratory_id INT NOT NULL,
+            day DATE NOT NULL,
+            {_METRICS}
+            PRIMARY KEY (laboratory_id, day),
+            FOREIGN KEY (laboratory_id) REFERENCES laboratories(id) ON DELETE CASCADE
+        )
+    """))
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS rollup_watermarks (
+            name VARCHAR(50) PRIMARY KEY,
+            processed_until DATETIME NOT NULL
+        )
+    """))
+    # Reservas modificadas desde la marca de agua
+    create_index(conn, 'reservations', 'idx_reservations_updated', ['updated_at'])
@@ -0,0 +1,40 @@
+"""Archivo de reservas terminadas y vista con el historial completo (ver archive.py)"""
+
+from sqlalchemy import text
+
+from migrations import create_index
+
+
+def upgrade(conn):
+    # Mismas columnas que reservations más archived_at; el id es el original
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS reservations_archive (
+            id INT PRIMARY KEY,
+            start_time DATETIME NOT NULL,
+            end_time DATETIME NOT NULL,
+            status ENUM('pending', 'confirmed', 'cancelled', 'completed') NOT NULL,
+            recurring BOOLEAN DEFAULT FALSE,
+            recurrence_pattern VARCHAR(255),
+            user_id INT NOT NULL,
+            computer_id INT NOT NULL,
+            created_at TIMESTAMP NULL,
+            updated_at TIMESTAMP NULL,
+            archived_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+            FOREIGN KEY (computer_id) REFERENCES computers(id) ON DELETE CASCADE,
+            INDEX idx_reservations_archive_user_created (user_id, created_at),
+            INDEX idx_reservations_archive_computer_start (computer_id, start_time)
+        ) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci
+    """))
+    conn.execute(text("""
+        CREATE OR REPLACE VIEW reservations_history AS
+        SELECT id, start_time, end_time, status, recurring, recurrence_pattern,
+               user_id, computer_id, created_at, updated_at
+        FROM reservations
+        UNION ALL
+        SELECT id, start_time, end_time, status, recurring, recurrence_pattern,
+               user_id, computer_id, created_at, updated_at
+        FROM reservations_archive
+    """))
+    # Candidatas a archivar (y el barrido de lifecycle.py): estado + fin
+    create_index(conn, 'reservations', 'idx_reservations_status_end', ['status', 'end_time'])
@@ -0,0 +1,73 @@
+"""
+Vistas, procedimiento y trigger de init.sql que 0001_baseline no creó.
+
+Sin ellos una base creada solo con migrate.py se comporta distinto de una
+creada con init.sql: el trigger after_reservation_confirm mantiene el estado
+de las computadoras al confirmar o dejar de estar confirmada una reserva, y
+lifecycle.py y las cancelaciones masivas cuentan con él. Se recrean con el
+mismo cuerpo que en init.sql, así que sobre una base creada con ese script no
+cambia nada.
+"""
+
+from sqlalchemy import text
+
+VIEWS = [
+    """
+    CREATE OR REPLACE VIEW available_computers AS
+    SELECT c.*, l.name as laboratory_name, l.location as laboratory_location
+    FROM computers c
+    JOIN laboratories l ON c.laboratory_id = l.id
+    WHERE c.status = 'available'
+    """,
+    """
+    CREATE OR REPLACE VIEW upcoming_reservations AS
+    SELECT r.*, u.email as user_email, u.name,
+           c.name as computer_name, l.name as laboratory_name
+    FROM reservations r
+    JOIN users u ON r.user_id = u.id
+    JOIN computers c ON r.computer_id = c.id
+    JOIN laboratories l ON c.laboratory_id = l.id
+    WHERE r.start_time > NOW() AND r.status = 'confirmed'
+    """,
+]
+
+# Sin DELIMITER: cada sentencia llega entera al servidor
+PROCEDURE = """
+CREATE PROCEDURE check_computer_availability(IN computer_id INT, IN start_datetime DATETIME, IN end_datetime DATETIME)
+BEGIN
+    DECLARE is_available BOOLEAN;
+
+    SELECT COUNT(*) = 0 INTO is_available
+    FROM reservations
+    WHERE computer_id = computer_id
+      AND status IN ('confirmed', 'pending')
+      AND ((start_time <= start_datetime AND end_time > start_datetime)
+           OR (start_time < end_datetime AND end_time >= end_datetime)
+           OR (start_time >= start_datetime AND end_time <= end_datetime));
+
+    SELECT is_available;
+END
+"""
+
+TRIGGER = """
+CREATE TRIGGER after_reservation_confirm
+AFTER UPDATE ON reservations
+FOR EACH ROW
+BEGIN
+    IF NEW.status = 'confirmed' AND OLD.status != 'confirmed' THEN
+        UPDATE computers SET status = 'reserved' WHERE id = NEW.computer_id;
+    ELSEIF OLD.status = 'confirmed' AND NEW.status != 'confirmed' THEN
+        UPDATE computers SET status = 'available' WHERE id = NEW.computer_id;
+    END IF;
+END
+"""
+
+
+def upgrade(conn):
+    for statement in VIEWS:
+        conn.execute(text(statement))
+
+    conn.execute(text("DROP PROCEDURE IF EXISTS check_computer_availability"))
+    conn.execute(text(PROCEDURE))
+    conn.execute(text("DROP TRIGGER IF EXISTS after_reservation_confirm"))
+    conn.execute(text(TRIGGER))
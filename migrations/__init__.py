@@ -0,0 +1,54 @@
+"""
+Migraciones versionadas del esquema.
+
+Cada archivo NNNN_descripcion.py de este directorio define `upgrade(conn)`,
+que recibe una conexión de SQLAlchemy (en MySQL el DDL hace commit implícito,
+por eso cada paso debe poder repetirse sin error). migrate.py
+las aplica en orden y registra la versión en la tabla schema_migrations.
+Opcionalmente define `downgrade(conn)`, que `python migrate.py --down` usa
+para revertir la última aplicada.
+
+MySQL no soporta `CREATE INDEX IF NOT EXISTS`, así que las migraciones usan
+los helpers de este módulo para ser idempotentes (una base creada con
+init.sql puede tener ya parte del esquema).
+"""
+
+from sqlalchemy import text
+
+
+def table_exists(conn, table):
+    return conn.execute(text(
+        "SELECT COUNT(*) FROM information_schema.tables "
+        "WHERE table_schema = DATABASE() AND table_name = :table"
+    ), {'table': table}).scalar() > 0
+
+
+def column_exists(conn, table, column):
+    return conn.execute(text(
+        "SELECT COUNT(*) FROM information_schema.columns "
+        "WHERE table_schema = DATABASE() AND table_name = :table AND column_name = :column"
+    ), {'table': table, 'column': column}).scalar() > 0
+
+
+def index_exists(conn, table, name):
+    return conn.execute(text(
+        "SELECT COUNT(*) FROM information_schema.statistics "
+        "WHERE table_schema = DATABASE() AND table_name = :table AND index_name = :name"
+    ), {'table': table, 'name': name}).scalar() > 0
+
+
+def create_index(conn, table, name, columns, unique=False):
+    """Crea el índice si todavía no existe"""
+    if index_exists(conn, table, name):
+        return False
+    kind = 'UNIQUE INDEX' if unique else 'INDEX'
+    conn.execute(text(f"CREATE {kind} {name} ON {table} ({', '.join(columns)})"))
+    return True
+
+
+def drop_index(conn, table, name):
+    """Elimina el índice si existe"""
+    if not index_exists(conn, table, name):
+        return False
+    conn.execute(text(f"DROP INDEX {name} ON {table}"))
+    return True
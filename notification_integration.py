@@ -7,6 +7,7 @@ import requests
 import logging
 import os
 from functools import wraps
+from metrics import NOTIFICATION_SENDS
 
 # Configuración
 NOTIFICATION_SERVICE_URL = os.getenv('NOTIFICATION_SERVICE_URL', 'http://notifications:5001')
@@ -26,16 +27,20 @@ def send_notification(notification_type, data):
         
         if response.status_code == 200:
             logger.info(f"Notificación {notification_type} enviada exitosamente")
+            NOTIFICATION_SENDS.labels(notification_type, 'success').inc()
             return True
         else:
             logger.error(f"Error enviando notificación {notification_type}: {response.text}")
+            NOTIFICATION_SENDS.labels(notification_type, 'rejected').inc()
             return False
             
     except requests.exceptions.RequestException as e:
         logger.error(f"Error de conexión con el servicio de notificaciones: {str(e)}")
+        NOTIFICATION_SENDS.labels(notification_type, 'connection_error').inc()
         return False
     except Exception as e:
         logger.error(f"Error inesperado enviando notificación: {str(e)}")
+        NOTIFICATION_SENDS.labels(notification_type, 'error').inc()
         return False
 
 def notify_reservation_created(user_id, reservation_data, token):
@@ -66,6 +71,16 @@ def notify_reservation_cancelled(user_id, reservation_data, token, reason="No es
     }
     return send_notification('reservation-cancelled', data)
 
+def notify_reservations_cancelled(user_id, reservations, token, reason="No especificada"):
+    """Notifica en un solo envío todas las reservas de un usuario canceladas en lote"""
+    data = {
+        'user_id': user_id,
+        'reservations': reservations,
+        'token': token,
+        'reason': reason
+    }
+    return send_notification('reservations-cancelled', data)
+
 def send_reminder(user_id, reservation_data, token):
     """Envía un recordatorio de reserva"""
     data = {
@@ -75,6 +90,10 @@ def send_reminder(user_id, reservation_data, token):
     }
     return send_notification('reminder', data)
 
+def send_reminders(reminders):
+    """Envía un lote de recordatorios: [{'user_id': ..., 'reservation_data': {...}}]"""
+    return send_notification('reminders', {'reminders': reminders})
+
 def test_notification(email, phone=None):
     """Prueba el sistema de notificaciones"""
     data = {
@@ -109,6 +128,14 @@ def safe_notify_reservation_confirmed(user_id, reservation_data, token):
 def safe_notify_reservation_cancelled(user_id, reservation_data, token, reason="No especificada"):
     return notify_reservation_cancelled(user_id, reservation_data, token, reason)
 
+@handle_notification_errors
+def safe_notify_reservations_cancelled(user_id, reservations, token, reason="No especificada"):
+    return notify_reservations_cancelled(user_id, reservations, token, reason)
+
 @handle_notification_errors
 def safe_send_reminder(user_id, reservation_data, token):
-    return send_reminder(user_id, reservation_data, token) 
\ No newline at end of file
+    return send_reminder(user_id, reservation_data, token) 
+
+@handle_notification_errors
+def safe_send_reminders(reminders):
+    return send_reminders(reminders)
@@ -7,8 +7,10 @@ from pydantic import BaseModel
 from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, ForeignKey
 from sqlalchemy.orm import sessionmaker, declarative_base
 from sqlalchemy.sql import func
+from sqlalchemy import text
+from db_pool import pool_options, pool_stats
 import datetime
-from typing import Dict, List
+from typing import Any, Dict, List
 
 DB_USER = os.getenv('MYSQL_USER', 'root')
 DB_PASSWORD = os.getenv('MYSQL_PASSWORD', 'root')
@@ -17,7 +19,8 @@ DB_NAME = os.getenv('MYSQL_DATABASE', 'reservas_db')
 
 DATABASE_URL = f"mysql+pymysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}/{DB_NAME}"
 
-engine = create_engine(DATABASE_URL)
+# Pool más pequeño que el del backend: este servicio hace pocas escrituras
+engine = create_engine(DATABASE_URL, **pool_options(default_size=5, default_max_overflow=5))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
@@ -35,6 +38,18 @@ class NotificationIn(BaseModel):
     message: str
     type: str
 
+class ReminderIn(BaseModel):
+    user_id: int
+    reservation_data: Dict[str, Any]
+
+class RemindersIn(BaseModel):
+    reminders: List[ReminderIn]
+
+class ReservationsCancelledIn(BaseModel):
+    user_id: int
+    reservations: List[Dict[str, Any]]
+    reason: str = "No especificada"
+
 app = FastAPI()
 
 app.add_middleware(
@@ -55,6 +70,16 @@ def get_db():
     finally:
         db.close()
 
+@app.get("/api/notifications/health")
+def health_check():
+    try:
+        # Verificar conexión a la base de datos (la conexión vuelve al pool al salir)
+        with engine.connect() as connection:
+            connection.execute(text('SELECT 1'))
+        return {"status": "ok", "service": "notifications", "database": "connected", "pool": pool_stats(engine)}
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Base de datos no disponible: {str(e)}")
+
 @app.websocket("/ws/{user_id}")
 async def websocket_endpoint(websocket: WebSocket, user_id: int):
     await websocket.accept()
@@ -69,31 +94,78 @@ async def websocket_endpoint(websocket: WebSocket, user_id: int):
         if not active_connections[user_id]:
             del active_connections[user_id]
 
-@app.post("/notify")
-def notify(notification: NotificationIn, db=Depends(get_db)):
-    # Guardar en la base de datos
-    notif = Notification(
-        user_id=notification.user_id,
-        message=notification.message,
-        type=notification.type,
-        status='unread',
-        created_at=datetime.datetime.now()
-    )
-    db.add(notif)
-    db.commit()
-    db.refresh(notif)
+def _push(payload):
     # Enviar por WebSocket si el usuario está conectado
-    if notification.user_id in active_connections:
-        for ws in active_connections[notification.user_id]:
+    if payload["user_id"] in active_connections:
+        for ws in active_connections[payload["user_id"]]:
             try:
                 import asyncio
                 asyncio.create_task(ws.send_text(json.dumps({
-                    "id": notif.id,
-                    "message": notif.message,
-                    "type": notif.type,
-                    "status": notif.status,
-                    "created_at": notif.created_at.isoformat()
+                    "id": payload["id"],
+                    "message": payload["message"],
+                    "type": payload["type"],
+                    "status": payload["status"],
+                    "created_at": payload["created_at"].isoformat()
                 })))
             except Exception:
                 pass
-    return {"success": True, "notification_id": notif.id} 
\ No newline at end of file
+
+def _save_all(db, items):
+    """
+    Guarda [(user_id, mensaje, tipo)] en una sola transacción y los envía por
+    WebSocket. Devuelve los datos guardados como dicts: los ids salen del
+    flush y el resto ya está en memoria, sin releer cada fila tras el commit.
+    """
+    now = datetime.datetime.now()
+    notifications = [
+        Notification(user_id=user_id, message=message, type=type_, status='unread', created_at=now)
+        for user_id, message, type_ in items
+    ]
+    db.add_all(notifications)
+    db.flush()
+    saved = [{
+        "id": notif.id,
+        "user_id": notif.user_id,
+        "message": notif.message,
+        "type": notif.type,
+        "status": notif.status,
+        "created_at": now
+    } for notif in notifications]
+    db.commit()
+    for payload in saved:
+        _push(payload)
+    return saved
+
+@app.post("/notify")
+def notify(notification: NotificationIn, db=Depends(get_db)):
+    notif, = _save_all(db, [(notification.user_id, notification.message, notification.type)])
+    return {"success": True, "notification_id": notif["id"]}
+
+def _reminder_message(data):
+    minutes = data.get('minutes_before')
+    if minutes and minutes >= 60:
+        when = f"en {minutes // 60} h" if minutes % 60 == 0 else f"en {minutes} minutos"
+    else:
+        when = f"en {minutes} minutos" if minutes else "pronto"
+    return (f"Recordatorio: tu reserva de {data.get('computer_name')} en {data.get('laboratory_name')} "
+            f"empieza {when} ({data.get('date')} {data.get('start_time')}-{data.get('end_time')})")
+
+# Lote de recordatorios del planificador del backend (ver reminders.py)
+@app.post("/api/notifications/reminders")
+def notify_reminders(batch: RemindersIn, db=Depends(get_db)):
+    notifications = _save_all(db, [
+        (reminder.user_id, _reminder_message(reminder.reservation_data), 'reminder')
+        for reminder in batch.reminders
+    ])
+    return {"success": True, "count": len(notifications)} 
+
+# Reservas de un usuario canceladas en lote (mantenimiento, ver reservation.py)
+@app.post("/api/notifications/reservations-cancelled")
+def notify_reservations_cancelled(batch: ReservationsCancelledIn, db=Depends(get_db)):
+    details = "; ".join(
+        f"{r.get('computer_name')} en {r.get('laboratory_name')} el {r.get('date')} {r.get('start_time')}-{r.get('end_time')}"
+        for r in batch.reservations
+    )
+    message = f"Se cancelaron {len(batch.reservations)} reservas (motivo: {batch.reason}): {details}"
+    notif, = _save_all(db, [(batch.user_id, message, 'reservation_cancelled')])
+    return {"success": True, "notification_id": notif["id"]}
@@ -0,0 +1,84 @@
+"""
+Conteo de consultas SQL por petición y detector de N+1.
+
+Cada petición acumula en `g` el número de consultas, el tiempo total en base
+de datos y cuántas veces se ejecutó cada "forma" de sentencia. Al terminar:
+  - en modo debug (o con DB_QUERY_HEADERS=true) se agregan las cabeceras
+    X-DB-Queries y X-DB-Time (milisegundos)
+  - si una misma forma de sentencia se repitió más de DB_N_PLUS_ONE_THRESHOLD
+    veces se registra un warning con la sentencia, típico de un N+1
+"""
+
+import logging
+import os
+import re
+import time
+from collections import Counter
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# Listas de parámetros de IN (...) y literales: no cambian la forma de la sentencia
+_PARAM_LIST_RE = re.compile(r'\((?:\s*(?:%s|\?|%\(\w+\)s)\s*,?)+\)')
+_NUMBER_RE = re.compile(r'\b\d+\b')
+_STRING_RE = re.compile(r"'(?:[^'\\]|\\.)*'")
+
+
+def statement_shape(statement):
+    """Normaliza una sentencia para agrupar ejecuciones equivalentes"""
+    shape = _STRING_RE.sub('?', statement)
+    shape = _PARAM_LIST_RE.sub('(?)', shape)
+    shape = _NUMBER_RE.sub('?', shape)
+    return ' '.join(shape.split())
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context():
+        conn.info.setdefault('query_start_time', []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if not has_request_context():
+        return
+    starts = conn.info.get('query_start_time')
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+
+    g.db_query_count = g.get('db_query_count', 0) + 1
+    g.db_query_time = g.get('db_query_time', 0.0) + elapsed
+    if 'db_statements' not in g:
+        g.db_statements = Counter()
+    g.db_statements[statement_shape(statement)] += 1
+
+
+def init_query_stats(app):
+    """Registra el hook que publica las métricas de consultas de cada petición"""
+    headers_enabled = app.debug or os.getenv('DB_QUERY_HEADERS', 'false').lower() in ('1', 'true', 'yes')
+    threshold = int(os.getenv('DB_N_PLUS_ONE_THRESHOLD', 10))
+
+    @app.after_request
+    def report_query_stats(response):
+        count = g.get('db_query_count', 0)
+        db_time = g.get('db_query_time', 0.0)
+
+        if headers_enabled:
+            response.headers['X-DB-Queries'] = str(count)
+            response.headers['X-DB-Time'] = f'{db_time * 1000:.2f}'
+
+        statements = g.get('db_statements')
+        if statements:
+            for shape, times in statements.most_common():
+                if times <= threshold:
+                    break
+                logger.warning(
+                    f"Posible N+1 en {request.method} {request.path} ({request.endpoint}): "
+                    f"la misma sentencia se ejecutó {times} veces en una petición: {shape}"
+                )
+
+        return response
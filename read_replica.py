@@ -0,0 +1,262 @@
+"""
+Enrutamiento de lecturas a réplicas de MySQL.
+
+Las peticiones GET de los blueprints configurados se ejecutan contra una de
+las réplicas definidas en DB_REPLICA_HOSTS; todo lo demás (escrituras, flush
+de la sesión, peticiones con read-your-writes) va al primario.
+
+Variables de entorno:
+  - DB_REPLICA_HOSTS: hosts de réplica separados por coma ("host" o "host:puerto").
+    Si está vacía no hay réplicas y todo va al primario.
+  - DB_REPLICA_BLUEPRINTS: blueprints cuyas rutas GET pueden ir a réplica
+  - DB_REPLICA_MAX_LAG: segundos de retraso tolerados antes de descartar una réplica
+  - DB_REPLICA_CHECK_INTERVAL: cada cuántos segundos se revisa el retraso
+  - DB_REPLICA_READ_YOUR_WRITES: segundos tras una escritura del cliente durante
+    los que sus lecturas siguen yendo al primario
+
+Solo cuenta como escritura una petición que hizo commit de algún cambio: un
+POST de solo lectura (POST /api/batch, un login fallido) no manda al cliente
+al primario.
+
+Cada petición elige una sola réplica en su primera lectura y la usa hasta el
+final, así no mezcla datos de réplicas con distinto retraso. El retraso de
+cada réplica lo revisa una sola petición a la vez cuando vence
+DB_REPLICA_CHECK_INTERVAL; las demás usan el último valor conocido. Si la
+réplica falla con un error de conexión, la lectura se reintenta en el primario
+y el resto de la petición sigue allí.
+
+Para medir el retraso el usuario de la réplica necesita el privilegio
+REPLICATION CLIENT (SHOW REPLICA STATUS).
+"""
+
+import os
+import random
+import threading
+import time
+
+from flask import g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event, exc, text
+from sqlalchemy.sql.elements import TextClause
+
+REPLICA_BIND_PREFIX = 'replica_'
+LAST_WRITE_COOKIE = 'db_last_write'
+CONSISTENCY_HEADER = 'X-Read-Consistency'
+
+READ_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+def replica_binds(user, password, database, default_port='3306'):
+    """Construye SQLALCHEMY_BINDS para las réplicas definidas en DB_REPLICA_HOSTS"""
+    binds = {}
+    hosts = [h.strip() for h in os.getenv('DB_REPLICA_HOSTS', '').split(',') if h.strip()]
+    for index, host in enumerate(hosts):
+        hostname, _, port = host.partition(':')
+        binds[f'{REPLICA_BIND_PREFIX}{index}'] = (
+            f"mysql+pymysql://{user}:{password}@{hostname}:{port or default_port}/{database}"
+        )
+    return binds
+
+
+class ReplicaRouter:
+    """Lleva el estado de salud/retraso de cada réplica y elige una para leer"""
+
+    def __init__(self):
+        self.max_lag = float(os.getenv('DB_REPLICA_MAX_LAG', 5))
+        self.check_interval = float(os.getenv('DB_REPLICA_CHECK_INTERVAL', 5))
+        self._lock = threading.Lock()
+        # bind_key -> {'healthy': bool, 'lag': float | None, 'checked_at': float}
+        self._state = {}
+        # Réplicas cuyo retraso está midiendo otra petición
+        self._checking = set()
+
+    def mark_down(self, bind_key):
+        with self._lock:
+            self._state[bind_key] = {'healthy': False, 'lag': None, 'checked_at': time.monotonic()}
+
+    def _measure_lag(self, engine):
+        with engine.connect() as connection:
+            try:
+                row = connection.execute(text('SHOW REPLICA STATUS')).mappings().first()
+                lag_key = 'Seconds_Behind_Source'
+            except exc.DBAPIError:
+                # MySQL < 8.0.22
+                row = connection.execute(text('SHOW SLAVE STATUS')).mappings().first()
+                lag_key = 'Seconds_Behind_Master'
+        if row is None:
+            # El servidor no está replicando: no sabemos cuán atrasado está
+            return None
+        return row.get(lag_key)
+
+    def _check(self, bind_key, engine):
+        try:
+            lag = self._measure_lag(engine)
+            healthy = lag is not None and float(lag) <= self.max_lag
+        except Exception as e:
+            print(f"Réplica {bind_key} no disponible: {e}")
+            lag, healthy = None, False
+
+        state = {'healthy': healthy, 'lag': lag, 'checked_at': time.monotonic()}
+        with self._lock:
+            self._state[bind_key] = state
+        return state
+
+    def _current_state(self, bind_key, engine, now):
+        """
+        Estado de la réplica; si está vencido lo revisa solo la primera petición
+        que lo nota y el resto sigue con el último conocido (None si no hay).
+        """
+        with self._lock:
+            state = self._state.get(bind_key)
+            stale = state is None or now - state['checked_at'] >= self.check_interval
+            if not stale or bind_key in self._checking:
+                return state
+            self._checking.add(bind_key)
+        try:
+            return self._check(bind_key, engine)
+        finally:
+            with self._lock:
+                self._checking.discard(bind_key)
+
+    def choose(self, engines):
+        """Devuelve el engine de una réplica sana o None para usar el primario"""
+        candidates = []
+        now = time.monotonic()
+        for bind_key, engine in engines.items():
+            if not isinstance(bind_key, str) or not bind_key.startswith(REPLICA_BIND_PREFIX):
+                continue
+            state = self._current_state(bind_key, engine, now)
+            if state is not None and state['healthy']:
+                candidates.append(engine)
+
+        if not candidates:
+            return None
+        return random.choice(candidates)
+
+    def status(self):
+        with self._lock:
+            return {key: dict(value) for key, value in self._state.items()}
+
+
+router = ReplicaRouter()
+
+
+def _wants_replica():
+    return has_request_context() and g.get('db_read_only', False)
+
+
+def _is_connection_error(error):
+    return error.connection_invalidated or isinstance(error, exc.OperationalError)
+
+
+class RoutingSession(Session):
+    """Sesión de Flask-SQLAlchemy que manda las lecturas de solo-lectura a réplicas"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        self.info['on_replica'] = False
+        if bind is None and not self._flushing and _wants_replica():
+            if not (self.new or self.dirty or self.deleted):
+                # Una réplica por petición, elegida en la primera lectura
+                if 'db_replica' not in g:
+                    g.db_replica = router.choose(self._db.engines)
+                if g.db_replica is not None:
+                    self.info['on_replica'] = True
+                    return g.db_replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def _on_primary_if_replica_fails(self, method, *args, **kwargs):
+        try:
+            return method(*args, **kwargs)
+        except exc.DBAPIError as e:
+            if not (self.info.get('on_replica') and _is_connection_error(e)):
+                raise
+            # handle_error ya la marcó caída; el resto de la petición va al primario
+            print(f"Réplica no disponible, se reintenta en el primario: {e}")
+            g.db_replica = None
+            self.rollback()
+            return method(*args, **kwargs)
+
+    def execute(self, *args, **kwargs):
+        return self._on_primary_if_replica_fails(super().execute, *args, **kwargs)
+
+    def scalar(self, *args, **kwargs):
+        return self._on_primary_if_replica_fails(super().scalar, *args, **kwargs)
+
+    def scalars(self, *args, **kwargs):
+        return self._on_primary_if_replica_fails(super().scalars, *args, **kwargs)
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _note_flush(session, flush_context):
+    session.info['db_wrote'] = True
+
+
+@event.listens_for(RoutingSession, 'do_orm_execute')
+def _note_statement(orm_execute_state):
+    # insert()/update()/delete() de Core y text() que no sea un SELECT
+    statement = orm_execute_state.statement
+    if (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete
+            or (isinstance(statement, TextClause) and not statement.text.lstrip().upper().startswith('SELECT'))):
+        orm_execute_state.session.info['db_wrote'] = True
+
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _note_commit(session):
+    if session.info.pop('db_wrote', False) and has_request_context():
+        g.db_committed = True
+
+
+@event.listens_for(RoutingSession, 'after_rollback')
+def _forget_writes(session):
+    session.info.pop('db_wrote', None)
+
+
+def init_read_replicas(app, db):
+    """Registra los hooks que deciden, por petición, si se puede leer de réplica"""
+    blueprints = {
+        name.strip()
+        for name in os.getenv('DB_REPLICA_BLUEPRINTS', 'labs,computers,reservations,dashboard,admin,analytics').split(',')
+        if name.strip()
+    }
+    read_your_writes = float(os.getenv('DB_REPLICA_READ_YOUR_WRITES', router.max_lag * 2))
+
+    with app.app_context():
+        for bind_key, engine in db.engines.items():
+            if isinstance(bind_key, str) and bind_key.startswith(REPLICA_BIND_PREFIX):
+                _watch_replica_errors(bind_key, engine)
+
+    @app.before_request
+    def route_reads_to_replica():
+        g.db_read_only = False
+
+        if request.method not in READ_METHODS or request.blueprint not in blueprints:
+            return
+        if request.headers.get(CONSISTENCY_HEADER, '').lower() == 'primary':
+            return
+
+        # Read-your-writes: si este cliente escribió hace poco, leer del primario
+        last_write = request.cookies.get(LAST_WRITE_COOKIE, type=float)
+        if last_write and time.time() - last_write < read_your_writes:
+            return
+
+        g.db_read_only = True
+
+    @app.after_request
+    def remember_last_write(response):
+        if g.get('db_committed') and response.status_code < 400:
+            response.set_cookie(
+                LAST_WRITE_COOKIE,
+                f'{time.time():.3f}',
+                max_age=int(read_your_writes) + 1,
+                httponly=True,
+                samesite='Lax'
+            )
+        return response
+
+
+def _watch_replica_errors(bind_key, engine):
+    @event.listens_for(engine, 'handle_error')
+    def mark_replica_down(context):
+        # Si la réplica se cae entre revisiones, dejar de usarla hasta la próxima
+        if context.is_disconnect or isinstance(context.sqlalchemy_exception, exc.OperationalError):
+            router.mark_down(bind_key)
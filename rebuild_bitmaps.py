@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Verifica o reconstruye la tabla computer_day_bitmaps contra reservations.
+
+Uso:
+    python rebuild_bitmaps.py                         # verifica desde hace 7 días hasta dentro de 60
+    python rebuild_bitmaps.py --fix                   # corrige las diferencias encontradas
+    python rebuild_bitmaps.py --fix --fill-missing    # además precalcula los días sin fila
+    python rebuild_bitmaps.py --from 2025-01-01 --to 2025-12-31 --computer 3 --fix
+
+Sale con código 1 si hay diferencias sin corregir.
+"""
+import argparse
+import os
+import sys
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from main import app
+import bitmap_store
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--from', dest='start', type=date.fromisoformat,
+                        default=date.today() - timedelta(days=7))
+    parser.add_argument('--to', dest='end', type=date.fromisoformat,
+                        default=date.today() + timedelta(days=60))
+    parser.add_argument('--computer', type=int, action='append', help='limitar a estas computadoras')
+    parser.add_argument('--fix', action='store_true', help='reescribir los bitmaps incorrectos')
+    parser.add_argument('--fill-missing', action='store_true',
+                        help='contar (y con --fix crear) las filas que aún no existen')
+    args = parser.parse_args()
+
+    with app.app_context():
+        mismatches = bitmap_store.verify(args.start, args.end, fix=args.fix, computer_ids=args.computer,
+                                         include_missing=args.fill_missing)
+
+    print(f"📊 Bitmaps del {args.start} al {args.end}: {len(mismatches)} diferencias")
+    for computer_id, day, stored, expected in mismatches[:50]:
+        stored_text = 'sin fila' if stored is None else format(stored, '024x')
+        print(f"   - computadora {computer_id} {day}: guardado {stored_text}, esperado {expected:024x}")
+    if len(mismatches) > 50:
+        print(f"   ... y {len(mismatches) - 50} más")
+
+    if mismatches and args.fix:
+        print("✅ Diferencias corregidas")
+    elif mismatches:
+        print("❌ Ejecuta con --fix para corregirlas")
+        sys.exit(1)
+    else:
+        print("✅ Todo consistente")
+
+
+if __name__ == '__main__':
+    main()
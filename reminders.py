@@ -0,0 +1,268 @@
+"""
+Recordatorios de reservas confirmadas (por defecto 24 horas y 15 minutos antes).
+
+El planificador vive en la réplica líder (ver background_jobs.py) y guarda en
+un heap solo los recordatorios de la próxima ventana (REMINDER_LOOKAHEAD
+segundos), cargados con una consulta por rango y desfase cada
+REMINDER_LOAD_INTERVAL segundos. Entre cargas, las reservas confirmadas o
+modificadas desde la última pasada se recogen por updated_at; no hay una
+consulta por reserva.
+
+Al vencer un lote se vuelve a comprobar con una sola consulta que las
+reservas sigan confirmadas (las canceladas en cualquier réplica se descartan
+ahí, no hace falta recordar cancelaciones en memoria), se envía y después se
+avanza la marca de agua persistida en reminder_watermarks. Si un envío falla,
+sus recordatorios vuelven al heap y la marca de su desfase se queda justo
+antes del primero fallido, así que se reintentan en la siguiente pasada o
+tras un reinicio. Una caída entre el envío y la marca puede repetir un lote,
+pero no perderlo.
+
+Las horas de las reservas están en hora local sin zona y updated_at en UTC:
+cada pasada parte de un único `now` local y lo convierte a UTC para comparar
+con updated_at.
+
+Variables de entorno:
+  - REMINDER_OFFSETS: minutos antes del inicio, separados por coma (default 1440,15)
+  - REMINDER_INTERVAL: cada cuántos segundos se revisan los vencidos (default 30)
+  - REMINDER_LOOKAHEAD / REMINDER_LOAD_INTERVAL: ventana del heap y cada cuánto se recarga
+  - REMINDER_BATCH_SIZE: recordatorios por envío al servicio de notificaciones
+"""
+
+import heapq
+import logging
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select
+
+from background_jobs import register_job
+from db import db
+from notification_integration import safe_send_reminders
+
+logger = logging.getLogger(__name__)
+
+OFFSETS = sorted(
+    {int(value) for value in os.getenv('REMINDER_OFFSETS', '1440,15').split(',') if value.strip()},
+    reverse=True
+)
+INTERVAL = float(os.getenv('REMINDER_INTERVAL', 30))
+LOOKAHEAD = timedelta(seconds=float(os.getenv('REMINDER_LOOKAHEAD', 3600)))
+LOAD_INTERVAL = timedelta(seconds=float(os.getenv('REMINDER_LOAD_INTERVAL', 600)))
+BATCH_SIZE = int(os.getenv('REMINDER_BATCH_SIZE', 200))
+
+
+class ReminderWatermark(db.Model):
+    __tablename__ = 'reminder_watermarks'
+
+    offset_minutes = db.Column(db.Integer, primary_key=True)
+    sent_until = db.Column(db.DateTime, nullable=False)
+
+
+def _as_utc(local):
+    """Hora local sin zona -> UTC sin zona, para comparar con updated_at"""
+    return local.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+class ReminderScheduler:
+    def __init__(self, offsets):
+        self.offsets = offsets
+        self._lock = threading.Lock()
+        self._heap = []          # (envío, reservation_id, desfase)
+        self._scheduled = set()  # (reservation_id, desfase) presentes en el heap
+        self._watermarks = {}
+        self._loaded_until = None
+        self._next_load = None
+        self._last_check = None
+
+    # --- Reconciliación desde los endpoints de reservas -----------------------
+
+    def schedule(self, reservation_id, start_time):
+        """Agenda los recordatorios de una reserva recién confirmada (si caen en la ventana cargada)"""
+        with self._lock:
+            if self._loaded_until is None:
+                return
+            for offset in self.offsets:
+                send_at = start_time - timedelta(minutes=offset)
+                if self._watermarks.get(offset, datetime.min) < send_at <= self._loaded_until:
+                    self._push(send_at, reservation_id, offset)
+
+    def cancel(self, reservation_id):
+        """
+        Quita los recordatorios de la reserva si están en el heap de este
+        proceso. En las réplicas que no son líder el heap está vacío y no se
+        guarda nada; lo que se escape lo descarta la comprobación al vencer.
+        """
+        with self._lock:
+            keys = {(reservation_id, offset) for offset in self.offsets} & self._scheduled
+            if not keys:
+                return
+            self._scheduled -= keys
+            self._heap = [item for item in self._heap if (item[1], item[2]) not in keys]
+            heapq.heapify(self._heap)
+
+    def _push(self, send_at, reservation_id, offset):
+        key = (reservation_id, offset)
+        if key not in self._scheduled:
+            self._scheduled.add(key)
+            heapq.heappush(self._heap, (send_at, reservation_id, offset))
+
+    # --- Carga desde la base --------------------------------------------------
+
+    def _read_watermarks(self, now):
+        stored = dict(db.session.execute(
+            select(ReminderWatermark.offset_minutes, ReminderWatermark.sent_until)
+        ).all())
+        # Primera ejecución: no enviar recordatorios de envíos ya pasados
+        return {offset: stored.get(offset, now) for offset in self.offsets}
+
+    def _load_range(self, offset, lower, upper, changed_since=None):
+        """Reservas confirmadas cuyo recordatorio `offset` cae en (lower, upper]"""
+        from reservation import Reservation
+
+        delta = timedelta(minutes=offset)
+        statement = select(Reservation.id, Reservation.start_time).where(
+            Reservation.status == 'confirmed',
+            Reservation.start_time > lower + delta,
+            Reservation.start_time <= upper + delta
+        )
+        if changed_since is not None:
+            statement = statement.where(Reservation.updated_at >= changed_since)
+        for reservation_id, start_time in db.session.execute(statement):
+            self._push(start_time - delta, reservation_id, offset)
+
+    def load(self, now, watermarks=None):
+        watermarks = watermarks or self._read_watermarks(now)
+        horizon = now + LOOKAHEAD
+        with self._lock:
+            self._heap = []
+            self._scheduled = set()
+            self._watermarks = watermarks
+            for offset in self.offsets:
+                self._load_range(offset, watermarks[offset], horizon)
+            self._loaded_until = horizon
+            self._next_load = now + LOAD_INTERVAL
+            self._last_check = _as_utc(now)
+
+    def _catch_up(self, now):
+        """Reservas confirmadas en cualquier réplica desde la última pasada"""
+        with self._lock:
+            # updated_at se guarda en UTC; el margen cubre commits en vuelo
+            since = self._last_check - timedelta(seconds=INTERVAL)
+            self._last_check = _as_utc(now)
+            for offset in self.offsets:
+                self._load_range(offset, self._watermarks[offset], self._loaded_until, changed_since=since)
+
+    # --- Envío ----------------------------------------------------------------
+
+    def _pop_due(self, now):
+        due = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                send_at, reservation_id, offset = heapq.heappop(self._heap)
+                self._scheduled.discard((reservation_id, offset))
+                due.append((send_at, reservation_id, offset))
+        return due
+
+    def _save_watermarks(self, sent_until):
+        """sent_until: {desfase: marca}"""
+        for offset, value in sent_until.items():
+            watermark = db.session.get(ReminderWatermark, offset)
+            if watermark is None:
+                db.session.add(ReminderWatermark(offset_minutes=offset, sent_until=value))
+            else:
+                watermark.sent_until = value
+        db.session.commit()
+        with self._lock:
+            self._watermarks.update(sent_until)
+
+    def _reminder_payloads(self, due, now):
+        """[(entrada del heap, payload)] de los vencidos cuya reserva sigue confirmada y por empezar"""
+        from computer import Computer
+        from laboratory import Laboratory
+        from reservation import Reservation
+
+        offsets = {}
+        for send_at, reservation_id, offset in due:
+            offsets.setdefault(reservation_id, []).append((send_at, offset))
+
+        rows = db.session.execute(
+            select(
+                Reservation.id, Reservation.user_id, Reservation.start_time, Reservation.end_time,
+                Computer.name, Laboratory.name
+            )
+            .join(Computer, Computer.id == Reservation.computer_id)
+            .join(Laboratory, Laboratory.id == Computer.laboratory_id)
+            .where(
+                Reservation.id.in_(list(offsets)),
+                Reservation.status == 'confirmed',
+                Reservation.start_time > now
+            )
+        ).all()
+
+        return [
+            ((send_at, reservation_id, offset), {
+                'user_id': user_id,
+                'reservation_data': {
+                    'reservation_id': reservation_id,
+                    'computer_name': computer_name,
+                    'laboratory_name': laboratory_name,
+                    'date': start.strftime('%Y-%m-%d'),
+                    'start_time': start.strftime('%H:%M'),
+                    'end_time': end.strftime('%H:%M'),
+                    'minutes_before': offset
+                }
+            })
+            for reservation_id, user_id, start, end, computer_name, laboratory_name in rows
+            for send_at, offset in offsets[reservation_id]
+        ]
+
+    def run(self, now=None):
+        """Tarea periódica: recarga la ventana si toca y envía los vencidos"""
+        # Las horas de las reservas se guardan en hora local sin zona; sin
+        # microsegundos para que la marca leída de MySQL compare igual
+        now = (now or datetime.now()).replace(microsecond=0)
+        watermarks = self._read_watermarks(now)
+        # Si otra réplica fue líder entretanto, su marca manda: recargar desde ahí
+        if self._next_load is None or now >= self._next_load or watermarks != self._watermarks:
+            self.load(now, watermarks)
+        else:
+            self._catch_up(now)
+
+        due = self._pop_due(now)
+        reminders = self._reminder_payloads(due, now) if due else []
+
+        failed = []
+        for start in range(0, len(reminders), BATCH_SIZE):
+            batch = reminders[start:start + BATCH_SIZE]
+            if not safe_send_reminders([payload for _, payload in batch]):
+                failed.extend(entry for entry, _ in batch)
+
+        # La marca avanza después de enviar y se detiene antes del primer fallo de cada desfase
+        sent_until = {offset: now for offset in self.offsets}
+        for send_at, _, offset in failed:
+            sent_until[offset] = min(sent_until[offset], send_at - timedelta(seconds=1))
+        self._save_watermarks(sent_until)
+        if failed:
+            with self._lock:
+                for send_at, reservation_id, offset in failed:
+                    self._push(send_at, reservation_id, offset)
+            logger.warning(f"Recordatorios sin enviar, se reintentan: {len(failed)}")
+
+        sent = len(reminders) - len(failed)
+        if sent:
+            logger.info(f"Recordatorios enviados: {sent}")
+        return sent
+
+    def status(self):
+        with self._lock:
+            return {
+                'pending': len(self._heap),
+                'loaded_until': self._loaded_until.isoformat() if self._loaded_until else None,
+                'watermarks': {str(k): v.isoformat() for k, v in self._watermarks.items()}
+            }
+
+
+reminder_scheduler = ReminderScheduler(OFFSETS)
+
+register_job('reservation_reminders', INTERVAL, reminder_scheduler.run)
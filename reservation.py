@@ -4,18 +4,35 @@ from db import db
 from auth import token_required
 from socket_manager import socketio
 from computer import Computer
-from sqlalchemy import and_
-import requests
+from laboratory import Laboratory
+from sqlalchemy import and_, select, update
+from sqlalchemy.orm import joinedload
+from catalog_cache import bump_catalog_version
+from fast_json import Projection, json_response, sparse_fields
+from reminders import reminder_scheduler
+import availability
+import bitmap_store
+from availability_cache import availability_cached
 from notification_integration import (
     safe_notify_reservation_created,
     safe_notify_reservation_confirmed,
-    safe_notify_reservation_cancelled
+    safe_notify_reservation_cancelled,
+    safe_notify_reservations_cancelled
 )
 
 reservation_bp = Blueprint('reservations', __name__)
 
 class Reservation(db.Model):
     __tablename__ = 'reservations'
+    # Mismos índices que migrations/0002_reservation_indexes.py, 0011_reservation_start_index.py,
+    # 0012_daily_rollups.py y 0013_reservation_archive.py
+    __table_args__ = (
+        db.Index('idx_reservations_computer_status_time', 'computer_id', 'status', 'start_time', 'end_time'),
+        db.Index('idx_reservations_user_created', 'user_id', 'created_at'),
+        db.Index('idx_reservations_start', 'start_time'),
+        db.Index('idx_reservations_updated', 'updated_at'),
+        db.Index('idx_reservations_status_end', 'status', 'end_time'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     start_time = db.Column(db.DateTime, nullable=False)
@@ -54,22 +71,157 @@ class Reservation(db.Model):
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
 
+# Campos de to_dict() para la ruta rápida de listados (ver fast_json.py)
+RESERVATION_PROJECTION = Projection([
+    ('id', Reservation.id),
+    ('start_time', Reservation.start_time),
+    ('end_time', Reservation.end_time),
+    ('status', Reservation.status),
+    ('recurring', Reservation.recurring),
+    ('recurrence_pattern', Reservation.recurrence_pattern),
+    ('user_id', Reservation.user_id),
+    ('computer_id', Reservation.computer_id),
+    ('created_at', Reservation.created_at),
+    ('updated_at', Reservation.updated_at),
+])
+
+ACTIVE_STATUSES = ['pending', 'confirmed']
+
+
+def cancel_overlapping_reservations(computer_ids, start_time, end_time=None, promote=True):
+    """
+    Cancela con un único UPDATE las reservas pendientes o confirmadas de esas
+    computadoras que se solapan con [start_time, end_time) (sin end_time, todas
+    las que terminan después de start_time). No hace commit: se usa dentro de
+    la transacción del llamador. Devuelve los datos de las reservas canceladas
+    para emitir el evento y las notificaciones.
+
+    Con promote, cada hueco liberado pasa a la lista de espera (promote_into
+    se salta lo que choque con las ventanas de mantenimiento ya agregadas a la
+    sesión); announce_cancelled_reservations anuncia las promociones.
+    """
+    if not computer_ids:
+        return []
+
+    conditions = [
+        Reservation.computer_id.in_(computer_ids),
+        Reservation.status.in_(ACTIVE_STATUSES),
+        Reservation.end_time > start_time,
+    ]
+    if end_time is not None:
+        conditions.append(Reservation.start_time < end_time)
+
+    rows = db.session.execute(
+        select(
+            Reservation.id, Reservation.user_id, Reservation.computer_id, Reservation.status,
+            Reservation.start_time, Reservation.end_time, Computer.name, Laboratory.name
+        )
+        .join(Computer, Computer.id == Reservation.computer_id)
+        .join(Laboratory, Laboratory.id == Computer.laboratory_id)
+        .where(*conditions)
+        .with_for_update()
+    ).all()
+    if not rows:
+        return []
+
+    db.session.execute(
+        update(Reservation)
+        .where(Reservation.id.in_([row[0] for row in rows]))
+        .values(status='cancelled', updated_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    if any(row[3] == 'confirmed' for row in rows):
+        # El trigger after_reservation_confirm libera las computadoras reservadas
+        bump_catalog_version()
+
+    promotions = {}
+    if promote:
+        from waitlist import promote_into
+        for row in rows:
+            promotions[row[0]] = promote_into(row[2], row[4], row[5])
+
+    pairs = set()
+    for row in rows:
+        pairs |= bitmap_store.pairs_for(row[2], row[4], row[5])
+    bitmap_store.refresh(pairs)
+
+    return [
+        {
+            'reservation_id': reservation_id,
+            'user_id': user_id,
+            'computer_id': computer_id,
+            'old_status': status,
+            'computer_name': computer_name,
+            'laboratory_name': laboratory_name,
+            'date': start.strftime('%Y-%m-%d'),
+            'start_time': start.strftime('%H:%M'),
+            'end_time': end.strftime('%H:%M'),
+            'promotion': promotions.get(reservation_id)
+        }
+        for reservation_id, user_id, computer_id, status, start, end, computer_name, laboratory_name in rows
+    ]
+
+
+def _send_cancellation_batches(by_user, token, reason):
+    for user_id, reservations in by_user.items():
+        safe_notify_reservations_cancelled(
+            user_id=user_id,
+            reservations=reservations,
+            token=token,
+            reason=reason
+        )
+
+
+def announce_cancelled_reservations(cancelled, reason):
+    """
+    Tras el commit: un único evento Socket.IO para todo el lote y una
+    notificación por usuario afectado, enviadas en segundo plano.
+    """
+    if not cancelled:
+        return
+
+    from waitlist import announce_promotion
+    for r in cancelled:
+        reminder_scheduler.cancel(r['reservation_id'])
+        announce_promotion(r.get('promotion'))
+
+    socketio.emit('reservations_cancelled', {
+        'reason': reason,
+        'count': len(cancelled),
+        'reservations': [
+            {'reservation_id': r['reservation_id'], 'user_id': r['user_id'], 'computer_id': r['computer_id']}
+            for r in cancelled
+        ]
+    })
+
+    by_user = {}
+    for r in cancelled:
+        by_user.setdefault(r['user_id'], []).append({
+            'computer_name': r['computer_name'],
+            'laboratory_name': r['laboratory_name'],
+            'date': r['date'],
+            'start_time': r['start_time'],
+            'end_time': r['end_time']
+        })
+    token = request.headers.get('Authorization', '').replace('Bearer ', '')
+    socketio.start_background_task(_send_cancellation_batches, by_user, token, reason)
+
 # Todas las reservas (para admin)
 @reservation_bp.route('/all', methods=['GET'])
 @token_required
-def get_all_reservations(current_user):
+@sparse_fields(RESERVATION_PROJECTION)
+def get_all_reservations(current_user, fields):
     if current_user.role != 'admin':
         return jsonify({'message': 'Acceso denegado: se requiere rol admin'}), 403
 
-    reservations = Reservation.query.all()
-    return jsonify([r.to_dict() for r in reservations])
+    return json_response(RESERVATION_PROJECTION.rows(db.session, fields))
 
 # Reservas del usuario autenticado
 @reservation_bp.route('/', methods=['GET'])
 @token_required
-def get_user_reservations(current_user):
-    reservations = Reservation.query.filter_by(user_id=current_user.id).all()
-    return jsonify([r.to_dict() for r in reservations])
+@sparse_fields(RESERVATION_PROJECTION)
+def get_user_reservations(current_user, fields):
+    return json_response(RESERVATION_PROJECTION.rows(db.session, fields, where=Reservation.user_id == current_user.id))
 
 # Actualizar estado de reserva (solo admin)
 @reservation_bp.route('/<int:reservation_id>/status', methods=['PUT'])
@@ -90,7 +242,26 @@ def update_reservation_status(current_user, reservation_id):
 
     old_status = reservation.status
     reservation.status = new_status
+    if 'confirmed' in (old_status, new_status) and old_status != new_status:
+        # El trigger after_reservation_confirm cambia el estado de la computadora
+        bump_catalog_version()
+    promotion = None
+    if new_status == 'cancelled' and old_status in ACTIVE_STATUSES:
+        # El hueco pasa al primero de la lista de espera, como en las demás cancelaciones
+        from waitlist import promote_next
+        promotion = promote_next(reservation)
+    if (old_status in bitmap_store.OCCUPYING_STATUSES) != (new_status in bitmap_store.OCCUPYING_STATUSES):
+        db.session.flush()
+        bitmap_store.refresh(bitmap_store.pairs_for(reservation.computer_id, reservation.start_time, reservation.end_time))
     db.session.commit()
+    if promotion:
+        from waitlist import announce_promotion
+        announce_promotion(promotion)
+
+    if new_status == 'confirmed':
+        reminder_scheduler.schedule(reservation.id, reservation.start_time)
+    else:
+        reminder_scheduler.cancel(reservation.id)
 
     # Emitir evento de actualización en tiempo real
     socketio.emit('reservation_status_updated', {
@@ -118,12 +289,22 @@ def cancel_reservation(current_user, reservation_id):
         return jsonify({'message': 'Solo se pueden cancelar reservas pendientes o confirmadas'}), 400
 
     try:
+        if reservation.status == 'confirmed':
+            # El trigger after_reservation_confirm libera la computadora
+            bump_catalog_version()
         reservation.status = 'cancelled'
+        # El hueco pasa al primero de la lista de espera en la misma transacción
+        from waitlist import announce_promotion, promote_next
+        promotion = promote_next(reservation)
+        db.session.flush()
+        bitmap_store.refresh(bitmap_store.pairs_for(reservation.computer_id, reservation.start_time, reservation.end_time))
         db.session.commit()
+        reminder_scheduler.cancel(reservation.id)
+        announce_promotion(promotion)
         
         # Enviar notificación de reserva cancelada por usuario
         try:
-            computer = Computer.query.get(reservation.computer_id)
+            computer = Computer.query.options(joinedload(Computer.laboratory)).get(reservation.computer_id)
             reservation_data = {
                 'computer_name': computer.name if computer else 'Computadora',
                 'laboratory_name': computer.laboratory.name if computer and computer.laboratory else 'Laboratorio',
@@ -165,7 +346,16 @@ def create_reservation(current_user):
         if start_time >= end_time:
             return jsonify({'message': 'La hora de inicio debe ser antes de la hora de fin'}), 400
 
-        # ⛔ Verificar solapamientos (reservas pendientes o confirmadas)
+        # Bloquear la computadora serializa las reservas concurrentes sobre
+        # ella: la comprobación de solapes y el INSERT quedan en el mismo lock
+        locked = db.session.execute(
+            select(Computer.id).where(Computer.id == computer_id).with_for_update()
+        ).scalar()
+        if locked is None:
+            return jsonify({'message': 'Computadora no encontrada'}), 404
+
+        # ⛔ Verificar solapamientos (reservas pendientes o confirmadas) siempre
+        # contra reservations: los bitmaps son solo una caché de lectura
         overlapping = Reservation.query.filter(
             and_(
                 Reservation.computer_id == computer_id,
@@ -176,7 +366,15 @@ def create_reservation(current_user):
         ).first()
 
         if overlapping:
-            return jsonify({'message': 'Ya existe una reserva para esa hora'}), 409
+            db.session.rollback()
+            # El cliente puede anotarse en /api/waitlist con el mismo horario
+            return jsonify({'message': 'Ya existe una reserva para esa hora', 'waitlist_available': True}), 409
+
+        # Import diferido: maintenance importa este módulo
+        from maintenance import maintenance_intervals
+        if maintenance_intervals(computer_id, start_time, end_time):
+            db.session.rollback()
+            return jsonify({'message': 'La computadora está en mantenimiento en ese horario'}), 409
         
         new_reservation = Reservation(
             start_time=start_time,
@@ -187,12 +385,14 @@ def create_reservation(current_user):
         )
         
         db.session.add(new_reservation)
+        db.session.flush()
+        bitmap_store.mark_reserved(computer_id, start_time, end_time)
         db.session.commit()
         
         # Enviar notificación de reserva creada
         try:
             # Obtener información de la computadora y laboratorio
-            computer = Computer.query.get(computer_id)
+            computer = Computer.query.options(joinedload(Computer.laboratory)).get(computer_id)
             if computer:
                 reservation_data = {
                     'computer_name': computer.name,
@@ -220,97 +420,174 @@ def create_reservation(current_user):
         return jsonify({'message': 'Error interno del servidor'}), 500
 
 
-# Obtener disponibilidad de un PC en una fecha específica
-@reservation_bp.route('/availability', methods=['GET'])
-@token_required
-def get_availability(current_user):
+def _day_occupancy(computer_id, target_date, granularity):
     """
-    Query params:
-      - computer_id (int, requerido)
-      - date (YYYY-MM-DD, requerido)
-    
-    Retorna un array con horas disponibles y ocupadas (7am a 6pm, intervalos de 1 hora).
+    Máscara de franjas ocupadas de una computadora en un día: bitmap de
+    reservas (ver bitmap_store.py) más ventanas de mantenimiento.
     """
+    from maintenance import maintenance_intervals
+
+    start_of_day = availability.day_start(target_date)
+    end_of_day = start_of_day + timedelta(days=1)
+
+    occupied = bitmap_store.occupied_mask(computer_id, target_date)
+    occupied |= availability.mask_from_intervals(
+        target_date, maintenance_intervals(computer_id, start_of_day, end_of_day), bitmap_store.GRANULARITY
+    )
+    return availability.rescale(occupied, bitmap_store.GRANULARITY, granularity)
+
+
+def _availability_request():
+    """Lee computer_id, date y granularity. Devuelve (computadora, fecha, granularidad) o una respuesta de error"""
     computer_id = request.args.get('computer_id', type=int)
     date_str = request.args.get('date')
-    
+
     if not computer_id or not date_str:
-        return jsonify({'message': 'Faltan parámetros computer_id o date'}), 400
-    
+        return None, (jsonify({'message': 'Faltan parámetros computer_id o date'}), 400)
+
     try:
-        target_date = date.fromisoformat(date_str)
+        target_date = date.fromisoformat(date_str[:10])
     except ValueError:
-        return jsonify({'message': 'Formato de fecha inválido. Use YYYY-MM-DD'}), 400
+        return None, (jsonify({'message': 'Formato de fecha inválido. Use YYYY-MM-DD'}), 400)
 
-    # Rango horario de 7:00 a 18:00 (6pm)
-    start_hour = 7
-    end_hour = 18
-
-    # Construimos todos los intervalos horarios posibles
-    slots = []
-    for hour in range(start_hour, end_hour):
-        slot_start = datetime.combine(target_date, time(hour, 0))
-        slot_end = slot_start + timedelta(hours=1)
-        slots.append({
-            'start': slot_start,
-            'end': slot_end,
-            'available': True
-        })
+    try:
+        granularity = availability.parse_granularity(request.args.get('granularity'))
+    except ValueError as e:
+        return None, (jsonify({'message': str(e)}), 400)
 
-    # Obtenemos reservas confirmadas o pendientes en ese día y pc
-    reservations = Reservation.query.filter(
-        Reservation.computer_id == computer_id,  # type: ignore
-        Reservation.status.in_(['pending', 'confirmed']),  # type: ignore
-        Reservation.start_time >= datetime.combine(target_date, time(0, 0)),  # type: ignore
-        Reservation.end_time <= datetime.combine(target_date, time(23, 59, 59))  # type: ignore
-    ).all()
+    computer = Computer.query.options(joinedload(Computer.laboratory)).get(computer_id)
+    if not computer or not computer.laboratory:
+        return None, (jsonify({'message': 'Computadora no encontrada'}), 404)
 
-    # Marcar como no disponibles los slots que intersectan con reservas existentes
-    for slot in slots:
-        for r in reservations:
-            # Si hay intersección entre slot y reserva
-            if not (slot['end'] <= r.start_time or slot['start'] >= r.end_time):
-                slot['available'] = False
-                break
+    return (computer, target_date, granularity), None
 
-    # Convertir datetime a string ISO para frontend
-    result = [
-        {
-            'start': s['start'].isoformat(),
-            'end': s['end'].isoformat(),
-            'available': s['available']
-        }
-        for s in slots
-    ]
+
+# Obtener disponibilidad de un PC en una fecha específica
+@reservation_bp.route('/availability', methods=['GET'])
+@token_required
+@availability_cached('availability')
+def get_availability(current_user):
+    """
+    Query params:
+      - computer_id (int, requerido)
+      - date (YYYY-MM-DD, requerido)
+      - granularity (15, 30 o 60 minutos; por defecto AVAILABILITY_SLOT_MINUTES)
+    
+    Retorna las franjas del horario del laboratorio de la computadora, cada
+    una con su estado disponible/ocupado.
+    """
+    params, error = _availability_request()
+    if error:
+        return error
+    computer, target_date, granularity = params
+
+    template = availability.lab_template(computer.laboratory, granularity)
+    occupied = _day_occupancy(computer.id, target_date, granularity)
+
+    result = []
+    for index in availability.slot_bits(template):
+        slot_start = availability.slot_start(target_date, index, granularity)
+        result.append({
+            'start': slot_start.isoformat(),
+            'end': (slot_start + timedelta(minutes=granularity)).isoformat(),
+            'available': not (occupied >> index) & 1
+        })
 
     return jsonify(result)
 
 @reservation_bp.route('/occupied-hours', methods=['GET'])
 @token_required
+@availability_cached('occupied-hours')
 def get_occupied_hours(current_user):
-    computer_id = request.args.get('computer_id', type=int)
-    date_str = request.args.get('date')
+    """
+    Horas (0-23) en las que la computadora está ocupada aunque sea en parte,
+    más las horas de apertura del laboratorio. Con `granularity` también
+    devuelve las franjas ocupadas ('HH:MM').
+    """
+    params, error = _availability_request()
+    if error:
+        return error
+    computer, target_date, granularity = params
+
+    occupied = _day_occupancy(computer.id, target_date, bitmap_store.GRANULARITY)
+    hourly = availability.rescale(occupied, bitmap_store.GRANULARITY, 60)
+    result = {
+        'occupied_hours': availability.slot_bits(hourly),
+        'open_hours': availability.slot_bits(availability.lab_template(computer.laboratory, 60))
+    }
+
+    if request.args.get('granularity'):
+        result['granularity'] = granularity
+        result['occupied_slots'] = [
+            availability.slot_start(target_date, index, granularity).strftime('%H:%M')
+            for index in availability.slot_bits(availability.rescale(occupied, bitmap_store.GRANULARITY, granularity))
+        ]
 
-    if not computer_id or not date_str:
-        return jsonify({'message': 'Parámetros inválidos'}), 400
+    return jsonify(result)
 
+@reservation_bp.route('/availability/week', methods=['GET'])
+@token_required
+def get_lab_week_availability(current_user):
+    """
+    Ocupación de todas las computadoras de un laboratorio durante varios días,
+    como bitmaps de franjas de 15 minutos en hexadecimal (bit 0 = 00:00).
+
+    Query params:
+      - laboratory_id (int, requerido)
+      - start (YYYY-MM-DD, por defecto hoy)
+      - days (1 a 14, por defecto 7)
+    """
+    from maintenance import MaintenanceWindow
+
+    laboratory_id = request.args.get('laboratory_id', type=int)
+    days = request.args.get('days', default=7, type=int)
     try:
-        date = datetime.fromisoformat(date_str).date()
+        start_day = date.fromisoformat(request.args['start']) if request.args.get('start') else date.today()
     except ValueError:
-        return jsonify({'message': 'Fecha inválida'}), 400
-
-    start_of_day = datetime.combine(date, datetime.min.time())
-    end_of_day = datetime.combine(date, datetime.max.time())
+        return jsonify({'message': 'Formato de fecha inválido. Use YYYY-MM-DD'}), 400
 
-    reservations = Reservation.query.filter(
-        Reservation.computer_id == computer_id,  # type: ignore
-        Reservation.status.in_(['pending', 'confirmed']),  # type: ignore
-        Reservation.start_time >= start_of_day,  # type: ignore
-        Reservation.start_time <= end_of_day  # type: ignore
+    if not laboratory_id:
+        return jsonify({'message': 'Falta el parámetro laboratory_id'}), 400
+    if not 1 <= days <= 14:
+        return jsonify({'message': 'days debe estar entre 1 y 14'}), 400
+
+    laboratory = db.session.get(Laboratory, laboratory_id)
+    if not laboratory:
+        return jsonify({'message': 'Laboratorio no encontrado'}), 404
+
+    computer_ids = db.session.execute(
+        select(Computer.id).where(Computer.laboratory_id == laboratory_id).order_by(Computer.id)
+    ).scalars().all()
+    day_list = [start_day + timedelta(days=offset) for offset in range(days)]
+    masks = bitmap_store.occupied_masks({(cid, day) for cid in computer_ids for day in day_list})
+
+    # Ventanas de mantenimiento del laboratorio o de sus computadoras, en una consulta
+    range_start = availability.day_start(day_list[0])
+    range_end = availability.day_start(day_list[-1] + timedelta(days=1))
+    windows = db.session.execute(
+        select(MaintenanceWindow.computer_id, MaintenanceWindow.start_time, MaintenanceWindow.end_time).where(
+            db.or_(MaintenanceWindow.laboratory_id == laboratory_id,
+                   MaintenanceWindow.computer_id.in_(computer_ids)),
+            MaintenanceWindow.start_time < range_end,
+            MaintenanceWindow.end_time > range_start
+        )
     ).all()
-
-    occupied_hours = sorted({res.start_time.hour for res in reservations})
-    return jsonify({'occupied_hours': occupied_hours})
+    for window_computer_id, window_start, window_end in windows:
+        for day, mask in bitmap_store.day_masks(max(window_start, range_start), min(window_end, range_end)).items():
+            for cid in ([window_computer_id] if window_computer_id else computer_ids):
+                if (cid, day) in masks:
+                    masks[(cid, day)] |= mask
+
+    return jsonify({
+        'laboratory_id': laboratory_id,
+        'granularity': bitmap_store.GRANULARITY,
+        'days': [day.isoformat() for day in day_list],
+        'open_mask': format(availability.lab_template(laboratory, bitmap_store.GRANULARITY), 'x'),
+        'computers': {
+            str(cid): [format(masks[(cid, day)], 'x') for day in day_list]
+            for cid in computer_ids
+        }
+    })
 
 @reservation_bp.route('/<int:reservation_id>/confirm', methods=['PUT'])
 @token_required
@@ -325,15 +602,17 @@ def confirm_reservation(current_user, reservation_id):
     if reservation.status != 'pending':
         return jsonify({'message': 'Solo se pueden confirmar reservas pendientes'}), 400
 
-    # Obtener la computadora asociada
-    computer = Computer.query.get(reservation.computer_id)
+    # Obtener la computadora asociada (con su laboratorio para la notificación)
+    computer = Computer.query.options(joinedload(Computer.laboratory)).get(reservation.computer_id)
     if computer:
         # Cambiar el estado de la computadora a 'reserved'
         computer.status = 'reserved'
         db.session.add(computer)
 
     reservation.status = 'confirmed'
+    bump_catalog_version()
     db.session.commit()
+    reminder_scheduler.schedule(reservation.id, reservation.start_time)
 
     # Emitir eventos de actualización en tiempo real
     socketio.emit('reservation_status_updated', {
@@ -384,8 +663,8 @@ def cancel_reservation_admin(current_user, reservation_id):
     if reservation.status not in ['pending', 'confirmed']:
         return jsonify({'message': 'No se puede cancelar una reserva ya cancelada'}), 400
 
-    # Obtener la computadora asociada
-    computer = Computer.query.get(reservation.computer_id)
+    # Obtener la computadora asociada (con su laboratorio para la notificación)
+    computer = Computer.query.options(joinedload(Computer.laboratory)).get(reservation.computer_id)
     old_computer_status = computer.status if computer else None
 
     reservation.status = 'cancelled'
@@ -403,7 +682,16 @@ def cancel_reservation_admin(current_user, reservation_id):
             computer.status = 'available'
             db.session.add(computer)
 
+    if computer and old_computer_status != computer.status:
+        bump_catalog_version()
+    # El hueco pasa al primero de la lista de espera en la misma transacción
+    from waitlist import announce_promotion, promote_next
+    promotion = promote_next(reservation)
+    db.session.flush()
+    bitmap_store.refresh(bitmap_store.pairs_for(reservation.computer_id, reservation.start_time, reservation.end_time))
     db.session.commit()
+    reminder_scheduler.cancel(reservation.id)
+    announce_promotion(promotion)
 
     # Emitir eventos de actualización en tiempo real
     socketio.emit('reservation_status_updated', {
@@ -450,28 +738,24 @@ def get_user_reservations_by_id(current_user, user_id):
     if current_user.id != user_id and current_user.role != 'admin':
         return jsonify({'message': 'Acceso denegado'}), 403
 
-    reservations = Reservation.query.filter_by(user_id=user_id).order_by(Reservation.created_at.desc()).all()
-    
-    # Obtener detalles completos para cada reserva
-    reservations_with_details = []
-    for reservation in reservations:
-        try:
-            # Obtener detalles de la computadora
-            computer_response = requests.get(f'{request.host_url.rstrip("/")}/api/computers/{reservation.computer_id}')
-            computer = computer_response.json() if computer_response.status_code == 200 else None
-            
-            # Obtener detalles del laboratorio si la computadora existe
-            laboratory = None
-            if computer:
-                lab_response = requests.get(f'{request.host_url.rstrip("/")}/api/labs/{computer["laboratory_id"]}')
-                laboratory = lab_response.json() if lab_response.status_code == 200 else None
+    # Import diferido: archive importa este módulo
+    from archive import history_dict, reservation_history
 
-            reservation_data = reservation.to_dict()
-            reservation_data['computer'] = computer
-            reservation_data['laboratory'] = laboratory
-            reservations_with_details.append(reservation_data)
-        except Exception as e:
-            print(f"Error al obtener detalles para la reserva {reservation.id}: {e}")
-            reservations_with_details.append(reservation.to_dict())
+    # Reservas vivas y archivadas, con la computadora y el laboratorio, en una consulta
+    history = reservation_history(lambda table: [table.user_id == user_id])
+    rows = db.session.execute(
+        select(history, Computer, Laboratory)
+        .outerjoin(Computer, history.c.computer_id == Computer.id)
+        .outerjoin(Laboratory, Computer.laboratory_id == Laboratory.id)
+        .order_by(history.c.created_at.desc())
+    ).all()
+
+    reservations_with_details = []
+    for row in rows:
+        computer, laboratory = row[-2], row[-1]
+        reservation_data = history_dict(row[:-2])
+        reservation_data['computer'] = computer.to_dict() if computer else None
+        reservation_data['laboratory'] = laboratory.to_dict() if laboratory else None
+        reservations_with_details.append(reservation_data)
 
     return jsonify(reservations_with_details)
@@ -0,0 +1,253 @@
+"""
+Resúmenes diarios de uso por computadora y por laboratorio.
+
+computer_daily_rollups y lab_daily_rollups guardan por día: minutos
+reservados (estados que ocupan, ver bitmap_store), número de reservas por
+estado (según el día de inicio) y usuarios distintos. Las estadísticas de
+admin y la analítica los leen en lugar de recorrer reservations, así que su
+costo depende del rango de fechas y no del tamaño histórico de la tabla.
+
+La tarea 'daily_rollups' (réplica líder, ver background_jobs.py) mantiene los
+resúmenes de forma incremental: busca las reservas con updated_at posterior
+a la marca de agua (cualquier alta o cambio de estado lo actualiza, también
+los UPDATE masivos), y recalcula desde reservations solo los días y
+laboratorios que tocan. La marca se queda ROLLUP_LAG segundos por detrás del
+reloj para no saltarse transacciones que hicieron flush antes de su commit;
+reprocesar un día es idempotente. El recálculo lee también las reservas
+archivadas (ver archive.py), que no cambian el resumen al moverse.
+
+Sin marca de agua (primera pasada) se procesa todo el historial.
+"""
+
+import logging
+import os
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, delete, func, insert, or_, select
+
+import availability
+from archive import reservation_history
+from background_jobs import register_job
+from bitmap_store import OCCUPYING_STATUSES
+from computer import Computer
+from db import db
+from reservation import Reservation
+
+logger = logging.getLogger(__name__)
+
+INTERVAL = float(os.getenv('ROLLUP_INTERVAL', 60))
+LAG_SECONDS = int(os.getenv('ROLLUP_LAG', 30))
+# Pares (laboratorio, día) recalculados por transacción
+CHUNK = int(os.getenv('ROLLUP_CHUNK', 200))
+
+STATUSES = ['pending', 'confirmed', 'cancelled', 'completed']
+WATERMARK_NAME = 'reservations'
+
+
+class _DailyMetrics:
+    """Columnas comunes de los resúmenes diarios"""
+    booked_minutes = db.Column(db.Integer, nullable=False, default=0)
+    pending_count = db.Column(db.Integer, nullable=False, default=0)
+    confirmed_count = db.Column(db.Integer, nullable=False, default=0)
+    cancelled_count = db.Column(db.Integer, nullable=False, default=0)
+    completed_count = db.Column(db.Integer, nullable=False, default=0)
+    unique_users = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class ComputerDailyRollup(_DailyMetrics, db.Model):
+    __tablename__ = 'computer_daily_rollups'
+    # Mismos índices que migrations/0012_daily_rollups.py
+    __table_args__ = (
+        db.Index('idx_computer_rollups_lab_day', 'laboratory_id', 'day'),
+    )
+
+    computer_id = db.Column(db.Integer, db.ForeignKey('computers.id', ondelete='CASCADE'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    laboratory_id = db.Column(db.Integer, nullable=False)
+
+
+class LabDailyRollup(_DailyMetrics, db.Model):
+    __tablename__ = 'lab_daily_rollups'
+
+    laboratory_id = db.Column(db.Integer, db.ForeignKey('laboratories.id', ondelete='CASCADE'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+
+
+class RollupWatermark(db.Model):
+    __tablename__ = 'rollup_watermarks'
+
+    name = db.Column(db.String(50), primary_key=True)
+    processed_until = db.Column(db.DateTime, nullable=False)
+
+
+def _empty_metrics():
+    metrics = {'booked_minutes': 0, 'users': set()}
+    for status in STATUSES:
+        metrics[f'{status}_count'] = 0
+    return metrics
+
+
+def _minutes_by_day(start, end):
+    """{día: minutos} de un intervalo que puede cruzar la medianoche"""
+    minutes = {}
+    day = start.date()
+    while availability.day_start(day) < end:
+        day_end = availability.day_start(day + timedelta(days=1))
+        overlap = (min(end, day_end) - max(start, availability.day_start(day))).total_seconds()
+        if overlap > 0:
+            minutes[day] = int(overlap // 60)
+        day += timedelta(days=1)
+    return minutes
+
+
+def recompute(lab_days):
+    """
+    Recalcula desde reservations los resúmenes de esos (laboratory_id, día):
+    el del laboratorio y los de todas sus computadoras. No hace commit.
+    """
+    lab_days = set(lab_days)
+    if not lab_days:
+        return
+    lab_ids = {lab_id for lab_id, _ in lab_days}
+    first_day = min(day for _, day in lab_days)
+    last_day = max(day for _, day in lab_days)
+
+    range_start = availability.day_start(first_day)
+    range_end = availability.day_start(last_day + timedelta(days=1))
+    history = reservation_history(lambda table: [table.start_time < range_end, table.end_time > range_start])
+    rows = db.session.execute(
+        select(history.c.computer_id, Computer.laboratory_id, history.c.user_id,
+               history.c.status, history.c.start_time, history.c.end_time)
+        .join(Computer, history.c.computer_id == Computer.id)
+        .where(Computer.laboratory_id.in_(lab_ids))
+    ).all()
+
+    by_computer = defaultdict(_empty_metrics)
+    by_lab = defaultdict(_empty_metrics)
+    for computer_id, lab_id, user_id, status, start, end in rows:
+        start_day = start.date()
+        if (lab_id, start_day) in lab_days and status in STATUSES:
+            for metrics in (by_computer[(computer_id, lab_id, start_day)], by_lab[(lab_id, start_day)]):
+                metrics[f'{status}_count'] += 1
+                metrics['users'].add(user_id)
+        if status not in OCCUPYING_STATUSES:
+            continue
+        for day, minutes in _minutes_by_day(start, end).items():
+            if (lab_id, day) in lab_days:
+                for metrics in (by_computer[(computer_id, lab_id, day)], by_lab[(lab_id, day)]):
+                    metrics['booked_minutes'] += minutes
+                    metrics['users'].add(user_id)
+
+    def as_row(metrics):
+        row = {key: value for key, value in metrics.items() if key != 'users'}
+        row['unique_users'] = len(metrics['users'])
+        return row
+
+    lab_condition = or_(*[and_(LabDailyRollup.laboratory_id == lab_id, LabDailyRollup.day == day)
+                          for lab_id, day in lab_days])
+    computer_condition = or_(*[and_(ComputerDailyRollup.laboratory_id == lab_id, ComputerDailyRollup.day == day)
+                               for lab_id, day in lab_days])
+    db.session.execute(delete(LabDailyRollup).where(lab_condition))
+    db.session.execute(delete(ComputerDailyRollup).where(computer_condition))
+
+    if by_lab:
+        db.session.execute(insert(LabDailyRollup), [
+            {'laboratory_id': lab_id, 'day': day, **as_row(metrics)}
+            for (lab_id, day), metrics in by_lab.items()
+        ])
+    if by_computer:
+        db.session.execute(insert(ComputerDailyRollup), [
+            {'computer_id': computer_id, 'laboratory_id': lab_id, 'day': day, **as_row(metrics)}
+            for (computer_id, lab_id, day), metrics in by_computer.items()
+        ])
+
+
+def _touched_lab_days(since, until):
+    """(laboratory_id, día) de las reservas modificadas en [since, until)"""
+    query = (
+        select(Computer.laboratory_id, Reservation.start_time, Reservation.end_time)
+        .join(Computer, Reservation.computer_id == Computer.id)
+        .where(Reservation.updated_at < until)
+    )
+    if since is not None:
+        # >=: updated_at tiene resolución de segundos en MySQL y reprocesar es inofensivo
+        query = query.where(Reservation.updated_at >= since)
+
+    touched = set()
+    for lab_id, start, end in db.session.execute(query):
+        touched.add((lab_id, start.date()))
+        for day in _minutes_by_day(start, end):
+            touched.add((lab_id, day))
+    return touched
+
+
+def refresh_rollups(now=None):
+    """Tarea periódica: recalcula los días tocados desde la última pasada. Devuelve cuántos"""
+    until = (now or datetime.utcnow()).replace(microsecond=0) - timedelta(seconds=LAG_SECONDS)
+    watermark = db.session.get(RollupWatermark, WATERMARK_NAME)
+    since = watermark.processed_until if watermark else None
+    if since is not None and since >= until:
+        return 0
+
+    # Por día primero: cada tanda cubre un rango corto de fechas
+    touched = sorted(_touched_lab_days(since, until), key=lambda lab_day: (lab_day[1], lab_day[0]))
+    for index in range(0, len(touched), CHUNK):
+        recompute(touched[index:index + CHUNK])
+        db.session.commit()
+
+    if watermark is None:
+        db.session.add(RollupWatermark(name=WATERMARK_NAME, processed_until=until))
+    else:
+        watermark.processed_until = until
+    db.session.commit()
+
+    if touched:
+        logger.info(f"Resúmenes diarios: {len(touched)} (laboratorio, día) recalculados hasta {until}")
+    return len(touched)
+
+
+def processed_until():
+    """Hasta cuándo están al día los resúmenes (UTC), o None si la tarea nunca corrió"""
+    return db.session.execute(
+        select(RollupWatermark.processed_until).where(RollupWatermark.name == WATERMARK_NAME)
+    ).scalar()
+
+
+def ready():
+    """True si la tarea ya completó al menos una pasada (hay resúmenes utilizables)"""
+    return processed_until() is not None
+
+
+def lab_daily(first_day, last_day, lab_ids=None):
+    """Filas de lab_daily_rollups del rango (sin los días vacíos)"""
+    query = select(LabDailyRollup).where(LabDailyRollup.day >= first_day, LabDailyRollup.day <= last_day)
+    if lab_ids is not None:
+        query = query.where(LabDailyRollup.laboratory_id.in_(lab_ids))
+    return db.session.execute(query.order_by(LabDailyRollup.day)).scalars().all()
+
+
+def computer_totals(first_day, last_day, lab_ids=None):
+    """{computer_id: minutos reservados} en el rango, sumando los resúmenes diarios"""
+    query = (
+        select(ComputerDailyRollup.computer_id, func.sum(ComputerDailyRollup.booked_minutes))
+        .where(ComputerDailyRollup.day >= first_day, ComputerDailyRollup.day <= last_day)
+        .group_by(ComputerDailyRollup.computer_id)
+    )
+    if lab_ids is not None:
+        query = query.where(ComputerDailyRollup.laboratory_id.in_(lab_ids))
+    return {computer_id: int(minutes or 0) for computer_id, minutes in db.session.execute(query)}
+
+
+def status_totals(first_day=None, last_day=None):
+    """Reservas por estado (por día de inicio) en el rango, o en todo el historial"""
+    query = select(*[func.coalesce(func.sum(getattr(LabDailyRollup, f'{status}_count')), 0) for status in STATUSES])
+    if first_day is not None:
+        query = query.where(LabDailyRollup.day >= first_day)
+    if last_day is not None:
+        query = query.where(LabDailyRollup.day <= last_day)
+    return dict(zip(STATUSES, (int(value) for value in db.session.execute(query).one())))
+
+
+register_job('daily_rollups', INTERVAL, refresh_rollups)
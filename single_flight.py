@@ -0,0 +1,78 @@
+"""
+Coalescencia de GET idénticos concurrentes (single-flight) dentro de un proceso.
+
+Tras cada computer_status_updated todas las pestañas abiertas vuelven a pedir
+/computers/available y /computers/laboratory/<id> a la vez. Con este
+decorador la primera petición (líder) ejecuta la vista y las idénticas que
+llegan mientras tanto (seguidoras) esperan y reutilizan su respuesta, así que
+la base de datos recibe una consulta por ráfaga en vez de una por pestaña.
+
+Va debajo de @catalog_cached: solo coalesce los fallos de caché. `scope`
+agrega a la clave algo que deba coincidir además de la URL (p. ej. la versión
+del catálogo), para que una seguidora no reciba datos anteriores a un cambio.
+
+Métricas: single_flight_requests_total por endpoint y rol (leader/follower);
+la tasa de colapso es follower / (leader + follower).
+"""
+
+import os
+import threading
+from functools import wraps
+
+from flask import make_response, request
+
+from metrics import SINGLE_FLIGHT_REQUESTS
+from socket_manager import socketio
+
+WAIT_TIMEOUT = float(os.getenv('SINGLE_FLIGHT_TIMEOUT', 10))
+
+
+class _Call:
+    def __init__(self):
+        # Evento del modo async de Socket.IO (eventlet) para no bloquear el hub al esperar
+        self.done = socketio.server.eio.create_event() if socketio.server else threading.Event()
+        self.result = None  # (body, status, mimetype) si el líder terminó bien
+
+
+_lock = threading.Lock()
+_in_flight = {}  # clave -> _Call
+
+
+def _run(view, args, kwargs):
+    response = make_response(view(*args, **kwargs))
+    return response, (response.get_data(), response.status_code, response.mimetype)
+
+
+def single_flight(name, scope=None):
+    """Decorador para GET: las peticiones idénticas simultáneas comparten una sola ejecución"""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            key = (name, request.full_path, scope() if scope else None)
+            with _lock:
+                call = _in_flight.get(key)
+                leader = call is None
+                if leader:
+                    call = _in_flight[key] = _Call()
+
+            if leader:
+                SINGLE_FLIGHT_REQUESTS.labels(name, 'leader').inc()
+                try:
+                    response, call.result = _run(view, args, kwargs)
+                    return response
+                finally:
+                    with _lock:
+                        _in_flight.pop(key, None)
+                    call.done.set()
+
+            SINGLE_FLIGHT_REQUESTS.labels(name, 'follower').inc()
+            if not call.done.wait(WAIT_TIMEOUT) or call.result is None:
+                # El líder tardó demasiado o falló: se ejecuta la vista por cuenta propia
+                return _run(view, args, kwargs)[0]
+            body, status, mimetype = call.result
+            response = make_response(body, status)
+            response.mimetype = mimetype
+            return response
+
+        return wrapper
+    return decorator
@@ -1,4 +1,14 @@
 from flask_socketio import SocketIO
+from metrics import SOCKETIO_EMITS
+
+
+class InstrumentedSocketIO(SocketIO):
+    """SocketIO que cuenta los eventos emitidos para /metrics"""
+
+    def emit(self, event, *args, **kwargs):
+        SOCKETIO_EMITS.labels(event=event).inc()
+        return super().emit(event, *args, **kwargs)
+
 
 # Inicializar SocketIO como variable global
-socketio = SocketIO(cors_allowed_origins="*", async_mode='eventlet') 
\ No newline at end of file
+socketio = InstrumentedSocketIO(cors_allowed_origins="*", async_mode='eventlet')
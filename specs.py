@@ -0,0 +1,105 @@
+"""
+Normalización de las especificaciones técnicas de las computadoras.
+
+Las specs se guardan como JSON. Además de la descripción libre que escribe el
+admin ("Intel Core i7, 16GB RAM, 512GB SSD, NVIDIA GTX 1660") se extraen los
+atributos comunes a claves propias, que MySQL expone como columnas generadas
+e indexadas (ver migrations/0005_computer_specs_json.py):
+
+  - cpu (texto), ram_gb (entero), storage_gb (entero), storage_type (texto),
+    gpu (texto)
+
+Si el admin envía las claves directamente, tienen prioridad sobre lo que se
+deduzca de la descripción.
+"""
+
+import json
+import re
+
+MAX_TEXT_LENGTH = 100
+
+_RAM_RE = re.compile(r'(\d+(?:\.\d+)?)\s*(GB|TB)\s*(?:DDR\d\s*)?RAM', re.IGNORECASE)
+_STORAGE_RE = re.compile(r'(\d+(?:\.\d+)?)\s*(GB|TB)\s*(SSD|HDD|NVMe|eMMC)', re.IGNORECASE)
+_GPU_RE = re.compile(r'NVIDIA|GeForce|GTX|RTX|Quadro|Radeon|Intel\s+(?:UHD|Iris|Arc)', re.IGNORECASE)
+_CPU_RE = re.compile(r'Intel|AMD|Ryzen|Core\s+i\d|Xeon|Threadripper|Apple\s+M\d', re.IGNORECASE)
+
+
+def _to_gb(amount, unit):
+    value = float(amount)
+    if unit.upper() == 'TB':
+        value *= 1024
+    return int(value)
+
+
+def parse_description(description):
+    """Extrae los atributos comunes de una descripción en texto libre"""
+    parsed = {}
+    if not description:
+        return parsed
+
+    ram = _RAM_RE.search(description)
+    if ram:
+        parsed['ram_gb'] = _to_gb(ram.group(1), ram.group(2))
+
+    storage = _STORAGE_RE.search(description)
+    if storage:
+        parsed['storage_gb'] = _to_gb(storage.group(1), storage.group(2))
+        parsed['storage_type'] = storage.group(3).upper()
+
+    for segment in (part.strip() for part in description.split(',')):
+        if not segment:
+            continue
+        if 'gpu' not in parsed and _GPU_RE.search(segment):
+            parsed['gpu'] = segment[:MAX_TEXT_LENGTH]
+        elif 'cpu' not in parsed and _CPU_RE.search(segment) and not _RAM_RE.search(segment):
+            parsed['cpu'] = segment[:MAX_TEXT_LENGTH]
+
+    return parsed
+
+
+def normalize_specs(value):
+    """
+    Convierte specs en cualquiera de sus formas (dict, JSON en texto o texto
+    libre) al dict estructurado que se guarda en la columna JSON.
+    Devuelve None si no hay specs.
+    """
+    if value is None or value == '' or value == {}:
+        return None
+
+    if isinstance(value, dict):
+        data = dict(value)
+    else:
+        try:
+            data = json.loads(value)
+        except (TypeError, ValueError):
+            data = {'description': str(value)}
+        if not isinstance(data, dict):
+            data = {'description': str(data)}
+
+    for key, parsed_value in parse_description(data.get('description') or '').items():
+        data.setdefault(key, parsed_value)
+
+    # Tipos estables para las columnas generadas
+    for key in ('ram_gb', 'storage_gb'):
+        if key in data:
+            try:
+                data[key] = int(data[key])
+            except (TypeError, ValueError):
+                data.pop(key)
+    for key in ('cpu', 'gpu', 'storage_type'):
+        if key in data:
+            if data[key] is None:
+                data.pop(key)
+            else:
+                data[key] = str(data[key])[:MAX_TEXT_LENGTH]
+
+    return data
+
+
+def specs_text(value):
+    """Specs como texto JSON, el formato que la API siempre devolvió en `specs`"""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return value
+    return json.dumps(value, ensure_ascii=False)
@@ -12,7 +12,15 @@ if [ $? -ne 0 ]; then
     exit 1
 fi
 
-echo "Base de datos disponible. Iniciando aplicación Flask..."
+echo "Base de datos disponible. Aplicando migraciones..."
+python migrate.py
+
+if [ $? -ne 0 ]; then
+    echo "Error: No se pudieron aplicar las migraciones"
+    exit 1
+fi
+
+echo "Migraciones aplicadas. Iniciando aplicación Flask..."
 
 # Iniciar la aplicación Flask
 exec python main.py 
\ No newline at end of file
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Script de prueba para verificar que las consultas calientes usan los índices
+creados por las migraciones (EXPLAIN contra la base de datos real).
+
+Requiere haber ejecutado `python migrate.py` sobre la base de datos.
+"""
+
+import os
+import sys
+import pymysql
+
+# Configuración (mismas variables que wait_for_db.py)
+DB_CONFIG = {
+    'host': os.getenv('DB_HOST', 'localhost'),
+    'port': int(os.getenv('DB_PORT', 3306)),
+    'user': os.getenv('DB_USERNAME', 'reservas_user'),
+    'password': os.getenv('DB_PASSWORD', 'reservas_password'),
+    'database': os.getenv('DB_NAME', 'reservas_db'),
+}
+
+# (descripción, consulta, índice esperado)
+HOT_QUERIES = [
+    (
+        "Solapamiento en create_reservation",
+        """SELECT id FROM reservations
+           WHERE computer_id = 1 AND status IN ('pending', 'confirmed')
+             AND start_time < '2030-01-01 12:00:00' AND end_time > '2030-01-01 10:00:00'""",
+        'idx_reservations_computer_status_time'
+    ),
+    (
+        "Disponibilidad del día (get_availability / get_occupied_hours)",
+        """SELECT start_time, end_time FROM reservations
+           WHERE computer_id = 1 AND status IN ('pending', 'confirmed')
+             AND start_time >= '2030-01-01 00:00:00' AND start_time <= '2030-01-01 23:59:59'""",
+        'idx_reservations_computer_status_time'
+    ),
+    (
+        "Reservas de un usuario ordenadas por fecha",
+        """SELECT * FROM reservations WHERE user_id = 2 ORDER BY created_at DESC""",
+        'idx_reservations_user_created'
+    ),
+    (
+        "Notificaciones no leídas de un usuario",
+        """SELECT * FROM notifications WHERE user_id = 2 AND status = 'unread' ORDER BY created_at DESC""",
+        'idx_notifications_user_status_created'
+    ),
+]
+
+
+def explain(cursor, query):
+    cursor.execute(f"EXPLAIN {query}")
+    columns = [c[0] for c in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+def test_migrations_applied(cursor):
+    """Verifica que las migraciones de índices estén registradas"""
+    print("🔍 Verificando migraciones aplicadas...")
+    cursor.execute("SELECT version FROM schema_migrations")
+    versions = {row[0] for row in cursor.fetchall()}
+    missing = {'0001', '0002', '0003'} - versions
+    assert not missing, f"Faltan migraciones: {sorted(missing)}"
+    print(f"✅ Migraciones aplicadas: {', '.join(sorted(versions))}")
+
+
+def test_hot_queries_use_indexes(cursor):
+    """Verifica con EXPLAIN que cada consulta caliente usa su índice"""
+    print("\n📋 Verificando planes de ejecución...")
+    cursor.execute("ANALYZE TABLE reservations, notifications")
+    cursor.fetchall()
+
+    failures = []
+    for description, query, expected_index in HOT_QUERIES:
+        plan = explain(cursor, query)
+        used = plan[0].get('key')
+        if used == expected_index:
+            print(f"✅ {description}: usa {used} ({plan[0].get('Extra')})")
+        else:
+            print(f"❌ {description}: usa {used}, se esperaba {expected_index}")
+            failures.append(description)
+
+    assert not failures, f"Consultas sin el índice esperado: {failures}"
+
+
+def main():
+    print("🚀 Iniciando pruebas de índices")
+    print("=" * 50)
+
+    try:
+        connection = pymysql.connect(**DB_CONFIG)
+    except Exception as e:
+        print(f"❌ No se pudo conectar a la base de datos: {str(e)}")
+        sys.exit(1)
+
+    try:
+        with connection.cursor() as cursor:
+            test_migrations_applied(cursor)
+            test_hot_queries_use_indexes(cursor)
+    except AssertionError as e:
+        print(f"\n❌ {str(e)}")
+        sys.exit(1)
+    finally:
+        connection.close()
+
+    print("\n" + "=" * 50)
+    print("🎉 Todas las consultas calientes usan sus índices")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 from datetime import datetime
 from db import db
+from fast_json import Projection
 
 class User(db.Model):
     __tablename__ = 'users'
@@ -27,3 +28,13 @@ class User(db.Model):
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
+
+# Campos de to_dict() para la ruta rápida de listados (ver fast_json.py)
+USER_PROJECTION = Projection([
+    ('id', User.id),
+    ('email', User.email),
+    ('name', User.name),
+    ('role', User.role),
+    ('created_at', User.created_at),
+    ('updated_at', User.updated_at),
+])
@@ -0,0 +1,287 @@
+"""
+Lista de espera de horarios ocupados.
+
+Cuando un horario está tomado, el estudiante se anota para una computadora
+concreta o para cualquier computadora de un laboratorio. Al cancelarse una
+reserva (por cualquier camino: el usuario, el admin, el cambio de estado o
+las cancelaciones masivas), `promote_next` convierte en reserva pendiente la
+entrada más antigua que cabe en el hueco liberado, dentro de la misma
+transacción de la cancelación, y después se emite un único evento
+waitlist_promoted. Se saltan las entradas que chocan con un mantenimiento o
+cuyo usuario ya tiene otra reserva activa en ese horario.
+
+Las entradas que siguen en espera cuando su horario ya empezó pasan a
+'expired' en el barrido del ciclo de vida (expire_waiting, ver lifecycle.py).
+"""
+
+from datetime import datetime
+
+from flask import Blueprint, jsonify, request
+from sqlalchemy import exists, or_, select, update
+
+from auth import token_required
+from computer import Computer
+from db import db
+from laboratory import Laboratory
+from maintenance import maintenance_intervals
+from reservation import Reservation
+from socket_manager import socketio
+from notification_integration import safe_notify_reservation_created
+
+waitlist_bp = Blueprint('waitlist', __name__)
+
+
+class WaitlistEntry(db.Model):
+    __tablename__ = 'waitlist_entries'
+    # Mismos índices que migrations/0009_waitlist.py
+    __table_args__ = (
+        db.Index('idx_waitlist_computer_status_time', 'computer_id', 'status', 'start_time'),
+        db.Index('idx_waitlist_laboratory_status_time', 'laboratory_id', 'status', 'start_time'),
+        db.Index('idx_waitlist_user_status', 'user_id', 'status'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    computer_id = db.Column(db.Integer, db.ForeignKey('computers.id', ondelete='CASCADE'))
+    laboratory_id = db.Column(db.Integer, db.ForeignKey('laboratories.id', ondelete='CASCADE'))
+    start_time = db.Column(db.DateTime, nullable=False)
+    end_time = db.Column(db.DateTime, nullable=False)
+    status = db.Column(db.String(20), default='waiting')  # 'waiting', 'promoted', 'cancelled', 'expired'
+    reservation_id = db.Column(db.Integer, db.ForeignKey('reservations.id', ondelete='SET NULL'))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<WaitlistEntry {self.id}>'
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'user_id': self.user_id,
+            'computer_id': self.computer_id,
+            'laboratory_id': self.laboratory_id,
+            'start_time': self.start_time.isoformat() if self.start_time else None,
+            'end_time': self.end_time.isoformat() if self.end_time else None,
+            'status': self.status,
+            'reservation_id': self.reservation_id,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+
+
+def promote_next(reservation):
+    """
+    Promueve la primera entrada en espera que cabe en el horario de la reserva
+    cancelada. No hace commit: se llama antes del commit de la cancelación.
+    Devuelve (entrada, reserva nueva) o None.
+    """
+    return promote_into(reservation.computer_id, reservation.start_time, reservation.end_time)
+
+
+def promote_into(computer_id, slot_start, slot_end):
+    """
+    Como promote_next, para el hueco [slot_start, slot_end) de una computadora.
+    Se salta las entradas que chocan con un mantenimiento o cuyo usuario ya
+    tiene otra reserva pendiente o confirmada que se solapa.
+    """
+    if slot_start <= datetime.now():
+        return None
+
+    laboratory_id = select(Computer.laboratory_id).where(Computer.id == computer_id).scalar_subquery()
+    entries = db.session.execute(
+        select(WaitlistEntry)
+        .where(
+            WaitlistEntry.status == 'waiting',
+            or_(WaitlistEntry.computer_id == computer_id,
+                WaitlistEntry.laboratory_id == laboratory_id),
+            WaitlistEntry.start_time >= slot_start,
+            WaitlistEntry.end_time <= slot_end
+        )
+        .order_by(WaitlistEntry.created_at, WaitlistEntry.id)
+        .with_for_update(skip_locked=True)
+    ).scalars().all()
+    if not entries:
+        return None
+
+    # Una consulta para las ventanas de mantenimiento del hueco y otra para las
+    # reservas activas de todos los candidatos; luego se filtra en memoria
+    windows = maintenance_intervals(computer_id, slot_start, slot_end)
+    busy = {}
+    for user_id, start, end in db.session.execute(
+        select(Reservation.user_id, Reservation.start_time, Reservation.end_time).where(
+            Reservation.user_id.in_({candidate.user_id for candidate in entries}),
+            Reservation.status.in_(['pending', 'confirmed']),
+            Reservation.start_time < slot_end,
+            Reservation.end_time > slot_start
+        )
+    ):
+        busy.setdefault(user_id, []).append((start, end))
+
+    def fits(candidate):
+        intervals = windows + busy.get(candidate.user_id, [])
+        return not any(start < candidate.end_time and end > candidate.start_time for start, end in intervals)
+
+    entry = next((candidate for candidate in entries if fits(candidate)), None)
+    if entry is None:
+        return None
+
+    promoted = Reservation(
+        start_time=entry.start_time,
+        end_time=entry.end_time,
+        status='pending',
+        user_id=entry.user_id,
+        computer_id=computer_id
+    )
+    db.session.add(promoted)
+    db.session.flush()
+    entry.status = 'promoted'
+    entry.reservation_id = promoted.id
+    return entry, promoted
+
+
+def expire_waiting(now):
+    """Pasa a 'expired' las entradas en espera cuyo horario ya empezó. Devuelve cuántas"""
+    return db.session.execute(
+        update(WaitlistEntry)
+        .where(WaitlistEntry.status == 'waiting', WaitlistEntry.start_time <= now)
+        .values(status='expired')
+        .execution_options(synchronize_session=False)
+    ).rowcount
+
+
+def announce_promotion(promotion):
+    """Tras el commit: un evento para el hueco liberado y la notificación al promovido"""
+    if not promotion:
+        return
+    entry, promoted = promotion
+
+    socketio.emit('waitlist_promoted', {
+        'entry_id': entry.id,
+        'user_id': entry.user_id,
+        'reservation_id': promoted.id,
+        'computer_id': promoted.computer_id
+    })
+
+    try:
+        computer = db.session.get(Computer, promoted.computer_id)
+        safe_notify_reservation_created(
+            user_id=entry.user_id,
+            reservation_data={
+                'computer_name': computer.name if computer else 'Computadora',
+                'laboratory_name': computer.laboratory.name if computer and computer.laboratory else 'Laboratorio',
+                'date': promoted.start_time.strftime('%Y-%m-%d'),
+                'start_time': promoted.start_time.strftime('%H:%M'),
+                'end_time': promoted.end_time.strftime('%H:%M'),
+                'status': 'Pendiente (desde lista de espera)'
+            },
+            token=request.headers.get('Authorization', '').replace('Bearer ', '')
+        )
+    except Exception as e:
+        print(f"Error enviando notificación de lista de espera: {e}")
+
+
+def _computer_taken(computer_id, start_time, end_time):
+    """True si la computadora tiene una reserva activa o mantenimiento en [start, end)"""
+    if maintenance_intervals(computer_id, start_time, end_time):
+        return True
+    return db.session.execute(
+        select(exists().where(
+            Reservation.computer_id == computer_id,
+            Reservation.status.in_(['pending', 'confirmed']),
+            Reservation.start_time < end_time,
+            Reservation.end_time > start_time
+        ))
+    ).scalar()
+
+
+# Entradas en espera del usuario autenticado
+@waitlist_bp.route('', methods=['GET'])
+@token_required
+def get_my_waitlist(current_user):
+    entries = WaitlistEntry.query.filter(
+        WaitlistEntry.user_id == current_user.id,
+        WaitlistEntry.status == 'waiting'
+    ).order_by(WaitlistEntry.start_time).all()
+    return jsonify([entry.to_dict() for entry in entries])
+
+
+# Anotarse en la lista de espera de una computadora o de un laboratorio
+@waitlist_bp.route('', methods=['POST'])
+@token_required
+def join_waitlist(current_user):
+    data = request.get_json() or {}
+    computer_id = data.get('computer_id')
+    laboratory_id = data.get('laboratory_id')
+
+    if bool(computer_id) == bool(laboratory_id):
+        return jsonify({'message': 'Indica computer_id o laboratory_id (solo uno)'}), 400
+
+    try:
+        start_time = datetime.fromisoformat(data.get('start_time'))
+        end_time = datetime.fromisoformat(data.get('end_time'))
+    except (TypeError, ValueError):
+        return jsonify({'message': 'Faltan start_time o end_time, o tienen formato inválido'}), 400
+
+    if start_time >= end_time:
+        return jsonify({'message': 'La hora de inicio debe ser antes de la hora de fin'}), 400
+    if start_time <= datetime.now():
+        return jsonify({'message': 'El horario ya pasó'}), 400
+
+    if computer_id:
+        if db.session.get(Computer, computer_id) is None:
+            return jsonify({'message': 'Computadora no encontrada'}), 404
+        computer_ids = [computer_id]
+    else:
+        if db.session.get(Laboratory, laboratory_id) is None:
+            return jsonify({'message': 'Laboratorio no encontrado'}), 404
+        computer_ids = db.session.execute(
+            select(Computer.id).where(Computer.laboratory_id == laboratory_id)
+        ).scalars().all()
+    # Solo tiene sentido esperar si no hay ninguna computadora libre en ese horario
+    if not all(_computer_taken(cid, start_time, end_time) for cid in computer_ids):
+        return jsonify({'message': 'El horario está libre, puedes reservarlo directamente'}), 400
+
+    duplicate = WaitlistEntry.query.filter(
+        WaitlistEntry.user_id == current_user.id,
+        WaitlistEntry.status == 'waiting',
+        WaitlistEntry.computer_id == computer_id if computer_id else WaitlistEntry.laboratory_id == laboratory_id,
+        WaitlistEntry.start_time == start_time,
+        WaitlistEntry.end_time == end_time
+    ).first()
+    if duplicate:
+        return jsonify({'message': 'Ya estás en la lista de espera de ese horario', 'entry': duplicate.to_dict()}), 409
+
+    entry = WaitlistEntry(
+        user_id=current_user.id,
+        computer_id=computer_id or None,
+        laboratory_id=laboratory_id or None,
+        start_time=start_time,
+        end_time=end_time
+    )
+    db.session.add(entry)
+    db.session.commit()
+
+    position = WaitlistEntry.query.filter(
+        WaitlistEntry.status == 'waiting',
+        WaitlistEntry.computer_id == entry.computer_id if computer_id else WaitlistEntry.laboratory_id == entry.laboratory_id,
+        WaitlistEntry.start_time < end_time,
+        WaitlistEntry.end_time > start_time,
+        WaitlistEntry.id <= entry.id
+    ).count()
+
+    return jsonify({'message': 'Agregado a la lista de espera', 'entry': entry.to_dict(), 'position': position}), 201
+
+
+# Salir de la lista de espera
+@waitlist_bp.route('/<int:entry_id>', methods=['DELETE'])
+@token_required
+def leave_waitlist(current_user, entry_id):
+    entry = db.session.get(WaitlistEntry, entry_id)
+    if not entry:
+        return jsonify({'message': 'Entrada no encontrada'}), 404
+    if entry.user_id != current_user.id and current_user.role != 'admin':
+        return jsonify({'message': 'No autorizado'}), 403
+    if entry.status != 'waiting':
+        return jsonify({'message': 'La entrada ya no está en espera'}), 400
+
+    entry.status = 'cancelled'
+    db.session.commit()
+    return jsonify({'message': 'Saliste de la lista de espera', 'entry': entry.to_dict()})